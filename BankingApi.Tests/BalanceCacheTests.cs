@@ -0,0 +1,92 @@
+using BankingApi.Data;
+
+namespace BankingApi.Tests;
+
+public class BalanceCacheTests
+{
+    [Fact]
+    public void SetThenTryGetReturnsBalance()
+    {
+        var cache = new BalanceCache(10);
+        var accountId = Guid.NewGuid();
+
+        cache.Set(accountId, 100m, cache.Version);
+
+        Assert.True(cache.TryGet(accountId, out var balance));
+        Assert.Equal(100m, balance);
+    }
+
+    [Fact]
+    public void ReadStartedBeforeInvalidationIsNotCached()
+    {
+        var cache = new BalanceCache(10);
+        var accountId = Guid.NewGuid();
+
+        var readVersion = cache.Version;   // leitura do saldo anterior à transferência
+        cache.Invalidate(accountId);        // transferência confirmada
+        cache.Set(accountId, 100m, readVersion);
+
+        Assert.False(cache.TryGet(accountId, out _));
+    }
+
+    [Fact]
+    public void SlowReadDoesNotOverwriteNewerBalance()
+    {
+        var cache = new BalanceCache(10);
+        var accountId = Guid.NewGuid();
+
+        var slowReadVersion = cache.Version; // leitor A lê 100 antes da transferência
+        cache.Invalidate(accountId);          // transferência confirmada: saldo passa a 50
+        cache.Set(accountId, 50m, cache.Version); // leitor B grava o saldo novo
+        cache.Set(accountId, 100m, slowReadVersion); // leitor A termina depois
+
+        Assert.True(cache.TryGet(accountId, out var balance));
+        Assert.Equal(50m, balance);
+    }
+
+    [Fact]
+    public void SlowReadIsRejectedAfterNewerEntryIsEvicted()
+    {
+        var cache = new BalanceCache(1);
+        var accountId = Guid.NewGuid();
+
+        var slowReadVersion = cache.Version;
+        cache.Invalidate(accountId);
+        cache.Set(accountId, 50m, cache.Version);
+        cache.Set(Guid.NewGuid(), 10m, cache.Version); // remove a conta do LRU
+        cache.Set(accountId, 100m, slowReadVersion);
+
+        Assert.False(cache.TryGet(accountId, out _));
+    }
+
+    [Fact]
+    public void LeastRecentlyUsedEntryIsEvicted()
+    {
+        var cache = new BalanceCache(2);
+        var first = Guid.NewGuid();
+        var second = Guid.NewGuid();
+        var third = Guid.NewGuid();
+
+        cache.Set(first, 1m, cache.Version);
+        cache.Set(second, 2m, cache.Version);
+        Assert.True(cache.TryGet(first, out _)); // first passa a ser a mais recente
+        cache.Set(third, 3m, cache.Version);
+
+        Assert.True(cache.TryGet(first, out _));
+        Assert.False(cache.TryGet(second, out _));
+        Assert.True(cache.TryGet(third, out _));
+        Assert.Equal(2, cache.Count);
+    }
+
+    [Fact]
+    public void ZeroCapacityDisablesCache()
+    {
+        var cache = new BalanceCache(0);
+        var accountId = Guid.NewGuid();
+
+        cache.Set(accountId, 100m, cache.Version);
+
+        Assert.False(cache.Enabled);
+        Assert.False(cache.TryGet(accountId, out _));
+    }
+}
@@ -0,0 +1,4 @@
+namespace BankingApi.DTOs;
+
+// Status: "completed" ou "failed" (com Error usando as mesmas mensagens de POST /transactions)
+public record BatchTransferItemResult(int Index, string Status, Guid? TransactionId, string? Error);
@@ -0,0 +1,3 @@
+namespace BankingApi.DTOs;
+
+public record BatchTransferRequest(List<TransferRequest> Transfers, int? ChunkSize = null);
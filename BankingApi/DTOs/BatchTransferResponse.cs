@@ -0,0 +1,9 @@
+namespace BankingApi.DTOs;
+
+public record BatchTransferResponse(
+    int Total,
+    int Succeeded,
+    int Failed,
+    int Chunks,
+    List<BatchTransferItemResult> Results
+);
@@ -0,0 +1,152 @@
+using Microsoft.EntityFrameworkCore;
+
+namespace BankingApi.Data;
+
+public static class AccountTransfers
+{
+    /// <summary>
+    /// Executa a transferência em um único comando SQL (uma ida ao banco, atômico):
+    /// trava as duas contas em ordem de Id, debita/credita com UPDATE condicional ao
+    /// saldo e insere a transação somente se o UPDATE foi aplicado.
+    ///
+    /// O lock em ordem de Id faz transferências concorrentes A->B e B->A travarem as
+    /// contas na mesma ordem (sem deadlock), e o saldo verificado é o da versão
+    /// travada, então duas transferências simultâneas da mesma conta não geram
+    /// lost update nem saldo negativo.
+    /// </summary>
+    public static async Task<TransferOutcome> ExecuteAsync(
+        BankingDbContext db,
+        Guid transactionId,
+        Guid fromAccountId,
+        Guid toAccountId,
+        decimal amount,
+        DateTime createdAt)
+    {
+        // Transferência para a própria conta trava e atualiza uma única linha
+        var expectedAccounts = fromAccountId == toAccountId ? 1 : 2;
+
+        var outcomes = await db.Database.SqlQuery<TransferOutcome>($"""
+            WITH locked AS MATERIALIZED (
+                SELECT "Id", "Balance"
+                FROM "Accounts"
+                WHERE "Id" IN ({fromAccountId}, {toAccountId})
+                ORDER BY "Id"
+                FOR UPDATE
+            ),
+            updated AS (
+                UPDATE "Accounts" AS a
+                SET "Balance" = a."Balance"
+                    - CASE WHEN a."Id" = {fromAccountId} THEN {amount} ELSE 0 END
+                    + CASE WHEN a."Id" = {toAccountId} THEN {amount} ELSE 0 END
+                FROM locked AS l
+                WHERE a."Id" = l."Id"
+                  AND (SELECT count(*) FROM locked) = {expectedAccounts}
+                  AND (SELECT "Balance" FROM locked WHERE "Id" = {fromAccountId}) >= {amount}
+                RETURNING a."Id"
+            ),
+            inserted AS (
+                INSERT INTO "Transactions" ("Id", "FromAccountId", "ToAccountId", "Amount", "CreatedAt", "Type")
+                SELECT {transactionId}, {fromAccountId}, {toAccountId}, {amount}, {createdAt}, 'TRANSFER'
+                WHERE EXISTS (SELECT 1 FROM updated)
+                RETURNING "Id"
+            )
+            SELECT
+                EXISTS (SELECT 1 FROM locked WHERE "Id" = {fromAccountId}) AS "FromExists",
+                EXISTS (SELECT 1 FROM locked WHERE "Id" = {toAccountId}) AS "ToExists",
+                (SELECT "Balance" FROM locked WHERE "Id" = {fromAccountId}) AS "FromBalance",
+                EXISTS (SELECT 1 FROM inserted) AS "Completed"
+            """)
+            // Sem composição (ex: SingleAsync): o EF envolveria o WITH com UPDATE em uma
+            // subquery, o que o PostgreSQL não aceita
+            .ToListAsync();
+
+        return outcomes.Single();
+    }
+
+    /// <summary>
+    /// Aplica um lote de transferências em uma transação do banco, com comandos
+    /// set-based (três comandos independentemente do tamanho do lote):
+    /// trava todas as contas envolvidas em ordem de Id, valida cada item em ordem
+    /// sobre os saldos travados (um item pode usar o crédito de um item anterior),
+    /// aplica o saldo líquido de cada conta com um UPDATE e insere as transações
+    /// aceitas com um INSERT.
+    ///
+    /// Retorna, por item, null quando aplicado ou a mensagem de erro (as mesmas de
+    /// POST /transactions). Itens recusados não impedem os demais.
+    /// </summary>
+    public static async Task<string?[]> ExecuteBatchAsync(BankingDbContext db, IReadOnlyList<Models.Transaction> transfers)
+    {
+        var accountIds = transfers
+            .SelectMany(t => new[] { t.FromAccountId, t.ToAccountId })
+            .Distinct()
+            .ToArray();
+
+        await using var dbTransaction = await db.Database.BeginTransactionAsync();
+
+        // Mesma ordem de lock da transferência individual: lotes e transferências
+        // concorrentes não entram em deadlock
+        var balances = await db.Accounts
+            .FromSql($"""SELECT * FROM "Accounts" WHERE "Id" = ANY({accountIds}) ORDER BY "Id" FOR UPDATE""")
+            .AsNoTracking()
+            .ToDictionaryAsync(a => a.Id, a => a.Balance);
+
+        var errors = new string?[transfers.Count];
+        var deltas = new Dictionary<Guid, decimal>();
+        var accepted = new List<Models.Transaction>();
+
+        for (var i = 0; i < transfers.Count; i++)
+        {
+            var transfer = transfers[i];
+
+            if (!balances.TryGetValue(transfer.FromAccountId, out var fromBalance))
+            {
+                errors[i] = "From account not found";
+            }
+            else if (!balances.ContainsKey(transfer.ToAccountId))
+            {
+                errors[i] = "To account not found";
+            }
+            else if (fromBalance < transfer.Amount)
+            {
+                errors[i] = "Insufficient funds";
+            }
+            else
+            {
+                balances[transfer.FromAccountId] -= transfer.Amount;
+                balances[transfer.ToAccountId] += transfer.Amount;
+                deltas[transfer.FromAccountId] = deltas.GetValueOrDefault(transfer.FromAccountId) - transfer.Amount;
+                deltas[transfer.ToAccountId] = deltas.GetValueOrDefault(transfer.ToAccountId) + transfer.Amount;
+                accepted.Add(transfer);
+            }
+        }
+
+        if (accepted.Count > 0)
+        {
+            var changedIds = deltas.Keys.ToArray();
+            var changedDeltas = changedIds.Select(id => deltas[id]).ToArray();
+
+            await db.Database.ExecuteSqlAsync($"""
+                UPDATE "Accounts" AS a
+                SET "Balance" = a."Balance" + d."Delta"
+                FROM unnest({changedIds}, {changedDeltas}) AS d("Id", "Delta")
+                WHERE a."Id" = d."Id"
+                """);
+
+            var ids = accepted.Select(t => t.Id).ToArray();
+            var fromIds = accepted.Select(t => t.FromAccountId).ToArray();
+            var toIds = accepted.Select(t => t.ToAccountId).ToArray();
+            var amounts = accepted.Select(t => t.Amount).ToArray();
+            var createdAts = accepted.Select(t => t.CreatedAt).ToArray();
+
+            await db.Database.ExecuteSqlAsync($"""
+                INSERT INTO "Transactions" ("Id", "FromAccountId", "ToAccountId", "Amount", "CreatedAt", "Type")
+                SELECT t."Id", t."FromAccountId", t."ToAccountId", t."Amount", t."CreatedAt", 'TRANSFER'
+                FROM unnest({ids}, {fromIds}, {toIds}, {amounts}, {createdAts})
+                    AS t("Id", "FromAccountId", "ToAccountId", "Amount", "CreatedAt")
+                """);
+        }
+
+        await dbTransaction.CommitAsync();
+        return errors;
+    }
+}
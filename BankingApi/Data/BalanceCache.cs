@@ -0,0 +1,162 @@
+using System.Diagnostics.Metrics;
+
+namespace BankingApi.Data;
+
+/// <summary>
+/// Cache de saldos em memória (read-through) com tamanho limitado e remoção LRU.
+///
+/// Saldos só mudam em transferências, que chamam Invalidate() após o commit. Para
+/// que uma leitura do banco concorrente com uma transferência não grave no cache um
+/// saldo anterior ao commit, a leitura guarda a Version antes de consultar o banco e
+/// o Set() é descartado se a conta foi invalidada depois dessa versão.
+/// </summary>
+public class BalanceCache
+{
+    private static readonly Meter Meter = new("BankingApi.Metrics");
+    private static readonly Counter<long> HitCounter = Meter.CreateCounter<long>("banking.balance_cache.hits");
+    private static readonly Counter<long> MissCounter = Meter.CreateCounter<long>("banking.balance_cache.misses");
+    private static readonly Counter<long> EvictionCounter = Meter.CreateCounter<long>("banking.balance_cache.evictions");
+
+    // Balance null = marca de invalidação (ocupa espaço no LRU como qualquer entrada)
+    private sealed record Entry(Guid AccountId, decimal? Balance, long Version);
+
+    private readonly int _capacity;
+    private readonly object _lock = new();
+    private readonly Dictionary<Guid, LinkedListNode<Entry>> _entries = new();
+    private readonly LinkedList<Entry> _lru = new();
+    private long _version;
+
+    // Maior versão de entrada já removida pelo LRU: leituras iniciadas antes dela não
+    // podem provar que não perderam uma invalidação ou um saldo mais novo
+    private long _evictedVersion;
+
+    public BalanceCache(int capacity)
+    {
+        _capacity = capacity;
+        Meter.CreateObservableGauge("banking.balance_cache.size", () => Count);
+    }
+
+    public bool Enabled => _capacity > 0;
+
+    public int Count
+    {
+        get
+        {
+            lock (_lock)
+            {
+                return _entries.Count;
+            }
+        }
+    }
+
+    /// <summary>
+    /// Versão atual; deve ser lida antes da consulta ao banco e passada ao Set()
+    /// </summary>
+    public long Version => Interlocked.Read(ref _version);
+
+    public bool TryGet(Guid accountId, out decimal balance)
+    {
+        balance = 0;
+        if (!Enabled)
+        {
+            return false;
+        }
+
+        lock (_lock)
+        {
+            if (_entries.TryGetValue(accountId, out var node) && node.Value.Balance is decimal cached)
+            {
+                _lru.Remove(node);
+                _lru.AddFirst(node);
+                balance = cached;
+                HitCounter.Add(1);
+                return true;
+            }
+        }
+
+        MissCounter.Add(1);
+        return false;
+    }
+
+    /// <summary>
+    /// Grava o saldo lido do banco, a menos que a conta tenha sido invalidada depois
+    /// de readVersion (o valor lido pode ser anterior a uma transferência)
+    /// </summary>
+    public void Set(Guid accountId, decimal balance, long readVersion)
+    {
+        if (!Enabled)
+        {
+            return;
+        }
+
+        lock (_lock)
+        {
+            if (readVersion < _evictedVersion)
+            {
+                return;
+            }
+
+            if (_entries.TryGetValue(accountId, out var node))
+            {
+                // Entrada mais nova (marca de invalidação ou saldo lido depois dela) vence:
+                // uma leitura lenta não pode sobrescrever um saldo posterior à transferência
+                if (node.Value.Version > readVersion)
+                {
+                    return;
+                }
+                _lru.Remove(node);
+                _entries.Remove(accountId);
+            }
+
+            Add(new Entry(accountId, balance, readVersion));
+        }
+    }
+
+    /// <summary>
+    /// Invalida os saldos das contas de uma transferência confirmada
+    /// </summary>
+    public void Invalidate(params Guid[] accountIds)
+    {
+        Invalidate((IEnumerable<Guid>)accountIds);
+    }
+
+    public void Invalidate(IEnumerable<Guid> accountIds)
+    {
+        if (!Enabled)
+        {
+            return;
+        }
+
+        lock (_lock)
+        {
+            var version = Interlocked.Increment(ref _version);
+            foreach (var accountId in accountIds)
+            {
+                if (_entries.TryGetValue(accountId, out var node))
+                {
+                    _lru.Remove(node);
+                    _entries.Remove(accountId);
+                }
+                Add(new Entry(accountId, null, version));
+            }
+        }
+    }
+
+    private void Add(Entry entry)
+    {
+        _entries[entry.AccountId] = _lru.AddFirst(entry);
+
+        while (_entries.Count > _capacity)
+        {
+            var last = _lru.Last!;
+            _lru.RemoveLast();
+            _entries.Remove(last.Value.AccountId);
+            _evictedVersion = Math.Max(_evictedVersion, last.Value.Version);
+
+            if (last.Value.Balance != null)
+            {
+                EvictionCounter.Add(1);
+            }
+        }
+    }
+}
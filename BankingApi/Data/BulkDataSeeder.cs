@@ -0,0 +1,211 @@
+using System.Diagnostics;
+using Microsoft.EntityFrameworkCore;
+using Npgsql;
+using NpgsqlTypes;
+using Serilog;
+
+namespace BankingApi.Data;
+
+/// <summary>
+/// Carga sintética em massa para testes de performance: milhões de usuários, contas e
+/// transações gravados com COPY binário (sem change tracking do EF), a partir de uma
+/// semente determinística.
+///
+/// A distribuição é enviesada como em produção: poucas contas (as mais antigas)
+/// concentram a maior parte das transferências e acumulam históricos longos. Os
+/// usuários seguem a convenção dos benchmarks (user{k}@bench.test, senha 123456),
+/// então login e listagens funcionam contra a API real como contra o fake.
+/// </summary>
+public static class BulkDataSeeder
+{
+    private const string SeedPassword = "123456";
+
+    private readonly record struct SeedTransfer(Guid Id, int From, int To, long AmountCents, DateTime CreatedAt);
+
+    public static string SeedEmail(int userKey) => $"user{userKey}@bench.test";
+
+    public static async Task SeedAsync(BankingDbContext db, BulkSeedOptions options, CancellationToken cancellationToken = default)
+    {
+        var firstEmail = SeedEmail(0);
+        if (await db.Users.AnyAsync(u => u.Email == firstEmail, cancellationToken))
+        {
+            Log.Information("Bulk seed skipped: {Email} already exists", firstEmail);
+            return;
+        }
+
+        var stopwatch = Stopwatch.StartNew();
+        var endDate = options.EndDate switch
+        {
+            null => DateTime.UtcNow.Date,
+            { Kind: DateTimeKind.Unspecified } end => DateTime.SpecifyKind(end, DateTimeKind.Utc),
+            var end => end.Value.ToUniversalTime()
+        };
+        var historyStart = endDate.AddDays(-options.HistoryDays);
+
+        // Usuários e contas em memória (16 bytes por id); as transações são geradas
+        // sob demanda, duas vezes, a partir da mesma semente
+        var rng = new Random(options.Seed);
+        var userIds = new Guid[options.Users];
+        var accountIds = new List<Guid>(options.Users * (options.MaxAccountsPerUser + 1) / 2);
+        var accountOwners = new List<int>(accountIds.Capacity);
+
+        for (var userKey = 0; userKey < options.Users; userKey++)
+        {
+            userIds[userKey] = NextGuid(rng);
+            var accounts = 1 + rng.Next(Math.Max(1, options.MaxAccountsPerUser));
+            for (var i = 0; i < accounts; i++)
+            {
+                accountIds.Add(NextGuid(rng));
+                accountOwners.Add(userKey);
+            }
+        }
+
+        // Saldo final = abertura + entradas - saídas; a abertura cobre o déficit
+        // líquido, então nenhuma conta termina negativa
+        var netCents = new long[accountIds.Count];
+        foreach (var transfer in Transfers(options, accountIds.Count, endDate))
+        {
+            netCents[transfer.From] -= transfer.AmountCents;
+            netCents[transfer.To] += transfer.AmountCents;
+        }
+
+        await db.Database.OpenConnectionAsync(cancellationToken);
+        try
+        {
+            var connection = (NpgsqlConnection)db.Database.GetDbConnection();
+
+            // Uma única transação: uma carga interrompida não deixa dados parciais que
+            // fariam a próxima execução ser ignorada
+            await using var dbTransaction = await connection.BeginTransactionAsync(cancellationToken);
+
+            await using (var writer = await BeginImportAsync(connection,
+                """COPY "Users" ("Id", "Name", "Email", "PasswordHash") FROM STDIN (FORMAT BINARY)""", cancellationToken))
+            {
+                for (var userKey = 0; userKey < userIds.Length; userKey++)
+                {
+                    await writer.StartRowAsync(cancellationToken);
+                    await writer.WriteAsync(userIds[userKey], NpgsqlDbType.Uuid, cancellationToken);
+                    await writer.WriteAsync($"Bench User {userKey}", NpgsqlDbType.Varchar, cancellationToken);
+                    await writer.WriteAsync(SeedEmail(userKey), NpgsqlDbType.Varchar, cancellationToken);
+                    await writer.WriteAsync($"fake-hash-{SeedPassword}", NpgsqlDbType.Varchar, cancellationToken);
+                }
+                await writer.CompleteAsync(cancellationToken);
+            }
+            Log.Information("Bulk seed: {Count} users copied in {Elapsed}", userIds.Length, stopwatch.Elapsed);
+
+            var balanceRng = new Random(options.Seed + 1);
+            await using (var writer = await BeginImportAsync(connection,
+                """COPY "Accounts" ("Id", "UserId", "Balance", "CreatedAt") FROM STDIN (FORMAT BINARY)""", cancellationToken))
+            {
+                for (var i = 0; i < accountIds.Count; i++)
+                {
+                    var openingCents = balanceRng.NextInt64(0, 1_000_000) + Math.Max(0, -netCents[i]);
+
+                    // CreatedAt crescente com o índice: ORDER BY "CreatedAt" lista as contas
+                    // da mais quente para a mais fria (usado pelos benchmarks)
+                    var createdAt = historyStart.AddDays(-30.0 * (accountIds.Count - i) / accountIds.Count);
+
+                    await writer.StartRowAsync(cancellationToken);
+                    await writer.WriteAsync(accountIds[i], NpgsqlDbType.Uuid, cancellationToken);
+                    await writer.WriteAsync(userIds[accountOwners[i]], NpgsqlDbType.Uuid, cancellationToken);
+                    await writer.WriteAsync((openingCents + netCents[i]) / 100m, NpgsqlDbType.Numeric, cancellationToken);
+                    await writer.WriteAsync(createdAt, NpgsqlDbType.TimestampTz, cancellationToken);
+                }
+                await writer.CompleteAsync(cancellationToken);
+            }
+            Log.Information("Bulk seed: {Count} accounts copied in {Elapsed}", accountIds.Count, stopwatch.Elapsed);
+
+            await using (var writer = await BeginImportAsync(connection,
+                """COPY "Transactions" ("Id", "FromAccountId", "ToAccountId", "Amount", "CreatedAt", "Type") FROM STDIN (FORMAT BINARY)""", cancellationToken))
+            {
+                long copied = 0;
+
+                // ProgressInterval <= 0 desliga o log de progresso
+                var progressInterval = options.ProgressInterval > 0 ? options.ProgressInterval : long.MaxValue;
+                foreach (var transfer in Transfers(options, accountIds.Count, endDate))
+                {
+                    await writer.StartRowAsync(cancellationToken);
+                    await writer.WriteAsync(transfer.Id, NpgsqlDbType.Uuid, cancellationToken);
+                    await writer.WriteAsync(accountIds[transfer.From], NpgsqlDbType.Uuid, cancellationToken);
+                    await writer.WriteAsync(accountIds[transfer.To], NpgsqlDbType.Uuid, cancellationToken);
+                    await writer.WriteAsync(transfer.AmountCents / 100m, NpgsqlDbType.Numeric, cancellationToken);
+                    await writer.WriteAsync(transfer.CreatedAt, NpgsqlDbType.TimestampTz, cancellationToken);
+                    await writer.WriteAsync("TRANSFER", NpgsqlDbType.Varchar, cancellationToken);
+
+                    if (++copied % progressInterval == 0)
+                    {
+                        Log.Information("Bulk seed: {Copied}/{Total} transactions copied in {Elapsed}",
+                            copied, options.Transactions, stopwatch.Elapsed);
+                    }
+                }
+                await writer.CompleteAsync(cancellationToken);
+            }
+
+            await dbTransaction.CommitAsync(cancellationToken);
+        }
+        finally
+        {
+            await db.Database.CloseConnectionAsync();
+        }
+
+        // Estatísticas atualizadas para o planner antes dos benchmarks (o autovacuum
+        // demoraria a perceber a carga)
+        await db.Database.ExecuteSqlRawAsync("""ANALYZE "Users", "Accounts", "Transactions" """, cancellationToken);
+
+        Log.Information("Bulk seed completed: Users: {Users}, Accounts: {Accounts}, Transactions: {Transactions}, Seed: {Seed}, Elapsed: {Elapsed}",
+            userIds.Length, accountIds.Count, options.Transactions, options.Seed, stopwatch.Elapsed);
+        Log.Information("Bulk seed hot accounts (longest histories): {AccountIds}", accountIds.Take(5).ToArray());
+    }
+
+    private static async Task<NpgsqlBinaryImporter> BeginImportAsync(NpgsqlConnection connection, string copyCommand, CancellationToken cancellationToken)
+    {
+        var writer = await connection.BeginBinaryImportAsync(copyCommand, cancellationToken);
+
+        // O timeout padrão (o do comando, 30s) vale por operação de I/O e a checagem
+        // das FKs no final do COPY pode passar disso; 0 = sem timeout
+        writer.Timeout = TimeSpan.Zero;
+        return writer;
+    }
+
+    /// <summary>
+    /// Sequência determinística de transferências: origem e destino sorteados com viés
+    /// para as primeiras contas, valores log-uniformes e datas ao longo do histórico
+    /// </summary>
+    private static IEnumerable<SeedTransfer> Transfers(BulkSeedOptions options, int accountCount, DateTime endDate)
+    {
+        var rng = new Random(options.Seed + 2);
+        var historySeconds = options.HistoryDays * 86400.0;
+        var maxCents = (double)options.MaxAmount * 100;
+
+        for (long i = 0; i < options.Transactions; i++)
+        {
+            var from = SkewedIndex(rng, accountCount, options.HotAccountSkew);
+            var to = SkewedIndex(rng, accountCount, options.HotAccountSkew);
+            if (to == from)
+            {
+                to = (to + 1 + rng.Next(accountCount - 1)) % accountCount;
+            }
+
+            var amountCents = Math.Max(1, (long)Math.Round(Math.Pow(maxCents, rng.NextDouble())));
+            var createdAt = endDate.AddSeconds(-rng.NextDouble() * historySeconds);
+
+            yield return new SeedTransfer(NextGuid(rng), from, to, amountCents, createdAt);
+        }
+    }
+
+    private static int SkewedIndex(Random rng, int count, double skew)
+    {
+        return Math.Min(count - 1, (int)(count * Math.Pow(rng.NextDouble(), skew)));
+    }
+
+    private static Guid NextGuid(Random rng)
+    {
+        Span<byte> bytes = stackalloc byte[16];
+        rng.NextBytes(bytes);
+
+        // Marca como UUID v4 (variante RFC 4122), como os ids gerados por Guid.NewGuid()
+        bytes[7] = (byte)((bytes[7] & 0x0F) | 0x40);
+        bytes[8] = (byte)((bytes[8] & 0x3F) | 0x80);
+        return new Guid(bytes);
+    }
+}
@@ -0,0 +1,48 @@
+namespace BankingApi.Data;
+
+/// <summary>
+/// Configuração da carga sintética em massa (seção "BulkSeed"). Pode ser passada por
+/// variáveis de ambiente (BulkSeed__Users=2000000) ou pela linha de comando
+/// (--BulkSeed:Enabled=true --BulkSeed:ExitAfterSeed=true).
+/// </summary>
+public class BulkSeedOptions
+{
+    public bool Enabled { get; set; }
+
+    /// <summary>
+    /// Encerra a aplicação após a carga (uso como job, sem subir a API)
+    /// </summary>
+    public bool ExitAfterSeed { get; set; }
+
+    /// <summary>
+    /// Mesma semente = mesmos usuários, contas, valores e datas
+    /// </summary>
+    public int Seed { get; set; } = 42;
+
+    public int Users { get; set; } = 1_000_000;
+
+    public int MaxAccountsPerUser { get; set; } = 3;
+
+    public long Transactions { get; set; } = 10_000_000;
+
+    public int HistoryDays { get; set; } = 730;
+
+    /// <summary>
+    /// Expoente do sorteio de contas (índice = n * u^skew): 1 é uniforme; com 3, 1% das
+    /// contas (as mais antigas) concentra ~22% das transações
+    /// </summary>
+    public double HotAccountSkew { get; set; } = 3.0;
+
+    public decimal MaxAmount { get; set; } = 5000m;
+
+    /// <summary>
+    /// Fim do histórico gerado (padrão: início do dia atual em UTC); fixe para que
+    /// as datas também sejam reproduzíveis entre execuções em dias diferentes
+    /// </summary>
+    public DateTime? EndDate { get; set; }
+
+    /// <summary>
+    /// Transações copiadas entre cada log de progresso (0 ou negativo desliga o log)
+    /// </summary>
+    public int ProgressInterval { get; set; } = 1_000_000;
+}
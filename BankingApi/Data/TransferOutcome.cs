@@ -0,0 +1,16 @@
+namespace BankingApi.Data;
+
+/// <summary>
+/// Resultado da transferência atômica (uma linha retornada pelo SQL de AccountTransfers)
+/// </summary>
+public class TransferOutcome
+{
+    public bool FromExists { get; set; }
+    public bool ToExists { get; set; }
+
+    // Saldo da conta de origem no momento do lock (antes do débito)
+    public decimal? FromBalance { get; set; }
+
+    // true quando o débito, o crédito e o insert da transação foram aplicados
+    public bool Completed { get; set; }
+}
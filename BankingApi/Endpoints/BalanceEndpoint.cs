@@ -15,7 +15,7 @@ public static class BalanceEndpoint
 
     public static void MapBalanceEndpoint(this IEndpointRouteBuilder app)
     {
-        app.MapGet("/accounts/{id:guid}/balance", async (Guid id, BankingDbContext db) =>
+        app.MapGet("/accounts/{id:guid}/balance", async (Guid id, BankingDbContext db, BalanceCache cache) =>
         {
             using var activity = new ActivitySource("BankingApi.Traces").StartActivity("GetBalance");
             activity?.SetTag("account.id", id.ToString());
@@ -24,6 +24,21 @@ public static class BalanceEndpoint
 
             try
             {
+                if (cache.TryGet(id, out var cachedBalance))
+                {
+                    activity?.SetTag("cache.hit", true);
+                    Log.Information("Balance retrieved: AccountId: {AccountId}, Balance: {Balance}", id, cachedBalance);
+                    return Results.Ok(new BalanceResponse(cachedBalance));
+                }
+
+                if (cache.Enabled)
+                {
+                    activity?.SetTag("cache.hit", false);
+                }
+
+                // Versão lida antes da consulta: se uma transferência invalidar a conta
+                // durante a leitura, o saldo lido não é gravado no cache
+                var cacheVersion = cache.Version;
                 var account = await db.Accounts.FindAsync(id);
 
                 if (account == null)
@@ -32,6 +47,8 @@ public static class BalanceEndpoint
                     return Results.NotFound(new ErrorResponse("Account not found"));
                 }
 
+                cache.Set(id, account.Balance, cacheVersion);
+
                 Log.Information("Balance retrieved: AccountId: {AccountId}, Balance: {Balance}", id, account.Balance);
 
                 return Results.Ok(new BalanceResponse(account.Balance));
@@ -0,0 +1,161 @@
+using System.Diagnostics;
+using System.Diagnostics.Metrics;
+using BankingApi.Data;
+using BankingApi.DTOs;
+using Microsoft.AspNetCore.Mvc;
+using Serilog;
+
+namespace BankingApi.Endpoints;
+
+public static class TransactionsBatchEndpoint
+{
+    private static readonly Meter Meter = new("BankingApi.Metrics");
+    private static readonly Counter<long> BatchTransferCounter = Meter.CreateCounter<long>("banking.transfer.batch.items");
+
+    public static void MapTransactionsBatchEndpoint(this IEndpointRouteBuilder app)
+    {
+        app.MapPost("/transactions/batch", async (BatchTransferRequest request, BankingDbContext db, BalanceCache cache, IConfiguration configuration) =>
+        {
+            // Um único span para o lote; cada item vira um evento do span
+            using var activity = new ActivitySource("BankingApi.Traces").StartActivity("TransferBatch");
+
+            var transfers = request.Transfers ?? new List<TransferRequest>();
+            var maxItems = configuration.GetValue("BatchTransfers:MaxItems", 10000);
+            var chunkSize = request.ChunkSize ?? configuration.GetValue("BatchTransfers:ChunkSize", 500);
+
+            activity?.SetTag("batch.size", transfers.Count);
+            activity?.SetTag("batch.chunkSize", chunkSize);
+
+            if (transfers.Count == 0)
+            {
+                return Results.BadRequest(new ErrorResponse("Batch must contain at least one transfer"));
+            }
+
+            if (transfers.Count > maxItems)
+            {
+                Log.Warning("Transfer batch too large: Size: {Size}, MaxItems: {MaxItems}", transfers.Count, maxItems);
+                return Results.BadRequest(new ErrorResponse($"Batch exceeds the maximum of {maxItems} transfers"));
+            }
+
+            if (chunkSize < 1)
+            {
+                return Results.BadRequest(new ErrorResponse("Chunk size must be positive"));
+            }
+
+            try
+            {
+                var results = new BatchTransferItemResult[transfers.Count];
+                var createdAt = DateTime.UtcNow;
+                var chunks = 0;
+
+                // Cada chunk é uma transação do banco: um chunk com erro é desfeito sem
+                // afetar os chunks já confirmados
+                for (var start = 0; start < transfers.Count; start += chunkSize)
+                {
+                    var end = Math.Min(start + chunkSize, transfers.Count);
+                    var pending = new List<Models.Transaction>(end - start);
+                    var pendingIndexes = new List<int>(end - start);
+
+                    for (var i = start; i < end; i++)
+                    {
+                        var transfer = transfers[i];
+                        if (transfer.Amount <= 0)
+                        {
+                            results[i] = new BatchTransferItemResult(i, "failed", null, "Amount must be positive");
+                            continue;
+                        }
+
+                        pending.Add(new Models.Transaction
+                        {
+                            Id = Guid.NewGuid(),
+                            FromAccountId = transfer.FromAccountId,
+                            ToAccountId = transfer.ToAccountId,
+                            Amount = transfer.Amount,
+                            CreatedAt = createdAt,
+                            Type = "TRANSFER"
+                        });
+                        pendingIndexes.Add(i);
+                    }
+
+                    if (pending.Count == 0)
+                    {
+                        continue;
+                    }
+
+                    chunks++;
+
+                    try
+                    {
+                        var errors = await AccountTransfers.ExecuteBatchAsync(db, pending);
+                        cache.Invalidate(pending
+                            .Where((_, k) => errors[k] == null)
+                            .SelectMany(t => new[] { t.FromAccountId, t.ToAccountId }));
+
+                        for (var k = 0; k < pending.Count; k++)
+                        {
+                            results[pendingIndexes[k]] = errors[k] == null
+                                ? new BatchTransferItemResult(pendingIndexes[k], "completed", pending[k].Id, null)
+                                : new BatchTransferItemResult(pendingIndexes[k], "failed", null, errors[k]);
+                        }
+                    }
+                    catch (Exception ex)
+                    {
+                        Log.Error(ex, "Error processing transfer batch chunk: Start: {Start}, Size: {Size}", start, end - start);
+
+                        // Uma falha no commit deixa o resultado incerto: invalida todas as contas do chunk
+                        cache.Invalidate(pending.SelectMany(t => new[] { t.FromAccountId, t.ToAccountId }));
+                        foreach (var index in pendingIndexes)
+                        {
+                            results[index] = new BatchTransferItemResult(index, "failed", null, "Error processing transfer");
+                        }
+                    }
+                }
+
+                var succeeded = results.Count(r => r.Status == "completed");
+                var failed = results.Length - succeeded;
+
+                BatchTransferCounter.Add(succeeded, new KeyValuePair<string, object?>("status", "success"));
+                BatchTransferCounter.Add(failed, new KeyValuePair<string, object?>("status", "error"));
+
+                if (activity != null)
+                {
+                    // O SDK do OpenTelemetry limita os eventos por span (128 por padrão);
+                    // o resumo fica sempre nas tags
+                    foreach (var result in results)
+                    {
+                        var transfer = transfers[result.Index];
+                        var tags = new ActivityTagsCollection
+                        {
+                            ["transfer.index"] = result.Index,
+                            ["transfer.status"] = result.Status,
+                            ["transfer.fromAccountId"] = transfer.FromAccountId.ToString(),
+                            ["transfer.toAccountId"] = transfer.ToAccountId.ToString(),
+                            ["transfer.amount"] = transfer.Amount
+                        };
+                        if (result.TransactionId != null) tags["transfer.transactionId"] = result.TransactionId.ToString();
+                        if (result.Error != null) tags["transfer.error"] = result.Error;
+                        activity.AddEvent(new ActivityEvent("transfer", tags: tags));
+                    }
+
+                    activity.SetTag("batch.succeeded", succeeded);
+                    activity.SetTag("batch.failed", failed);
+                    activity.SetTag("batch.chunks", chunks);
+                }
+
+                Log.Information("Transfer batch processed: Total: {Total}, Succeeded: {Succeeded}, Failed: {Failed}, Chunks: {Chunks}",
+                    results.Length, succeeded, failed, chunks);
+
+                return Results.Ok(new BatchTransferResponse(results.Length, succeeded, failed, chunks, results.ToList()));
+            }
+            catch (Exception ex)
+            {
+                Log.Error(ex, "Error processing transfer batch: Size: {Size}", transfers.Count);
+                return Results.Problem("Error processing transfer batch");
+            }
+        })
+        .WithName("TransferFundsBatch")
+        .WithTags("Transactions")
+        .Produces<BatchTransferResponse>(StatusCodes.Status200OK)
+        .Produces<ErrorResponse>(StatusCodes.Status400BadRequest);
+    }
+}
@@ -15,57 +15,63 @@ public static class TransactionsEndpoint
 
     public static void MapTransactionsEndpoint(this IEndpointRouteBuilder app)
     {
-        app.MapPost("/transactions", async (TransferRequest request, BankingDbContext db) =>
+        app.MapPost("/transactions", async (TransferRequest request, BankingDbContext db, BalanceCache cache) =>
         {
             using var activity = new ActivitySource("BankingApi.Traces").StartActivity("TransferFunds");
             activity?.SetTag("transfer.fromAccountId", request.FromAccountId.ToString());
             activity?.SetTag("transfer.toAccountId", request.ToAccountId.ToString());
             activity?.SetTag("transfer.amount", request.Amount);
 
+            // Valor zero ou negativo inverteria a transferência (crédito na origem),
+            // como no endpoint em lote
+            if (request.Amount <= 0)
+            {
+                Log.Warning("Invalid transfer amount: FromAccountId: {FromAccountId}, Amount: {Amount}",
+                    request.FromAccountId, request.Amount);
+                return Results.BadRequest(new ErrorResponse("Amount must be positive"));
+            }
+
             try
             {
                 using var dbActivity = new ActivitySource("BankingApi.Traces").StartActivity("Database.Transaction");
-                
-                // Verificar se as contas existem
-                var fromAccount = await db.Accounts.FindAsync(request.FromAccountId);
-                var toAccount = await db.Accounts.FindAsync(request.ToAccountId);
 
-                if (fromAccount == null)
+                var transaction = new Models.Transaction
+                {
+                    Id = Guid.NewGuid(),
+                    FromAccountId = request.FromAccountId,
+                    ToAccountId = request.ToAccountId,
+                    Amount = request.Amount,
+                    CreatedAt = DateTime.UtcNow,
+                    Type = "TRANSFER"
+                };
+
+                // Verificação das contas, débito/crédito condicional ao saldo e insert da
+                // transação em um único comando atômico (ver AccountTransfers)
+                var outcome = await AccountTransfers.ExecuteAsync(
+                    db, transaction.Id, transaction.FromAccountId, transaction.ToAccountId,
+                    transaction.Amount, transaction.CreatedAt);
+
+                if (!outcome.FromExists)
                 {
                     Log.Warning("From account not found: {FromAccountId}", request.FromAccountId);
                     return Results.NotFound(new ErrorResponse("From account not found"));
                 }
 
-                if (toAccount == null)
+                if (!outcome.ToExists)
                 {
                     Log.Warning("To account not found: {ToAccountId}", request.ToAccountId);
                     return Results.NotFound(new ErrorResponse("To account not found"));
                 }
 
-                // Verificar saldo suficiente
-                if (fromAccount.Balance < request.Amount)
+                if (!outcome.Completed)
                 {
                     Log.Warning("Insufficient funds: FromAccountId: {FromAccountId}, Balance: {Balance}, Amount: {Amount}",
-                        request.FromAccountId, fromAccount.Balance, request.Amount);
+                        request.FromAccountId, outcome.FromBalance, request.Amount);
                     return Results.BadRequest(new ErrorResponse("Insufficient funds"));
                 }
 
-                // Executar transferência
-                fromAccount.Balance -= request.Amount;
-                toAccount.Balance += request.Amount;
-
-                var transaction = new Models.Transaction
-                {
-                    Id = Guid.NewGuid(),
-                    FromAccountId = request.FromAccountId,
-                    ToAccountId = request.ToAccountId,
-                    Amount = request.Amount,
-                    CreatedAt = DateTime.UtcNow,
-                    Type = "TRANSFER"
-                };
-
-                db.Transactions.Add(transaction);
-                await db.SaveChangesAsync();
+                // Saldos alterados pelo commit saem do cache antes da resposta
+                cache.Invalidate(request.FromAccountId, request.ToAccountId);
 
                 TransferCounter.Add(1, new KeyValuePair<string, object?>("status", "success"));
 
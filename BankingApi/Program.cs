@@ -31,6 +31,12 @@ var connectionString = builder.Configuration.GetConnectionString("DefaultConnect
 builder.Services.AddDbContext<BankingDbContext>(options =>
     options.UseNpgsql(connectionString));
 
+// Cache de saldos em memória, invalidado pelas transferências (Capacity = 0 desabilita)
+builder.Services.AddSingleton(new BalanceCache(builder.Configuration.GetValue("BalanceCache:Capacity", 100000)));
+
+// Carga sintética em massa (desligada por padrão); ver BulkSeedOptions
+var bulkSeed = builder.Configuration.GetSection("BulkSeed").Get<BulkSeedOptions>() ?? new BulkSeedOptions();
+
 var app = builder.Build();
 
 // Aplicar migrações e seed data
@@ -42,13 +48,29 @@ using (var scope = app.Services.CreateScope())
         db.Database.Migrate();
         await DataSeeder.SeedAsync(db);
         Log.Information("Database migrations applied and seed data created");
+
+        if (bulkSeed.Enabled)
+        {
+            await BulkDataSeeder.SeedAsync(db, bulkSeed);
+        }
     }
     catch (Exception ex)
     {
         Log.Error(ex, "Error applying migrations or seeding data");
+        if (bulkSeed.ExitAfterSeed)
+        {
+            Environment.ExitCode = 1;
+        }
     }
 }
 
+if (bulkSeed.ExitAfterSeed)
+{
+    Log.Information("Seed finished, exiting (BulkSeed:ExitAfterSeed)");
+    await Log.CloseAndFlushAsync();
+    return;
+}
+
 // Configure the HTTP request pipeline
 if (app.Environment.IsDevelopment())
 {
@@ -69,6 +91,7 @@ app.MapUsersEndpoint();
 app.MapAccountsEndpoint();
 app.MapBalanceEndpoint();
 app.MapTransactionsEndpoint();
+app.MapTransactionsBatchEndpoint();
 app.MapTransactionsListEndpoint();
 
 Log.Information("Application starting and listening on configured port");
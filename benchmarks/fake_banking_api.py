@@ -0,0 +1,299 @@
+"""
+Banking API fake em processo para benchmarks e testes de regressão do mcp-banking-api
+
+Implementa as mesmas rotas, payloads (camelCase) e mensagens de erro da BankingApi
+em memória: /ping, /users, /accounts, /auth/login, /transactions,
+/transactions/batch, /accounts/{id}/balance e /accounts/{id}/transactions. Usuários e contas são
+pré-criados de forma determinística (semente fixa), com a mesma senha do
+DataSeeder; IDs novos também são derivados da semente.
+
+Uso avulso (para apontar o mcp-banking-api para ele):
+    python fake_banking_api.py --port 8080 --users 10000 --latency-ms 2
+"""
+import argparse
+import re
+import threading
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Tuple
+
+from fake_http import FakeServer, FaultInjector, parse_json
+from synthetic_docs import derived_uuid
+
+ACCOUNT_PATH = re.compile(r"/accounts/([0-9a-fA-F-]{36})/(balance|transactions)")
+
+# Padrões de BatchTransfers no appsettings.json da BankingApi
+BATCH_CHUNK_SIZE = 500
+BATCH_MAX_ITEMS = 10000
+
+# Senha dos usuários pré-criados (a mesma do DataSeeder)
+SEED_PASSWORD = "123456"
+SEED_BALANCE = Decimal("1000.00")
+
+
+def seed_email(user_key: int) -> str:
+    return f"user{user_key}@bench.test"
+
+
+def money(value: Decimal) -> float:
+    """decimal(18,2) -> número JSON"""
+    return float(value.quantize(Decimal("0.01")))
+
+
+def parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Datas de filtro como DateTime.TryParse: inválidas são ignoradas, sem fuso = UTC"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def format_datetime(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class FakeBankingApi(FakeServer):
+    """
+    Banking API fake em memória
+
+    Args:
+        users: Usuários pré-criados, com uma conta cada (email user<N>@bench.test)
+        seed: Semente dos IDs e da injeção de falhas
+        faults: Latência e erros injetados
+    """
+
+    def __init__(
+        self,
+        users: int = 1000,
+        seed: int = 42,
+        faults: Optional[FaultInjector] = None,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        super().__init__(faults, host, port)
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.next_id = 0
+
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self.accounts: Dict[str, Dict[str, Any]] = {}
+        self.transactions: Dict[str, List[Tuple[datetime, Dict[str, Any]]]] = {}
+
+        created_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        for user_key in range(users):
+            user_id = derived_uuid(seed, "user", user_key)
+            account_id = derived_uuid(seed, "account", user_key)
+            self.users[seed_email(user_key)] = {"id": user_id, "password": SEED_PASSWORD}
+            self.accounts[account_id] = {"userId": user_id, "balance": SEED_BALANCE, "createdAt": created_at}
+            self.transactions[account_id] = []
+
+        self.seeded_accounts = [derived_uuid(seed, "account", user_key) for user_key in range(users)]
+
+    def new_id(self, kind: str) -> str:
+        """GUID determinístico para entidades criadas durante o benchmark (chamado com o lock)"""
+        self.next_id += 1
+        return derived_uuid(self.seed, f"new-{kind}", self.next_id)
+
+    def route_name(self, method: str, path: str) -> str:
+        # Agrupa as estatísticas por rota, sem o ID da conta
+        return method + " " + ACCOUNT_PATH.sub(r"/accounts/{id}/\2", path)
+
+    def handle(self, method: str, path: str, params: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        if method == "GET" and path == "/ping":
+            return 200, {"status": "ok"}
+
+        account_route = ACCOUNT_PATH.fullmatch(path)
+        if method == "GET" and account_route:
+            account_id, resource = account_route.group(1).lower(), account_route.group(2)
+            if resource == "balance":
+                return self.balance(account_id)
+            return self.list_transactions(account_id, params.get("startDate"), params.get("endDate"))
+
+        routes = {
+            "/users": self.create_user,
+            "/accounts": self.create_account,
+            "/auth/login": self.login,
+            "/transactions": self.transfer,
+            "/transactions/batch": self.transfer_batch
+        }
+        if method == "POST" and path in routes:
+            try:
+                request = parse_json(body)
+            except ValueError:
+                return 400, {"error": "Invalid JSON"}
+            return routes[path](request)
+
+        return 404, None
+
+    def balance(self, account_id: str) -> Tuple[int, Any]:
+        account = self.accounts.get(account_id)
+        if account is None:
+            return 404, {"error": "Account not found"}
+        return 200, {"balance": money(account["balance"])}
+
+    def list_transactions(self, account_id: str, start_date: Optional[str], end_date: Optional[str]) -> Tuple[int, Any]:
+        if account_id not in self.accounts:
+            return 404, {"error": "Account not found"}
+
+        start, end = parse_datetime(start_date), parse_datetime(end_date)
+        with self.lock:
+            entries = list(self.transactions[account_id])
+
+        # Ordem decrescente de criação, como o endpoint real
+        return 200, [
+            transaction for created_at, transaction in reversed(entries)
+            if (start is None or created_at >= start) and (end is None or created_at <= end)
+        ]
+
+    def create_user(self, request: Dict[str, Any]) -> Tuple[int, Any]:
+        email = request.get("email")
+        with self.lock:
+            if email in self.users:
+                return 400, {"error": "User with this email already exists"}
+            user_id, account_id, token = self.new_id("user"), self.new_id("account"), self.new_id("token")
+            self.users[email] = {"id": user_id, "password": request.get("password")}
+            self.accounts[account_id] = {
+                "userId": user_id,
+                "balance": Decimal(str(request.get("initialBalance", 0))),
+                "createdAt": datetime.now(timezone.utc)
+            }
+            self.transactions[account_id] = []
+        return 200, {"userId": user_id, "accountId": account_id, "token": token}
+
+    def create_account(self, request: Dict[str, Any]) -> Tuple[int, Any]:
+        with self.lock:
+            user = self.users.get(request.get("email"))
+            if user is None:
+                return 400, {"error": "User not found"}
+            account_id = self.new_id("account")
+            balance = Decimal(str(request.get("initialBalance", 0)))
+            self.accounts[account_id] = {"userId": user["id"], "balance": balance, "createdAt": datetime.now(timezone.utc)}
+            self.transactions[account_id] = []
+        return 200, {"accountId": account_id, "balance": money(balance)}
+
+    def login(self, request: Dict[str, Any]) -> Tuple[int, Any]:
+        with self.lock:
+            user = self.users.get(request.get("email"))
+            if user is None or user["password"] != request.get("password"):
+                return 401, None
+            return 200, {"token": self.new_id("token")}
+
+    def transfer(self, request: Dict[str, Any]) -> Tuple[int, Any]:
+        from_id = str(request.get("fromAccountId", "")).lower()
+        to_id = str(request.get("toAccountId", "")).lower()
+        try:
+            amount = Decimal(str(request.get("amount", 0)))
+        except InvalidOperation:
+            return 400, {"error": "Invalid amount"}
+        if amount <= 0:
+            return 400, {"error": "Amount must be positive"}
+
+        # Saldo verificado e debitado sob o mesmo lock: transferências concorrentes
+        # não deixam a conta de origem negativa
+        with self.lock:
+            outcome = self.apply_transfer(from_id, to_id, amount, datetime.now(timezone.utc))
+        if isinstance(outcome, tuple):
+            return outcome
+        return 200, outcome
+
+    def apply_transfer(self, from_id: str, to_id: str, amount: Decimal, created_at: datetime) -> Any:
+        """Aplica uma transferência (chamado com o lock): a transação criada ou (status, erro)"""
+        from_account = self.accounts.get(from_id)
+        to_account = self.accounts.get(to_id)
+        if from_account is None:
+            return 404, {"error": "From account not found"}
+        if to_account is None:
+            return 404, {"error": "To account not found"}
+        if from_account["balance"] < amount:
+            return 400, {"error": "Insufficient funds"}
+
+        from_account["balance"] -= amount
+        to_account["balance"] += amount
+
+        transaction = {
+            "id": self.new_id("transaction"),
+            "fromAccountId": from_id,
+            "toAccountId": to_id,
+            "amount": money(amount),
+            "createdAt": format_datetime(created_at),
+            "type": "TRANSFER"
+        }
+        # Criadas sob o lock, em ordem de created_at
+        for account_id in {from_id, to_id}:
+            self.transactions[account_id].append((created_at, transaction))
+        return transaction
+
+    def transfer_batch(self, request: Dict[str, Any]) -> Tuple[int, Any]:
+        """Mesmo contrato de POST /transactions/batch: itens em ordem, resultado por item"""
+        transfers = request.get("transfers") or []
+        chunk_size = request.get("chunkSize") or BATCH_CHUNK_SIZE
+        if not transfers:
+            return 400, {"error": "Batch must contain at least one transfer"}
+        if len(transfers) > BATCH_MAX_ITEMS:
+            return 400, {"error": f"Batch exceeds the maximum of {BATCH_MAX_ITEMS} transfers"}
+        if chunk_size < 1:
+            return 400, {"error": "Chunk size must be positive"}
+
+        created_at = datetime.now(timezone.utc)
+        results = []
+        chunks = 0
+        for start in range(0, len(transfers), chunk_size):
+            chunk = transfers[start:start + chunk_size]
+            valid = [Decimal(str(transfer.get("amount", 0))) > 0 for transfer in chunk]
+            chunks += any(valid)
+            with self.lock:
+                for index, (transfer, is_valid) in enumerate(zip(chunk, valid), start):
+                    if not is_valid:
+                        results.append({"index": index, "status": "failed", "transactionId": None, "error": "Amount must be positive"})
+                        continue
+                    outcome = self.apply_transfer(
+                        str(transfer.get("fromAccountId", "")).lower(),
+                        str(transfer.get("toAccountId", "")).lower(),
+                        Decimal(str(transfer["amount"])),
+                        created_at
+                    )
+                    if isinstance(outcome, tuple):
+                        results.append({"index": index, "status": "failed", "transactionId": None, "error": outcome[1]["error"]})
+                    else:
+                        results.append({"index": index, "status": "completed", "transactionId": outcome["id"], "error": None})
+
+        succeeded = sum(1 for result in results if result["status"] == "completed")
+        return 200, {
+            "total": len(results),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "chunks": chunks,
+            "results": results
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banking API fake em memória")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--users", type=int, default=1000, help="Usuários pré-criados (uma conta cada)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    args = parser.parse_args()
+
+    fake = FakeBankingApi(
+        users=args.users,
+        seed=args.seed,
+        faults=FaultInjector(args.latency_ms, args.jitter_ms, args.error_rate, seed=args.seed),
+        host=args.host,
+        port=args.port
+    ).start()
+    print(f"Banking API fake em {fake.url} ({args.users} usuários, senha '{SEED_PASSWORD}', email {seed_email(0)}...)")
+    try:
+        fake.thread.join()
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Base HTTP comum aos servidores fake (OpenSearch e Banking API)
+
+Cada fake implementa handle(method, path, params, body) -> (status, payload) e
+roda em uma thread do próprio processo do benchmark (ThreadingHTTPServer, uma
+thread por conexão, com keep-alive). A latência e os erros injetados são
+aplicados aqui, iguais para os dois fakes.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+
+class FaultInjector:
+    """
+    Latência e erros injetados, determinísticos para uma mesma semente
+
+    Args:
+        latency_ms: Latência base de cada requisição
+        jitter_ms: Latência adicional uniforme entre 0 e jitter_ms
+        error_rate: Fração das requisições respondidas com error_status
+        error_status: Status HTTP dos erros injetados
+        seed: Semente do sorteio de latência/erros
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        seed: int = 42
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def draw(self) -> Tuple[float, bool]:
+        """Sorteia (latência em segundos, se a requisição deve falhar)"""
+        with self.lock:
+            jitter = self.random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0
+            fail = self.error_rate > 0 and self.random.random() < self.error_rate
+        return (self.latency_ms + jitter) / 1000, fail
+
+
+class FakeServer:
+    """Servidor HTTP em thread para um fake com método handle()"""
+
+    def __init__(self, faults: Optional[FaultInjector] = None, host: str = "127.0.0.1", port: int = 0):
+        self.faults = faults or FaultInjector()
+        self.host = host
+        self.port = port
+        self.httpd: Optional[ThreadingHTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+        self.stats_lock = threading.Lock()
+        self.requests: Dict[str, int] = {}
+        self.injected_errors = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def handle(self, method: str, path: str, params: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        raise NotImplementedError
+
+    def injected_error_payload(self) -> Any:
+        return {"error": "Injected error"}
+
+    def route_name(self, method: str, path: str) -> str:
+        """Nome da rota nas estatísticas (sobrescrito para agrupar ids do path)"""
+        return f"{method} {path}"
+
+    def count(self, route: str) -> None:
+        with self.stats_lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self.stats_lock:
+            return {
+                "requests": dict(self.requests),
+                "total_requests": sum(self.requests.values()),
+                "injected_errors": self.injected_errors
+            }
+
+    def start(self) -> "FakeServer":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Cabeçalho e corpo saem em writes separados: sem TCP_NODELAY o keep-alive
+            # esbarra no Nagle + ACK atrasado (~40ms por resposta)
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def dispatch(self):
+                url = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                fake.count(fake.route_name(self.command, url.path))
+
+                delay, fail = fake.faults.draw()
+                if delay:
+                    time.sleep(delay)
+
+                if fail:
+                    with fake.stats_lock:
+                        fake.injected_errors += 1
+                    status, payload = fake.faults.error_status, fake.injected_error_payload()
+                else:
+                    try:
+                        status, payload = fake.handle(self.command, url.path, dict(parse_qsl(url.query)), body)
+                    except Exception as e:
+                        status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+
+                data = b"" if payload is None else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = dispatch
+
+        self.httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self.httpd is not None:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+
+    def __enter__(self) -> "FakeServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def parse_json(body: bytes) -> Any:
+    return json.loads(body) if body else {}
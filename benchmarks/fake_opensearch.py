@@ -0,0 +1,710 @@
+"""
+OpenSearch fake em processo para benchmarks e testes de regressão dos MCP servers
+
+Responde _search, _msearch, _count, _field_caps e point in time sobre índices
+sintéticos (synthetic_docs) de logs e traces, com o subconjunto da Query DSL e
+das agregações que o mcp-opensearch usa: bool/term/terms/range/exists/ids/match_all,
+function_score com random_score, sort + search_after, track_total_hits,
+terminate_after, terms, date_histogram, percentiles,
+min/max/avg/sum/value_count/cardinality, filter e top_hits.
+Índices diários (<índice>-YYYY.MM.DD) e o alias com o nome base apontam para o
+mesmo índice sintético.
+
+Uso avulso (para apontar os MCP servers para ele):
+    python fake_opensearch.py --port 9200 --requests 1000000 --latency-ms 5
+"""
+import argparse
+import base64
+import json
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from fake_http import FakeServer, FaultInjector, parse_json
+from synthetic_docs import (
+    SyntheticIndex, build_logs_index, build_traces_index, format_epoch_millis, generate_requests
+)
+
+TIME_UNITS_MS = {
+    "ms": 1, "s": 1000, "m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000
+}
+
+DATE_MATH = re.compile(r"now((?:[+-]\d+(?:ms|[smhdw]))*)(?:/([smhdw]))?")
+
+DAILY_SUFFIX = re.compile(r"-\d{4}\.\d{2}\.\d{2}$")
+
+# Limite padrão de contagem exata do OpenSearch quando track_total_hits não é informado
+DEFAULT_TRACK_TOTAL_HITS = 10_000
+
+
+class QueryError(Exception):
+    """Erro de requisição (400) no formato de erro do OpenSearch"""
+
+    def __init__(self, reason: str, error_type: str = "parsing_exception", status: int = 400):
+        self.reason = reason
+        self.error_type = error_type
+        self.status = status
+        super().__init__(reason)
+
+    def payload(self) -> Dict[str, Any]:
+        cause = {"type": self.error_type, "reason": self.reason}
+        return {"error": {"root_cause": [cause], **cause}, "status": self.status}
+
+
+def parse_interval_ms(interval: str) -> int:
+    """'5m', '1h', '1d'... -> milissegundos"""
+    match = re.fullmatch(r"(\d+)(ms|[smhdw])", interval)
+    if not match:
+        raise QueryError(f"Intervalo não suportado pelo fake: {interval}")
+    return int(match.group(1)) * TIME_UNITS_MS[match.group(2)]
+
+
+def parse_date_ms(value: Any, now_ms: Optional[int] = None) -> int:
+    """Valor de data do OpenSearch (epoch millis, ISO 8601 ou date math 'now-15m/m') -> epoch millis"""
+    if isinstance(value, (int, float)):
+        return int(value)
+
+    text = str(value)
+    match = DATE_MATH.fullmatch(text)
+    if match:
+        result = now_ms if now_ms is not None else int(time.time() * 1000)
+        for sign, amount, unit in re.findall(r"([+-])(\d+)(ms|[smhdw])", match.group(1)):
+            delta = int(amount) * TIME_UNITS_MS[unit]
+            result += delta if sign == "+" else -delta
+        if match.group(2):
+            result -= result % TIME_UNITS_MS[match.group(2)]
+        return result
+
+    if text.isdigit():
+        return int(text)
+
+    parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1000)
+
+
+def as_list(value: Any) -> List[Any]:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def parse_sort(sort: Any) -> List[Tuple[str, str]]:
+    """Normaliza o sort para [(campo, ordem)]"""
+    specs = []
+    for item in as_list(sort):
+        if isinstance(item, str):
+            specs.append((item, "desc" if item == "_score" else "asc"))
+        else:
+            for field, options in item.items():
+                order = options.get("order", "asc") if isinstance(options, dict) else options
+                specs.append((field, order))
+    return specs
+
+
+class SearchEngine:
+    """Avaliação vetorizada de queries e agregações sobre um SyntheticIndex"""
+
+    def __init__(self, index: SyntheticIndex):
+        self.index = index
+
+    # ---- Queries ----
+
+    def time_bounds(self, query: Dict[str, Any]) -> Tuple[int, int]:
+        """
+        Faixa de posições [lo, hi) que pode casar com a query
+
+        Os documentos estão ordenados por @timestamp, então um range de @timestamp
+        no nível de cima da query vira uma busca binária em vez de uma varredura.
+        """
+        lo, hi = 0, self.index.size
+        if "function_score" in query:
+            query = query["function_score"].get("query") or {}
+        clauses = []
+        if "bool" in query:
+            clauses = as_list(query["bool"].get("filter")) + as_list(query["bool"].get("must"))
+        elif "range" in query:
+            clauses = [query]
+
+        for clause in clauses:
+            bounds = clause.get("range", {}).get("@timestamp")
+            if not bounds:
+                continue
+            for operator, value in bounds.items():
+                if operator in ("format", "time_zone", "boost"):
+                    continue
+                millis = parse_date_ms(value)
+                side = "left" if operator in ("gte", "lt") else "right"
+                position = int(np.searchsorted(self.index.timestamps, millis, side=side))
+                if operator in ("gte", "gt"):
+                    lo = max(lo, position)
+                else:
+                    hi = min(hi, position)
+        return lo, max(lo, hi)
+
+    def evaluate(self, query: Optional[Dict[str, Any]], positions: np.ndarray) -> np.ndarray:
+        """Máscara booleana dos documentos (posições) que casam com a query"""
+        if not query or "match_all" in query:
+            return np.ones(len(positions), dtype=bool)
+
+        if len(query) != 1:
+            raise QueryError(f"Query com mais de uma chave: {list(query)}")
+        query_type, spec = next(iter(query.items()))
+
+        if query_type == "bool":
+            mask = np.ones(len(positions), dtype=bool)
+            for clause in as_list(spec.get("must")) + as_list(spec.get("filter")):
+                mask &= self.evaluate(clause, positions)
+            should = as_list(spec.get("should"))
+            if should:
+                default_minimum = 0 if spec.get("must") or spec.get("filter") else 1
+                minimum = int(spec.get("minimum_should_match", default_minimum))
+                if minimum > 0:
+                    matches = sum(self.evaluate(clause, positions).astype(np.int32) for clause in should)
+                    mask &= matches >= minimum
+            for clause in as_list(spec.get("must_not")):
+                mask &= ~self.evaluate(clause, positions)
+            return mask
+
+        if query_type in ("term", "match", "match_phrase"):
+            field, value = next(iter(spec.items()))
+            if isinstance(value, dict):
+                value = value.get("value", value.get("query"))
+            column = self.index.column(field)
+            return column.term_mask(positions, value) if column else np.zeros(len(positions), dtype=bool)
+
+        if query_type == "terms":
+            field, values = next((key, value) for key, value in spec.items() if key != "boost")
+            column = self.index.column(field)
+            mask = np.zeros(len(positions), dtype=bool)
+            if column:
+                for value in values:
+                    mask |= column.term_mask(positions, value)
+            return mask
+
+        if query_type == "range":
+            field, bounds = next(iter(spec.items()))
+            column = self.index.column(field)
+            values = column.numeric(positions) if column else None
+            if values is None:
+                return np.zeros(len(positions), dtype=bool)
+            mask = np.ones(len(positions), dtype=bool)
+            is_date = column.field_type == "date"
+            for operator, value in bounds.items():
+                if operator in ("format", "time_zone", "boost"):
+                    continue
+                bound = parse_date_ms(value) if is_date else float(value)
+                if operator == "gte":
+                    mask &= values >= bound
+                elif operator == "gt":
+                    mask &= values > bound
+                elif operator == "lte":
+                    mask &= values <= bound
+                elif operator == "lt":
+                    mask &= values < bound
+            return mask
+
+        if query_type == "function_score":
+            return self.evaluate(spec.get("query"), positions)
+
+        if query_type == "ids":
+            # _id é a posição com zeros à esquerda (SyntheticIndex.document_id)
+            wanted = [int(value) for value in spec.get("values", []) if str(value).isdigit()]
+            return np.isin(positions, np.array(wanted, dtype=np.int64))
+
+        if query_type == "exists":
+            column = self.index.column(spec["field"])
+            return column.exists_mask(positions) if column else np.zeros(len(positions), dtype=bool)
+
+        raise QueryError(f"Query '{query_type}' não suportada pelo fake")
+
+    def match(self, body: Dict[str, Any]) -> np.ndarray:
+        """Posições (ordenadas) dos documentos que casam com a query do body"""
+        query = body.get("query") or {"match_all": {}}
+        lo, hi = self.time_bounds(query)
+        positions = np.arange(lo, hi, dtype=np.int64)
+        return positions[self.evaluate(query, positions)]
+
+    # ---- Sort e hits ----
+
+    def sort_value(self, field: str, position: int) -> Any:
+        if field == "_id":
+            return self.index.document_id(position)
+        if field in ("_doc", "_score"):
+            return position
+        column = self.index.column(field)
+        values = column.numeric(np.array([position])) if column else None
+        if values is None:
+            return None
+        value = values[0].item()
+        return int(value) if column.field_type in ("date", "long") else value
+
+    def order(self, positions: np.ndarray, sort: List[Tuple[str, str]], search_after: Optional[list], limit: int) -> np.ndarray:
+        """Ordena as posições pelo sort (apenas os `limit` primeiros), aplicando search_after"""
+        primary, direction = sort[0] if sort else ("_doc", "asc")
+        descending = direction == "desc"
+
+        if primary in ("@timestamp", "_doc", "_id", "_score"):
+            # Posição é monotônica em @timestamp e no _id
+            if search_after:
+                if primary == "@timestamp" and len(search_after) == 1:
+                    timestamps = self.index.timestamps[positions]
+                    cursor = parse_date_ms(search_after[0])
+                    positions = positions[timestamps < cursor] if descending else positions[timestamps > cursor]
+                else:
+                    last = search_after[-1]
+                    cursor = int(last) if not isinstance(last, str) or last.isdigit() else 0
+                    positions = positions[positions < cursor] if descending else positions[positions > cursor]
+            ordered = positions[::-1] if descending else positions
+            return ordered[:limit]
+
+        column = self.index.column(primary)
+        values = column.numeric(positions) if column else None
+        if values is None:
+            raise QueryError(f"Sort por '{primary}' não suportado pelo fake")
+        if search_after:
+            cursor = float(search_after[0])
+            keep = values < cursor if descending else values > cursor
+            positions, values = positions[keep], values[keep]
+        keys = -values if descending else values
+        if limit < len(keys):
+            top = np.argpartition(keys, limit)[:limit]
+            top = top[np.argsort(keys[top], kind="stable")]
+        else:
+            top = np.argsort(keys, kind="stable")
+        return positions[top]
+
+    def hits(self, positions: np.ndarray, sort: List[Tuple[str, str]], source: Any) -> List[Dict[str, Any]]:
+        if source is False:
+            documents = [None] * len(positions)
+        else:
+            includes = None
+            if isinstance(source, list):
+                includes = source
+            elif isinstance(source, str):
+                includes = [source]
+            elif isinstance(source, dict):
+                includes = as_list(source.get("includes")) or None
+            documents = self.index.sources(positions, includes)
+
+        hits = []
+        for position, document in zip(positions.tolist(), documents):
+            hit = {"_index": self.index.name, "_id": self.index.document_id(position), "_score": None if sort else 1.0}
+            if document is not None:
+                hit["_source"] = document
+            if sort:
+                hit["sort"] = [self.sort_value(field, position) for field, _ in sort]
+            hits.append(hit)
+        return hits
+
+    # ---- Agregações ----
+
+    def aggregate(self, aggs: Dict[str, Any], positions: np.ndarray) -> Dict[str, Any]:
+        return {name: self.aggregation(spec, positions) for name, spec in aggs.items()}
+
+    def sub_aggregations(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        return spec.get("aggs") or spec.get("aggregations") or {}
+
+    def aggregation(self, spec: Dict[str, Any], positions: np.ndarray) -> Dict[str, Any]:
+        sub_aggs = self.sub_aggregations(spec)
+        agg_type = next(key for key in spec if key not in ("aggs", "aggregations", "meta"))
+        params = spec[agg_type]
+
+        if agg_type == "filter":
+            matched = positions[self.evaluate(params, positions)]
+            return {"doc_count": int(len(matched)), **self.aggregate(sub_aggs, matched)}
+
+        if agg_type == "top_hits":
+            sort = parse_sort(params.get("sort"))
+            top = self.order(positions, sort, None, int(params.get("size", 3)))
+            return {
+                "hits": {
+                    "total": {"value": int(len(positions)), "relation": "eq"},
+                    "max_score": None,
+                    "hits": self.hits(top, sort, params.get("_source", True))
+                }
+            }
+
+        column = self.index.column(params["field"])
+
+        if agg_type == "terms":
+            return self.terms(column, params, sub_aggs, positions)
+
+        if agg_type == "date_histogram":
+            return self.date_histogram(column, params, sub_aggs, positions)
+
+        if agg_type in ("cardinality", "value_count"):
+            if column is None:
+                return {"value": 0}
+            exists = positions[column.exists_mask(positions)]
+            if agg_type == "value_count":
+                return {"value": int(len(exists))}
+            keys, _ = column.group_keys(exists)
+            return {"value": int(len(np.unique(keys)))}
+
+        values = column.numeric(positions) if column else None
+        if values is None:
+            values = np.empty(0)
+
+        if agg_type == "percentiles":
+            percents = params.get("percents", [1, 5, 25, 50, 75, 95, 99])
+            results = np.percentile(values, percents) if len(values) else [None] * len(percents)
+            return {"values": {str(float(percent)): (None if value is None else float(value)) for percent, value in zip(percents, results)}}
+
+        if agg_type in ("min", "max", "avg", "sum"):
+            if len(values) == 0:
+                return {"value": 0.0 if agg_type == "sum" else None}
+            value = float({"min": np.min, "max": np.max, "avg": np.mean, "sum": np.sum}[agg_type](values))
+            result = {"value": value}
+            if column.field_type == "date" and agg_type in ("min", "max"):
+                result["value_as_string"] = format_epoch_millis(value)
+            return result
+
+        raise QueryError(f"Agregação '{agg_type}' não suportada pelo fake")
+
+    def buckets_by_key(self, keys: np.ndarray, positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, List[np.ndarray]]:
+        """Agrupa posições por chave com uma única ordenação (chaves únicas, contagens, posições)"""
+        unique, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        order = np.argsort(inverse, kind="stable")
+        groups = np.split(positions[order], np.cumsum(counts)[:-1]) if len(unique) else []
+        return unique, counts, groups
+
+    def terms(self, column, params, sub_aggs, positions) -> Dict[str, Any]:
+        if column is None:
+            return {"doc_count_error_upper_bound": 0, "sum_other_doc_count": 0, "buckets": []}
+
+        exists = positions[column.exists_mask(positions)]
+        keys, label = column.group_keys(exists)
+        unique, counts, groups = self.buckets_by_key(keys, exists)
+
+        order = params.get("order", {"_count": "desc"})
+        if "_key" in order:
+            ranking = np.arange(len(unique))
+            if order["_key"] == "desc":
+                ranking = ranking[::-1]
+        else:
+            ranking = np.lexsort((np.arange(len(unique)), -counts if order.get("_count", "desc") == "desc" else counts))
+
+        size = int(params.get("size", 10))
+        buckets = []
+        for bucket_index in ranking[:size]:
+            key, key_as_string = label(unique[bucket_index].item())
+            bucket = {"key": key, "doc_count": int(counts[bucket_index])}
+            if key_as_string is not None:
+                bucket["key_as_string"] = key_as_string
+            bucket.update(self.aggregate(sub_aggs, groups[bucket_index]))
+            buckets.append(bucket)
+
+        return {
+            "doc_count_error_upper_bound": 0,
+            "sum_other_doc_count": int(counts.sum() - sum(bucket["doc_count"] for bucket in buckets)),
+            "buckets": buckets
+        }
+
+    def date_histogram(self, column, params, sub_aggs, positions) -> Dict[str, Any]:
+        interval = params.get("fixed_interval") or params.get("calendar_interval") or params.get("interval")
+        interval_ms = parse_interval_ms(interval)
+        timestamps = column.numeric(positions).astype(np.int64) if column else np.empty(0, dtype=np.int64)
+        keys = timestamps - timestamps % interval_ms
+        unique, counts, groups = self.buckets_by_key(keys, positions)
+        by_key = {int(key): (int(count), group) for key, count, group in zip(unique, counts, groups)}
+
+        min_doc_count = int(params.get("min_doc_count", 0))
+        bounds = params.get("extended_bounds") or {}
+        first = [int(unique[0])] if len(unique) else []
+        last = [int(unique[-1])] if len(unique) else []
+        if "min" in bounds:
+            first.append(parse_date_ms(bounds["min"]) // interval_ms * interval_ms)
+        if "max" in bounds:
+            last.append(parse_date_ms(bounds["max"]) // interval_ms * interval_ms)
+
+        buckets = []
+        if first and last:
+            empty = np.empty(0, dtype=np.int64)
+            for key in range(min(first), max(last) + 1, interval_ms):
+                count, group = by_key.get(key, (0, empty))
+                if count < min_doc_count:
+                    continue
+                bucket = {"key_as_string": format_epoch_millis(key), "key": key, "doc_count": count}
+                bucket.update(self.aggregate(sub_aggs, group))
+                buckets.append(bucket)
+        return {"buckets": buckets}
+
+    # ---- Busca ----
+
+    def search(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Executa um body de _search e retorna (resposta parcial, tempos em ns para o profile)"""
+        started = time.perf_counter_ns()
+        matched = self.match(body)
+
+        terminated_early = False
+        terminate_after = body.get("terminate_after")
+        if terminate_after and len(matched) > int(terminate_after):
+            matched = matched[:int(terminate_after)]
+            terminated_early = True
+        query_ns = time.perf_counter_ns() - started
+
+        sort = parse_sort(body.get("sort"))
+        start = int(body.get("from", 0))
+        size = int(body.get("size", 10))
+        random_score = (body.get("query") or {}).get("function_score", {}).get("random_score")
+        if random_score is not None and not sort:
+            # Ordem pseudoaleatória determinística pela semente, como o random_score
+            shuffled = np.random.default_rng(int(random_score.get("seed", 0))).permutation(matched)
+            ordered = shuffled[:start + size][start:]
+        else:
+            ordered = self.order(matched, sort, body.get("search_after"), start + size)[start:]
+        hits = self.hits(ordered, sort, body.get("_source", True))
+        collector_ns = time.perf_counter_ns() - started - query_ns
+
+        aggregations = self.aggregate(body.get("aggs") or body.get("aggregations") or {}, matched)
+        aggregations_ns = time.perf_counter_ns() - started - query_ns - collector_ns
+
+        return {
+            "total": int(len(matched)),
+            "hits": hits,
+            "aggregations": aggregations,
+            "terminated_early": terminated_early,
+            "timings": {"query": query_ns, "collector": collector_ns, "aggregations": aggregations_ns}
+        }
+
+
+class FakeOpenSearch(FakeServer):
+    """
+    OpenSearch fake com índices sintéticos de logs e traces
+
+    Args:
+        requests: Requisições sintéticas (geram 2 spans e 1 log cada)
+        days: Período coberto pelos dados, terminando em `anchor`
+        clients: Número de clientIds distintos
+        seed: Semente dos dados e da injeção de falhas
+        anchor: Fim do período (padrão: agora)
+        faults: Latência e erros injetados
+        logs_index / traces_index: Nomes base (alias) dos índices
+    """
+
+    def __init__(
+        self,
+        requests: int = 100_000,
+        days: float = 7,
+        clients: int = 1000,
+        seed: int = 42,
+        anchor: Optional[datetime] = None,
+        faults: Optional[FaultInjector] = None,
+        logs_index: str = "logs-banking-api",
+        traces_index: str = "traces-banking-api",
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        super().__init__(faults, host, port)
+        end = anchor or datetime.now(timezone.utc)
+        end_ms = int(end.timestamp() * 1000)
+        start_ms = int((end - timedelta(days=days)).timestamp() * 1000)
+
+        table = generate_requests(requests, start_ms, end_ms, clients, seed)
+        self.indices = {
+            logs_index: SearchEngine(build_logs_index(logs_index, table, seed)),
+            traces_index: SearchEngine(build_traces_index(traces_index, table, seed))
+        }
+        self.pits: Dict[str, List[str]] = {}
+
+    def injected_error_payload(self) -> Any:
+        return QueryError("Injected error", "fake_injected_exception", self.faults.error_status).payload()
+
+    def route_name(self, method: str, path: str) -> str:
+        # Agrupa as estatísticas por endpoint (_search, _msearch...), sem o nome do índice
+        endpoint = next((part for part in path.split("/") if part.startswith("_")), "/")
+        return f"{method} {endpoint}"
+
+    def resolve(self, expression: Optional[str], ignore_unavailable: bool) -> List[SearchEngine]:
+        """Resolve nomes/aliases/índices diários/curingas para os índices sintéticos (sem repetição)"""
+        names = (expression or "_all").split(",")
+        resolved: List[SearchEngine] = []
+
+        for name in names:
+            if name in ("_all", "*"):
+                candidates = list(self.indices.values())
+            elif "*" in name:
+                pattern = re.compile(re.escape(name).replace(r"\*", ".*"))
+                candidates = [engine for base, engine in self.indices.items() if pattern.fullmatch(base) or pattern.fullmatch(base + "-2000.01.01")]
+            else:
+                base = DAILY_SUFFIX.sub("", name)
+                candidates = [self.indices[base]] if base in self.indices else []
+
+            if not candidates and not ignore_unavailable and "*" not in name:
+                raise QueryError(f"no such index [{name}]", "index_not_found_exception", 404)
+            resolved.extend(engine for engine in candidates if engine not in resolved)
+        return resolved
+
+    def search(self, expression: Optional[str], body: Dict[str, Any], params: Dict[str, str]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        pit = body.get("pit")
+        if pit:
+            if pit["id"] not in self.pits:
+                raise QueryError("No search context found for id", "search_context_missing_exception", 404)
+            engines = self.resolve(",".join(self.pits[pit["id"]]), True)
+        else:
+            engines = self.resolve(expression, params.get("ignore_unavailable") == "true")
+
+        if len(engines) > 1 and (body.get("aggs") or body.get("aggregations")):
+            raise QueryError("Agregações em mais de um índice sintético não são suportadas pelo fake")
+
+        if "track_total_hits" in params:
+            body = {**body, "track_total_hits": json.loads(params["track_total_hits"])}
+
+        results = [engine.search(body) for engine in engines]
+        sort = parse_sort(body.get("sort"))
+        hits = [hit for result in results for hit in result["hits"]]
+        if len(results) > 1:
+            descending = bool(sort) and sort[0][1] == "desc"
+            hits.sort(key=lambda hit: hit.get("sort", [0])[0], reverse=descending)
+            hits = hits[:int(body.get("size", 10))]
+
+        total = sum(result["total"] for result in results)
+        response: Dict[str, Any] = {
+            "took": int((time.perf_counter() - started) * 1000),
+            "timed_out": False,
+            "_shards": {"total": len(engines), "successful": len(engines), "skipped": 0, "failed": 0},
+            "hits": {"max_score": None, "hits": hits}
+        }
+
+        track_total_hits = body.get("track_total_hits", DEFAULT_TRACK_TOTAL_HITS)
+        if track_total_hits is True:
+            response["hits"]["total"] = {"value": total, "relation": "eq"}
+        elif track_total_hits is not False:
+            limit = int(track_total_hits)
+            response["hits"]["total"] = {"value": min(total, limit), "relation": "eq" if total <= limit else "gte"}
+
+        if results and results[0]["aggregations"]:
+            response["aggregations"] = results[0]["aggregations"]
+        if any(result["terminated_early"] for result in results):
+            response["terminated_early"] = True
+        if pit:
+            response["pit_id"] = pit["id"]
+        if body.get("profile"):
+            response["profile"] = self.profile(engines, results, body)
+        return response
+
+    def profile(self, engines: List[SearchEngine], results: List[Dict[str, Any]], body: Dict[str, Any]) -> Dict[str, Any]:
+        """Profile no formato do OpenSearch com os tempos medidos no fake (um shard por índice)"""
+        return {
+            "shards": [
+                {
+                    "id": f"[fake][{engine.index.name}][0]",
+                    "searches": [{
+                        "query": [{
+                            "type": next(iter(body.get("query") or {"match_all": {}})),
+                            "description": json.dumps(body.get("query") or {})[:500],
+                            "time_in_nanos": result["timings"]["query"],
+                            "children": []
+                        }],
+                        "rewrite_time": 0,
+                        "collector": [{"name": "FakeCollector", "reason": "search_top_hits", "time_in_nanos": result["timings"]["collector"]}]
+                    }],
+                    "aggregations": [
+                        {"type": "FakeAggregator", "description": name, "time_in_nanos": result["timings"]["aggregations"]}
+                        for name in (body.get("aggs") or {})
+                    ],
+                    "fetch": {"type": "fetch", "time_in_nanos": 0}
+                }
+                for engine, result in zip(engines, results)
+            ]
+        }
+
+    def field_caps(self, expression: Optional[str], fields: str) -> Dict[str, Any]:
+        engines = self.resolve(expression, True)
+        patterns = [re.compile(re.escape(field).replace(r"\*", ".*")) for field in fields.split(",")]
+        caps: Dict[str, Dict[str, Any]] = {}
+
+        for engine in engines:
+            for field, column in engine.index.columns.items():
+                if not any(pattern.fullmatch(field) for pattern in patterns):
+                    continue
+                field_type = column.field_type
+                caps.setdefault(field, {})[field_type] = {
+                    "type": field_type,
+                    "searchable": True,
+                    "aggregatable": field_type != "text"
+                }
+        return {"indices": [engine.index.name for engine in engines], "fields": caps}
+
+    def handle(self, method: str, path: str, params: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        parts = [part for part in path.split("/") if part]
+        try:
+            if not parts:
+                return 200, {"name": "fake-opensearch", "cluster_name": "fake", "version": {"distribution": "opensearch", "number": "2.11.0"}}
+
+            index = None if parts[0].startswith("_") else parts[0]
+            endpoint = parts[1:] if index else parts
+
+            if endpoint == ["_search", "point_in_time"]:
+                if method == "DELETE":
+                    ids = as_list(parse_json(body).get("pit_id"))
+                    return 200, {"pits": [{"pit_id": pit_id, "successful": self.pits.pop(pit_id, None) is not None} for pit_id in ids]}
+                engines = self.resolve(index, False)
+                pit_id = base64.urlsafe_b64encode(f"{index}:{time.time_ns()}".encode()).decode()
+                self.pits[pit_id] = [engine.index.name for engine in engines]
+                return 200, {"pit_id": pit_id, "_shards": {"total": len(engines), "successful": len(engines), "failed": 0}, "creation_time": int(time.time() * 1000)}
+
+            if endpoint == ["_search"]:
+                return 200, self.search(index, parse_json(body), params)
+
+            if endpoint == ["_count"]:
+                response = self.search(index, {**parse_json(body), "size": 0, "track_total_hits": True}, params)
+                return 200, {"count": response["hits"]["total"]["value"], "_shards": response["_shards"]}
+
+            if endpoint == ["_msearch"]:
+                lines = [line for line in body.decode().splitlines() if line.strip()]
+                responses = []
+                for header_line, body_line in zip(lines[0::2], lines[1::2]):
+                    header = json.loads(header_line)
+                    header_params = {key: str(value).lower() for key, value in header.items() if key != "index"}
+                    try:
+                        responses.append({**self.search(header.get("index", index), json.loads(body_line), header_params), "status": 200})
+                    except QueryError as e:
+                        responses.append(e.payload())
+                return 200, {"took": 0, "responses": responses}
+
+            if endpoint == ["_field_caps"]:
+                return 200, self.field_caps(index, params.get("fields") or parse_json(body).get("fields", "*"))
+
+            raise QueryError(f"Endpoint não suportado pelo fake: {method} {path}", "illegal_argument_exception")
+        except QueryError as e:
+            return e.status, e.payload()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenSearch fake com logs/traces sintéticos")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--requests", type=int, default=100_000, help="Requisições sintéticas (2 spans + 1 log cada)")
+    parser.add_argument("--days", type=float, default=7)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0)
+    args = parser.parse_args()
+
+    fake = FakeOpenSearch(
+        requests=args.requests,
+        days=args.days,
+        clients=args.clients,
+        seed=args.seed,
+        faults=FaultInjector(args.latency_ms, args.jitter_ms, args.error_rate, seed=args.seed),
+        host=args.host,
+        port=args.port
+    ).start()
+    print(f"OpenSearch fake em {fake.url} ({args.requests * 3} documentos)")
+    try:
+        fake.thread.join()
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+"""
+Documentos sintéticos no formato gravado pelo OTel Collector (mapping mode "none")
+
+Gera uma tabela de requisições com NumPy (semente fixa) e deriva dela os spans
+(root + span de banco por requisição) e os logs (uma linha por requisição), com
+os mesmos correlationId/clientId/TraceId, como na stack real. Os dados ficam em
+colunas; o _source de um documento só é montado quando ele é retornado, então o
+volume pode chegar a milhões de documentos.
+"""
+import hashlib
+import re
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+# Operações da Banking API: peso no tráfego, latência mediana, taxa de erro e os
+# message templates (sucesso e erro) dos logs do Serilog
+OPERATIONS = [
+    {
+        "name": "TransferFunds", "weight": 0.35, "median_ms": 45.0, "error_rate": 0.08,
+        "db_span": "Database.Transaction",
+        "success": "Transfer completed: FromAccountId: {FromAccountId}, ToAccountId: {ToAccountId}, Amount: {Amount}, TransactionId: {TransactionId}",
+        "errors": [
+            ("Warning", "Insufficient funds: FromAccountId: {FromAccountId}, Balance: {Balance}, Amount: {Amount}"),
+            ("Warning", "From account not found: {FromAccountId}"),
+            ("Error", "Error processing transfer: FromAccountId: {FromAccountId}, ToAccountId: {ToAccountId}, Amount: {Amount}")
+        ]
+    },
+    {
+        "name": "GetBalance", "weight": 0.30, "median_ms": 8.0, "error_rate": 0.02,
+        "db_span": "Database.Query",
+        "success": "Balance retrieved: AccountId: {AccountId}, Balance: {Balance}",
+        "errors": [("Warning", "Account not found: {AccountId}")]
+    },
+    {
+        "name": "ListTransactions", "weight": 0.12, "median_ms": 25.0, "error_rate": 0.02,
+        "db_span": "Database.Query",
+        "success": "Transactions listed: AccountId: {AccountId}, Count: {Count}",
+        "errors": [("Warning", "Account not found: {AccountId}")]
+    },
+    {
+        "name": "CreateUser", "weight": 0.08, "median_ms": 30.0, "error_rate": 0.03,
+        "db_span": "Database.Transaction",
+        "success": "User and account created: UserId: {UserId}, AccountId: {AccountId}, Email: {Email}, InitialBalance: {InitialBalance}",
+        "errors": [("Warning", "User already exists with email: {Email}")]
+    },
+    {
+        "name": "CreateAccount", "weight": 0.05, "median_ms": 20.0, "error_rate": 0.02,
+        "db_span": "Database.Transaction",
+        "success": "Account created: AccountId: {AccountId}, UserId: {UserId}, InitialBalance: {InitialBalance}",
+        "errors": [("Warning", "User not found for account creation: {Email}")]
+    },
+    {
+        "name": "Login", "weight": 0.07, "median_ms": 12.0, "error_rate": 0.05,
+        "db_span": "Database.Query",
+        "success": "User logged in successfully: {Email}, UserId: {UserId}",
+        "errors": [("Warning", "Invalid login attempt for email: {Email}")]
+    },
+    {
+        "name": "Ping", "weight": 0.03, "median_ms": 1.0, "error_rate": 0.0,
+        "db_span": "Database.Query",
+        "success": "Health check requested",
+        "errors": []
+    }
+]
+
+SEVERITIES = ["Information", "Warning", "Error"]
+SEVERITY_NUMBERS = {"Information": 9, "Warning": 13, "Error": 17}
+
+# Primeiro clientId gerado (os ids seguem sequenciais a partir dele)
+FIRST_CLIENT_ID = 10000
+
+PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+class Column:
+    """Coluna de um índice sintético (subclasses implementam o acesso vetorizado)"""
+
+    # Tipo reportado em _field_caps
+    field_type = "keyword"
+
+    def source_values(self, positions: np.ndarray) -> List[Any]:
+        """Valores do _source para as posições (None = campo ausente no documento)"""
+        raise NotImplementedError
+
+    def term_mask(self, positions: np.ndarray, value: Any) -> np.ndarray:
+        raise NotImplementedError
+
+    def exists_mask(self, positions: np.ndarray) -> np.ndarray:
+        return np.ones(len(positions), dtype=bool)
+
+    def numeric(self, positions: np.ndarray) -> Optional[np.ndarray]:
+        """Valores numéricos (para range, sort e métricas) ou None se a coluna não for numérica"""
+        return None
+
+    def group_keys(self, positions: np.ndarray):
+        """Chaves inteiras para agregação terms e função chave -> (key, key_as_string)"""
+        raise NotImplementedError
+
+
+class CategoricalColumn(Column):
+    """Poucos valores distintos guardados como códigos (Name, SeverityText, is_error...)"""
+
+    def __init__(self, codes: np.ndarray, labels: List[Any], field_type: str = "keyword"):
+        self.codes = codes
+        self.labels = labels
+        self.field_type = field_type
+        self.lookup = {self._normalize(label): code for code, label in enumerate(labels)}
+
+    def _normalize(self, value: Any) -> Any:
+        if self.field_type == "boolean":
+            return str(value).lower()
+        return str(value)
+
+    def source_values(self, positions):
+        return [self.labels[code] for code in self.codes[positions]]
+
+    def term_mask(self, positions, value):
+        code = self.lookup.get(self._normalize(value))
+        if code is None:
+            return np.zeros(len(positions), dtype=bool)
+        return self.codes[positions] == code
+
+    def numeric(self, positions):
+        if self.field_type in ("long", "boolean"):
+            return np.array(self.labels, dtype=np.float64)[self.codes[positions]]
+        return None
+
+    def group_keys(self, positions):
+        def label(code):
+            value = self.labels[code]
+            if self.field_type == "boolean":
+                # Agregações terms em boolean retornam key 0/1
+                return int(value), str(value).lower()
+            return value, None
+        return self.codes[positions].astype(np.int64), label
+
+
+class NumericColumn(Column):
+    """Valores numéricos; datas são epoch millis"""
+
+    def __init__(self, values: np.ndarray, field_type: str = "double"):
+        self.values = values
+        self.field_type = field_type
+
+    def source_values(self, positions):
+        values = self.values[positions]
+        if self.field_type == "date":
+            return [format_epoch_millis(value) for value in values]
+        return values.tolist()
+
+    def term_mask(self, positions, value):
+        return self.values[positions] == float(value)
+
+    def numeric(self, positions):
+        return self.values[positions].astype(np.float64)
+
+    def group_keys(self, positions):
+        keys, inverse = np.unique(self.values[positions], return_inverse=True)
+        return inverse.astype(np.int64), lambda index: (keys[index].item(), None)
+
+
+class KeyedColumn(Column):
+    """
+    Identificadores derivados de uma chave inteira (TraceId, correlationId, clientId...)
+
+    Chave -1 representa string vazia e -2 campo ausente.
+    """
+
+    def __init__(self, keys: np.ndarray, format_key: Callable[[int], str], parse_key: Callable[[str], Optional[int]]):
+        self.keys = keys
+        self.format_key = format_key
+        self.parse_key = parse_key
+
+    def _format(self, key: int) -> Optional[str]:
+        if key == -2:
+            return None
+        return "" if key == -1 else self.format_key(key)
+
+    def source_values(self, positions):
+        return [self._format(key) for key in self.keys[positions].tolist()]
+
+    def term_mask(self, positions, value):
+        key = -1 if value == "" else self.parse_key(str(value))
+        if key is None:
+            return np.zeros(len(positions), dtype=bool)
+        return self.keys[positions] == key
+
+    def exists_mask(self, positions):
+        return self.keys[positions] != -2
+
+    def group_keys(self, positions):
+        keys = self.keys[positions]
+        return keys, lambda key: (self._format(key), None)
+
+
+class TemplateColumn(Column):
+    """Mensagem renderizada (Body) a partir do template e da chave da requisição"""
+
+    field_type = "text"
+
+    def __init__(self, template_codes: np.ndarray, templates: List[str], request_keys: np.ndarray,
+                 client_keys: np.ndarray, seed: int):
+        self.template_codes = template_codes
+        self.templates = templates
+        self.request_keys = request_keys
+        self.client_keys = client_keys
+        self.seed = seed
+
+    def source_values(self, positions):
+        return [
+            render_template(self.templates[code], int(request_key), int(client_key), self.seed)
+            for code, request_key, client_key in zip(
+                self.template_codes[positions], self.request_keys[positions], self.client_keys[positions]
+            )
+        ]
+
+    def term_mask(self, positions, value):
+        # Campo text (analisado): term com a mensagem inteira não casa, como no OpenSearch
+        return np.zeros(len(positions), dtype=bool)
+
+    def group_keys(self, positions):
+        raise ValueError("Campo text não suporta agregação terms")
+
+
+class ConstantColumn(Column):
+    """Mesmo valor em todos os documentos (ex: service.name)"""
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def source_values(self, positions):
+        return [self.value] * len(positions)
+
+    def term_mask(self, positions, value):
+        return np.full(len(positions), str(value) == str(self.value))
+
+    def group_keys(self, positions):
+        return np.zeros(len(positions), dtype=np.int64), lambda key: (self.value, None)
+
+
+def format_epoch_millis(value: int) -> str:
+    """epoch millis -> ISO 8601 UTC com milissegundos (formato do @timestamp)"""
+    return datetime.fromtimestamp(int(value) / 1000, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def derived_uuid(seed: int, kind: str, key: int) -> str:
+    """GUID determinístico para uma entidade (conta, usuário, transação) de uma requisição"""
+    return str(uuid.UUID(bytes=hashlib.md5(f"{seed}:{kind}:{key}".encode()).digest()))
+
+
+def render_template(template: str, request_key: int, client_key: int, seed: int) -> str:
+    """Renderiza um message template com valores derivados da requisição"""
+    values = {
+        "FromAccountId": lambda: derived_uuid(seed, "from", request_key),
+        "ToAccountId": lambda: derived_uuid(seed, "to", request_key),
+        "AccountId": lambda: derived_uuid(seed, "account", request_key),
+        "UserId": lambda: derived_uuid(seed, "user", client_key),
+        "TransactionId": lambda: derived_uuid(seed, "transaction", request_key),
+        "Amount": lambda: f"{request_key * 37 % 5000 + 1}.00",
+        "Balance": lambda: f"{request_key * 53 % 10000}.00",
+        "Count": lambda: str(request_key % 40),
+        "Email": lambda: f"\"user{FIRST_CLIENT_ID + client_key}@example.com\"",
+        "InitialBalance": lambda: "1000.00"
+    }
+    return PLACEHOLDER.sub(lambda match: values[match.group(1)](), template)
+
+
+class SyntheticIndex:
+    """Índice sintético: colunas por campo, ordenadas por @timestamp"""
+
+    def __init__(self, name: str, columns: Dict[str, Column]):
+        self.name = name
+        self.columns = columns
+        self.timestamps = columns["@timestamp"].values
+        self.size = len(self.timestamps)
+
+    def column(self, field: str) -> Optional[Column]:
+        """Resolve um campo (aceita o sufixo .keyword usado por mappings dinâmicos)"""
+        if field.endswith(".keyword"):
+            field = field[:-len(".keyword")]
+        return self.columns.get(field)
+
+    def document_id(self, position: int) -> str:
+        # Zero à esquerda: ordem lexicográfica do _id = ordem de @timestamp
+        return f"{position:012d}"
+
+    def sources(self, positions: np.ndarray, includes: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Monta o _source (com Attributes/Resource aninhados) apenas dos campos pedidos"""
+        fields = [field for field in self.columns if includes is None or field_included(field, includes)]
+        columns = {field: self.columns[field].source_values(positions) for field in fields}
+
+        documents = []
+        for row in range(len(positions)):
+            document: Dict[str, Any] = {}
+            for field in fields:
+                value = columns[field][row]
+                if value is None:
+                    continue
+                prefix, _, rest = field.partition(".")
+                if rest and prefix in ("Attributes", "Resource"):
+                    document.setdefault(prefix, {})[rest] = value
+                else:
+                    document[field] = value
+            documents.append(document)
+        return documents
+
+
+def field_included(field: str, includes: List[str]) -> bool:
+    """Filtro de _source: campo exato, objeto pai (ex: Attributes) ou curinga"""
+    for pattern in includes:
+        if pattern == field or field.startswith(pattern + "."):
+            return True
+        if "*" in pattern and re.fullmatch(re.escape(pattern).replace(r"\*", ".*"), field):
+            return True
+    return False
+
+
+def generate_requests(requests: int, start_ms: int, end_ms: int, clients: int, seed: int) -> Dict[str, np.ndarray]:
+    """
+    Tabela de requisições (ordenada por tempo): operação, cliente, duração e erro
+
+    Os clientes seguem uma distribuição enviesada (poucos clientes concentram o
+    tráfego) e as durações são log-normais em torno da mediana de cada operação.
+    """
+    rng = np.random.default_rng(seed)
+    weights = np.array([operation["weight"] for operation in OPERATIONS])
+
+    operation = rng.choice(len(OPERATIONS), size=requests, p=weights / weights.sum()).astype(np.int16)
+    medians = np.array([operation["median_ms"] for operation in OPERATIONS])[operation]
+    error_rates = np.array([operation["error_rate"] for operation in OPERATIONS])[operation]
+
+    return {
+        "timestamp": np.sort(rng.integers(start_ms, end_ms, size=requests, dtype=np.int64)),
+        "operation": operation,
+        "client": (clients * rng.random(requests) ** 2).astype(np.int64),
+        "duration_ms": np.round(rng.lognormal(np.log(medians), 0.6), 3),
+        "is_error": rng.random(requests) < error_rates,
+        "variant": rng.integers(0, 1 << 16, size=requests, dtype=np.int64)
+    }
+
+
+def key_parser(pattern: str, base: int = 10, offset: int = 0) -> Callable[[str], Optional[int]]:
+    """Inverso do formato de um KeyedColumn: extrai a chave do identificador (None se não casar)"""
+    compiled = re.compile(pattern)
+
+    def parse(value: str) -> Optional[int]:
+        match = compiled.fullmatch(value)
+        return int(match.group(1), base) - offset if match else None
+    return parse
+
+
+def span_id_column(keys: np.ndarray) -> KeyedColumn:
+    return KeyedColumn(keys, lambda key: f"{key:016x}", key_parser(r"([0-9a-f]{16})", base=16))
+
+
+def identifier_columns(request_keys: np.ndarray, client_keys: np.ndarray, seed: int) -> Dict[str, Column]:
+    """correlationId/clientId (campos promovidos e em Attributes) e TraceId"""
+    trace_prefix = f"{seed & 0xFFFFFFFF:08x}"
+
+    correlation = KeyedColumn(request_keys, lambda key: f"bench-{key:09d}", key_parser(r"bench-(\d+)"))
+    client = KeyedColumn(
+        client_keys, lambda key: str(FIRST_CLIENT_ID + key), key_parser(r"(\d+)", offset=FIRST_CLIENT_ID)
+    )
+    trace = KeyedColumn(
+        request_keys, lambda key: f"{trace_prefix}{key:024x}", key_parser(trace_prefix + r"([0-9a-f]{24})", base=16)
+    )
+
+    return {
+        "correlationId": correlation,
+        "clientId": client,
+        "Attributes.correlationId": correlation,
+        "Attributes.clientId": client,
+        "TraceId": trace
+    }
+
+
+def build_traces_index(name: str, requests: Dict[str, np.ndarray], seed: int) -> SyntheticIndex:
+    """Dois spans por requisição: o root (nome da operação) e o span de banco (filho)"""
+    count = len(requests["timestamp"]) * 2
+    request_keys = np.repeat(np.arange(len(requests["timestamp"]), dtype=np.int64), 2)
+    is_child = np.tile(np.array([False, True]), len(requests["timestamp"]))
+
+    operation = np.repeat(requests["operation"], 2)
+    db_names = sorted({operation["db_span"] for operation in OPERATIONS})
+    names = [operation["name"] for operation in OPERATIONS] + db_names
+    db_codes = np.array([len(OPERATIONS) + db_names.index(operation["db_span"]) for operation in OPERATIONS])
+    name_codes = np.where(is_child, db_codes[operation], operation).astype(np.int16)
+
+    duration_ms = np.repeat(requests["duration_ms"], 2)
+    duration_ms = np.where(is_child, np.round(duration_ms * 0.6, 3), duration_ms)
+    is_error = np.repeat(requests["is_error"], 2)
+    positions = np.arange(count, dtype=np.int64)
+
+    columns: Dict[str, Column] = {
+        "@timestamp": NumericColumn(np.repeat(requests["timestamp"], 2), "date"),
+        "Name": CategoricalColumn(name_codes, names),
+        "Kind": CategoricalColumn(is_child.astype(np.int16), ["Server", "Internal"]),
+        "duration_ms": NumericColumn(duration_ms, "double"),
+        "Duration": NumericColumn((duration_ms * 1_000_000).astype(np.int64), "long"),
+        "TraceStatus": CategoricalColumn(np.where(is_error, 2, 0).astype(np.int16), [0, 1, 2], "long"),
+        "is_error": CategoricalColumn(is_error.astype(np.int16), [False, True], "boolean"),
+        "SpanId": span_id_column(positions),
+        # Root spans gravam ParentSpanId vazio; o filho aponta para o root (posição anterior)
+        "ParentSpanId": span_id_column(np.where(is_child, positions - 1, -1)),
+        "Resource.service.name": ConstantColumn("BankingApi")
+    }
+    columns.update(identifier_columns(request_keys, np.repeat(requests["client"], 2), seed))
+    return SyntheticIndex(name, columns)
+
+
+def build_logs_index(name: str, requests: Dict[str, np.ndarray], seed: int) -> SyntheticIndex:
+    """Uma linha de log por requisição, com template de sucesso ou de erro da operação"""
+    templates: List[str] = []
+    template_severity: List[int] = []
+    success_codes = []
+    error_codes = []
+
+    for operation in OPERATIONS:
+        success_codes.append(len(templates))
+        templates.append(operation["success"])
+        template_severity.append(SEVERITIES.index("Information"))
+        codes = []
+        for severity, template in operation["errors"]:
+            codes.append(len(templates))
+            templates.append(template)
+            template_severity.append(SEVERITIES.index(severity))
+        error_codes.append(codes or [success_codes[-1]])
+
+    # Tabela operação x variante de erro -> template (variantes ciclam pelos templates de erro)
+    max_errors = max(len(codes) for codes in error_codes)
+    error_table = np.array([[codes[i % len(codes)] for i in range(max_errors)] for codes in error_codes])
+    operation = requests["operation"]
+    error_template = error_table[operation, requests["variant"] % max_errors]
+    template_codes = np.where(requests["is_error"], error_template, np.array(success_codes)[operation]).astype(np.int16)
+
+    severity_codes = np.array(template_severity, dtype=np.int16)[template_codes]
+    request_keys = np.arange(len(requests["timestamp"]), dtype=np.int64)
+
+    columns: Dict[str, Column] = {
+        "@timestamp": NumericColumn(requests["timestamp"], "date"),
+        "SeverityText": CategoricalColumn(severity_codes, SEVERITIES),
+        "SeverityNumber": CategoricalColumn(severity_codes, [SEVERITY_NUMBERS[severity] for severity in SEVERITIES], "long"),
+        "Body": TemplateColumn(template_codes, templates, request_keys, requests["client"], seed),
+        "Attributes.message_template.text": CategoricalColumn(template_codes, templates),
+        "SpanId": span_id_column(request_keys * 2),
+        "Resource.service.name": ConstantColumn("BankingApi")
+    }
+    columns.update(identifier_columns(request_keys, requests["client"], seed))
+    return SyntheticIndex(name, columns)
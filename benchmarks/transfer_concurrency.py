@@ -0,0 +1,161 @@
+"""
+Benchmark de concorrência de transferências em uma conta "quente"
+
+Cria uma conta quente e N contas pares via API, dispara transferências
+concorrentes nos dois sentidos (quente -> par e par -> quente) e, ao final,
+confere que o saldo de cada conta é exatamente o saldo inicial mais os créditos
+menos os débitos das transferências aceitas (200), que o total foi conservado e
+que nenhum saldo ficou negativo. Lost updates aparecem como divergência de saldo.
+
+Exemplos:
+    python transfer_concurrency.py --api-url http://localhost:5001 --transfers 5000 --concurrency 32
+    python transfer_concurrency.py --fake            # Banking API fake em processo (valida o script)
+
+Sai com código 1 se algum saldo divergir.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from fake_banking_api import FakeBankingApi
+
+
+async def create_account(client: httpx.AsyncClient, run_id: str, index: int, balance_cents: int) -> str:
+    response = await client.post("/users", json={
+        "name": f"Transfer Bench {index}",
+        "email": f"transfer-bench-{run_id}-{index}@bench.test",
+        "password": "bench",
+        "initialBalance": balance_cents / 100
+    })
+    response.raise_for_status()
+    return response.json()["accountId"]
+
+
+async def get_balance_cents(client: httpx.AsyncClient, account_id: str) -> int:
+    response = await client.get(f"/accounts/{account_id}/balance")
+    response.raise_for_status()
+    return round(response.json()["balance"] * 100)
+
+
+async def run(args) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    run_id = uuid.UUID(int=rng.getrandbits(128)).hex[:12]
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.api_url, timeout=args.timeout, limits=limits) as client:
+        hot = await create_account(client, run_id, 0, args.hot_balance * 100)
+        peers = [await create_account(client, run_id, index + 1, args.peer_balance * 100) for index in range(args.peers)]
+        initial = {hot: args.hot_balance * 100, **{peer: args.peer_balance * 100 for peer in peers}}
+
+        # Plano determinístico: (origem, destino, centavos); metade sai da conta quente
+        plan = []
+        for _ in range(args.transfers):
+            peer = rng.choice(peers)
+            amount = rng.randint(1, args.max_amount * 100)
+            plan.append((hot, peer, amount) if rng.random() < 0.5 else (peer, hot, amount))
+
+        latencies = np.zeros(len(plan))
+        statuses: List[Optional[int]] = [None] * len(plan)
+        next_transfer = 0
+
+        async def worker():
+            nonlocal next_transfer
+            while next_transfer < len(plan):
+                index = next_transfer
+                next_transfer += 1
+                source, destination, amount = plan[index]
+                started = time.perf_counter()
+                try:
+                    response = await client.post("/transactions", json={
+                        "fromAccountId": source, "toAccountId": destination, "amount": amount / 100
+                    })
+                    statuses[index] = response.status_code
+                except httpx.HTTPError:
+                    statuses[index] = 0
+                latencies[index] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+        expected = dict(initial)
+        for (source, destination, amount), status in zip(plan, statuses):
+            if status == 200:
+                expected[source] -= amount
+                expected[destination] += amount
+
+        actual = {account: await get_balance_cents(client, account) for account in initial}
+
+    mismatches = [
+        {"account": account, "expected": expected[account] / 100, "actual": actual[account] / 100}
+        for account in initial if actual[account] != expected[account]
+    ]
+    status_counts: Dict[str, int] = {}
+    for status in statuses:
+        status_counts[str(status)] = status_counts.get(str(status), 0) + 1
+
+    p50, p95, p99 = np.percentile(latencies * 1000, [50, 95, 99])
+    return {
+        "transfers": len(plan),
+        "accepted": statuses.count(200),
+        "statuses": status_counts,
+        "elapsed_s": round(elapsed, 3),
+        "transfers_per_second": round(len(plan) / elapsed, 1),
+        "p50_ms": round(p50, 2),
+        "p95_ms": round(p95, 2),
+        "p99_ms": round(p99, 2),
+        "total_conserved": sum(actual.values()) == sum(initial.values()),
+        "negative_balances": sum(1 for value in actual.values() if value < 0),
+        "balance_mismatches": mismatches
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concorrência de transferências em uma conta quente")
+    parser.add_argument("--api-url", default="http://localhost:5001")
+    parser.add_argument("--fake", action="store_true", help="Usar a Banking API fake em processo")
+    parser.add_argument("--transfers", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--peers", type=int, default=20, help="Contas que trocam transferências com a conta quente")
+    parser.add_argument("--hot-balance", type=int, default=1000, help="Saldo inicial da conta quente")
+    parser.add_argument("--peer-balance", type=int, default=200, help="Saldo inicial de cada conta par")
+    parser.add_argument("--max-amount", type=int, default=50, help="Valor máximo de cada transferência")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    fake = None
+    if args.fake:
+        fake = FakeBankingApi(users=0, seed=args.seed).start()
+        args.api_url = fake.url
+
+    try:
+        result = asyncio.run(run(args))
+    finally:
+        if fake is not None:
+            fake.stop()
+
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"Transferências: {result['transfers']} ({result['accepted']} aceitas) | status: {result['statuses']}")
+        print(f"Vazão: {result['transfers_per_second']}/s | p50 {result['p50_ms']}ms, p95 {result['p95_ms']}ms, p99 {result['p99_ms']}ms")
+        print(f"Total conservado: {result['total_conserved']} | saldos negativos: {result['negative_balances']} | divergências: {len(result['balance_mismatches'])}")
+        for mismatch in result["balance_mismatches"][:10]:
+            print(f"  {mismatch['account']}: esperado {mismatch['expected']:.2f}, atual {mismatch['actual']:.2f}")
+
+    correct = result["total_conserved"] and not result["negative_balances"] and not result["balance_mismatches"]
+    sys.exit(0 if correct else 1)
+
+
+if __name__ == "__main__":
+    main()
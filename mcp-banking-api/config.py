@@ -6,3 +6,15 @@ BANKING_API_URL = os.getenv("BANKING_API_URL", "http://banking-api:80")
 # Timeout para requisições HTTP
 HTTP_TIMEOUT = int(os.getenv("HTTP_TIMEOUT", "30"))
 
+
+# Controle de admissão: token bucket por tool e por cliente (clientId ou sessão)
+# e limite global de requisições simultâneas com fila de espera limitada. Acima da
+# fila (ou após ADMISSION_QUEUE_TIMEOUT segundos) a chamada falha com retry_after.
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "10"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "50"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "15"))
+TOOL_RATE_PER_SECOND = float(os.getenv("TOOL_RATE_PER_SECOND", "20"))
+TOOL_BURST = float(os.getenv("TOOL_BURST", "40"))
+CLIENT_RATE_PER_SECOND = float(os.getenv("CLIENT_RATE_PER_SECOND", "10"))
+CLIENT_BURST = float(os.getenv("CLIENT_BURST", "20"))
+ADMISSION_MAX_CLIENTS = int(os.getenv("ADMISSION_MAX_CLIENTS", "1000"))
@@ -16,16 +16,51 @@ from mcp.types import Tool, TextContent
 # Adicionar diretório atual ao path para imports locais
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 import config
+from admission import AdmissionController, AdmissionRejected
+from tool_registry import ToolRegistry
 
 # Criar instância do servidor MCP
 server = Server("banking-api-mcp")
 
+# Tools registradas com @registry.tool (schema, validação e handler)
+registry = ToolRegistry()
+
 # Cliente HTTP para chamadas à API
 http_client = httpx.AsyncClient(
     base_url=config.BANKING_API_URL,
     timeout=config.HTTP_TIMEOUT
 )
 
+# Controle de admissão: protege a Banking API de loops de agentes e carga concorrente
+admission_controller = AdmissionController(
+    max_concurrent=config.ADMISSION_MAX_CONCURRENT,
+    max_queue=config.ADMISSION_MAX_QUEUE,
+    queue_timeout=config.ADMISSION_QUEUE_TIMEOUT,
+    tool_rate=config.TOOL_RATE_PER_SECOND,
+    tool_burst=config.TOOL_BURST,
+    client_rate=config.CLIENT_RATE_PER_SECOND,
+    client_burst=config.CLIENT_BURST,
+    max_clients=config.ADMISSION_MAX_CLIENTS
+)
+
+
+def tracing_ids(arguments: dict[str, Any]) -> dict[str, Optional[str]]:
+    """correlation_id e client_id opcionais dos argumentos, repassados como headers por call_api()"""
+    return {
+        "correlation_id": arguments.get("correlation_id"),
+        "client_id": arguments.get("client_id")
+    }
+
+
+def admission_client_key(arguments: dict[str, Any]) -> str:
+    """Chave do token bucket de cliente: clientId dos argumentos ou a sessão MCP"""
+    if arguments.get("client_id"):
+        return f"client-{arguments['client_id']}"
+    try:
+        return f"session-{id(server.request_context.session)}"
+    except LookupError:
+        return "session"
+
 
 async def call_api(
     method: str,
@@ -42,344 +77,414 @@ async def call_api(
     if client_id:
         headers["X-Client-Id"] = client_id
     
-    try:
-        response = await http_client.request(
-            method=method,
-            url=endpoint,
-            json=json_data,
-            params=params,
-            headers=headers
-        )
-        response.raise_for_status()
-        return {
-            "status_code": response.status_code,
-            "data": response.json() if response.content else None,
-            "headers": dict(response.headers)
-        }
-    except httpx.HTTPStatusError as e:
-        error_data = None
+    async with admission_controller.slot():
         try:
-            error_data = e.response.json()
-        except:
-            error_data = {"error": e.response.text}
-        
-        return {
-            "status_code": e.response.status_code,
-            "error": error_data,
-            "headers": dict(e.response.headers)
-        }
-    except Exception as e:
-        return {
-            "status_code": 0,
-            "error": {"message": str(e)}
-        }
+            response = await http_client.request(
+                method=method,
+                url=endpoint,
+                json=json_data,
+                params=params,
+                headers=headers
+            )
+            response.raise_for_status()
+            return {
+                "status_code": response.status_code,
+                "data": response.json() if response.content else None,
+                "headers": dict(response.headers)
+            }
+        except httpx.HTTPStatusError as e:
+            error_data = None
+            try:
+                error_data = e.response.json()
+            except:
+                error_data = {"error": e.response.text}
+            
+            return {
+                "status_code": e.response.status_code,
+                "error": error_data,
+                "headers": dict(e.response.headers)
+            }
+        except Exception as e:
+            return {
+                "status_code": 0,
+                "error": {"message": str(e)}
+            }
 
 
-@server.list_tools()
-async def list_tools() -> list[Tool]:
-    """Lista todas as tools disponíveis"""
-    return [
-        Tool(
-            name="ping",
-            description="Verifica se a Banking API está online",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-                "required": []
+@registry.tool(
+    name="ping",
+    description="Verifica se a Banking API está online",
+    input_schema={
+        "type": "object",
+        "properties": {},
+        "required": []
+    }
+)
+async def handle_ping(arguments: dict[str, Any]) -> dict[str, Any]:
+    return await call_api("GET", "/ping", **tracing_ids(arguments))
+
+
+@registry.tool(
+    name="get_balance",
+    description="Obtém o saldo de uma conta bancária",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "account_id": {
+                "type": "string",
+                "description": "ID da conta (GUID)"
+            },
+            "correlation_id": {
+                "type": "string",
+                "description": "ID de correlação para rastreamento (opcional)"
+            },
+            "client_id": {
+                "type": "string",
+                "description": "ID do cliente (opcional)"
             }
-        ),
-        Tool(
-            name="get_balance",
-            description="Obtém o saldo de uma conta bancária",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "account_id": {
-                        "type": "string",
-                        "description": "ID da conta (GUID)"
-                    },
-                    "correlation_id": {
-                        "type": "string",
-                        "description": "ID de correlação para rastreamento (opcional)"
-                    },
-                    "client_id": {
-                        "type": "string",
-                        "description": "ID do cliente (opcional)"
-                    }
-                },
-                "required": ["account_id"]
+        },
+        "required": ["account_id"]
+    }
+)
+async def handle_get_balance(arguments: dict[str, Any]) -> dict[str, Any]:
+    account_id = arguments["account_id"]
+    return await call_api(
+        "GET",
+        f"/accounts/{account_id}/balance",
+        **tracing_ids(arguments)
+    )
+
+
+@registry.tool(
+    name="create_user",
+    description="Cria um novo usuário e conta bancária",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "name": {
+                "type": "string",
+                "description": "Nome do usuário"
+            },
+            "email": {
+                "type": "string",
+                "description": "Email do usuário"
+            },
+            "password": {
+                "type": "string",
+                "description": "Senha do usuário"
+            },
+            "initial_balance": {
+                "type": "number",
+                "description": "Saldo inicial da conta"
+            },
+            "correlation_id": {
+                "type": "string",
+                "description": "ID de correlação para rastreamento (opcional)"
+            },
+            "client_id": {
+                "type": "string",
+                "description": "ID do cliente (opcional)"
             }
-        ),
-        Tool(
-            name="create_user",
-            description="Cria um novo usuário e conta bancária",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "name": {
-                        "type": "string",
-                        "description": "Nome do usuário"
-                    },
-                    "email": {
-                        "type": "string",
-                        "description": "Email do usuário"
-                    },
-                    "password": {
-                        "type": "string",
-                        "description": "Senha do usuário"
-                    },
-                    "initial_balance": {
-                        "type": "number",
-                        "description": "Saldo inicial da conta"
-                    },
-                    "correlation_id": {
-                        "type": "string",
-                        "description": "ID de correlação para rastreamento (opcional)"
-                    },
-                    "client_id": {
-                        "type": "string",
-                        "description": "ID do cliente (opcional)"
-                    }
-                },
-                "required": ["name", "email", "password", "initial_balance"]
+        },
+        "required": ["name", "email", "password", "initial_balance"]
+    }
+)
+async def handle_create_user(arguments: dict[str, Any]) -> dict[str, Any]:
+    return await call_api(
+        "POST",
+        "/users",
+        json_data={
+            "name": arguments["name"],
+            "email": arguments["email"],
+            "password": arguments["password"],
+            "initialBalance": arguments["initial_balance"]
+        },
+        **tracing_ids(arguments)
+    )
+
+
+@registry.tool(
+    name="create_account",
+    description="Cria uma nova conta bancária para um usuário existente",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "email": {
+                "type": "string",
+                "description": "Email do usuário dono da conta"
+            },
+            "initial_balance": {
+                "type": "number",
+                "description": "Saldo inicial da conta"
+            },
+            "correlation_id": {
+                "type": "string",
+                "description": "ID de correlação para rastreamento (opcional)"
+            },
+            "client_id": {
+                "type": "string",
+                "description": "ID do cliente (opcional)"
             }
-        ),
-        Tool(
-            name="create_account",
-            description="Cria uma nova conta bancária para um usuário existente",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "email": {
-                        "type": "string",
-                        "description": "Email do usuário dono da conta"
-                    },
-                    "initial_balance": {
-                        "type": "number",
-                        "description": "Saldo inicial da conta"
-                    },
-                    "correlation_id": {
-                        "type": "string",
-                        "description": "ID de correlação para rastreamento (opcional)"
-                    },
-                    "client_id": {
-                        "type": "string",
-                        "description": "ID do cliente (opcional)"
-                    }
-                },
-                "required": ["email", "initial_balance"]
+        },
+        "required": ["email", "initial_balance"]
+    }
+)
+async def handle_create_account(arguments: dict[str, Any]) -> dict[str, Any]:
+    return await call_api(
+        "POST",
+        "/accounts",
+        json_data={
+            "email": arguments["email"],
+            "initialBalance": arguments["initial_balance"]
+        },
+        **tracing_ids(arguments)
+    )
+
+
+@registry.tool(
+    name="login",
+    description="Realiza login de um usuário",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "email": {
+                "type": "string",
+                "description": "Email do usuário"
+            },
+            "password": {
+                "type": "string",
+                "description": "Senha do usuário"
+            },
+            "correlation_id": {
+                "type": "string",
+                "description": "ID de correlação para rastreamento (opcional)"
+            },
+            "client_id": {
+                "type": "string",
+                "description": "ID do cliente (opcional)"
             }
-        ),
-        Tool(
-            name="login",
-            description="Realiza login de um usuário",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "email": {
-                        "type": "string",
-                        "description": "Email do usuário"
-                    },
-                    "password": {
-                        "type": "string",
-                        "description": "Senha do usuário"
-                    },
-                    "correlation_id": {
-                        "type": "string",
-                        "description": "ID de correlação para rastreamento (opcional)"
-                    },
-                    "client_id": {
-                        "type": "string",
-                        "description": "ID do cliente (opcional)"
-                    }
-                },
-                "required": ["email", "password"]
+        },
+        "required": ["email", "password"]
+    }
+)
+async def handle_login(arguments: dict[str, Any]) -> dict[str, Any]:
+    return await call_api(
+        "POST",
+        "/auth/login",
+        json_data={
+            "email": arguments["email"],
+            "password": arguments["password"]
+        },
+        **tracing_ids(arguments)
+    )
+
+
+@registry.tool(
+    name="transfer",
+    description="Realiza uma transferência entre contas",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "from_account_id": {
+                "type": "string",
+                "description": "ID da conta de origem (GUID)"
+            },
+            "to_account_id": {
+                "type": "string",
+                "description": "ID da conta de destino (GUID)"
+            },
+            "amount": {
+                "type": "number",
+                "description": "Valor da transferência"
+            },
+            "correlation_id": {
+                "type": "string",
+                "description": "ID de correlação para rastreamento (opcional)"
+            },
+            "client_id": {
+                "type": "string",
+                "description": "ID do cliente (opcional)"
             }
-        ),
-        Tool(
-            name="transfer",
-            description="Realiza uma transferência entre contas",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "from_account_id": {
-                        "type": "string",
-                        "description": "ID da conta de origem (GUID)"
-                    },
-                    "to_account_id": {
-                        "type": "string",
-                        "description": "ID da conta de destino (GUID)"
-                    },
-                    "amount": {
-                        "type": "number",
-                        "description": "Valor da transferência"
-                    },
-                    "correlation_id": {
-                        "type": "string",
-                        "description": "ID de correlação para rastreamento (opcional)"
+        },
+        "required": ["from_account_id", "to_account_id", "amount"]
+    }
+)
+async def handle_transfer(arguments: dict[str, Any]) -> dict[str, Any]:
+    return await call_api(
+        "POST",
+        "/transactions",
+        json_data={
+            "fromAccountId": arguments["from_account_id"],
+            "toAccountId": arguments["to_account_id"],
+            "amount": arguments["amount"]
+        },
+        **tracing_ids(arguments)
+    )
+
+
+@registry.tool(
+    name="transfer_batch",
+    description="Realiza várias transferências em uma única chamada (POST /transactions/batch). Os itens são aplicados em ordem, em chunks transacionais; retorna o resultado de cada item (completed ou failed com o motivo), sem que um item recusado impeça os demais.",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "transfers": {
+                "type": "array",
+                "description": "Lista de transferências",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "from_account_id": {
+                            "type": "string",
+                            "description": "ID da conta de origem (GUID)"
+                        },
+                        "to_account_id": {
+                            "type": "string",
+                            "description": "ID da conta de destino (GUID)"
+                        },
+                        "amount": {
+                            "type": "number",
+                            "description": "Valor da transferência"
+                        }
                     },
-                    "client_id": {
-                        "type": "string",
-                        "description": "ID do cliente (opcional)"
-                    }
-                },
-                "required": ["from_account_id", "to_account_id", "amount"]
+                    "required": ["from_account_id", "to_account_id", "amount"]
+                }
+            },
+            "chunk_size": {
+                "type": "integer",
+                "description": "Transferências por transação do banco (opcional, padrão da API: 500)"
+            },
+            "correlation_id": {
+                "type": "string",
+                "description": "ID de correlação para rastreamento (opcional)"
+            },
+            "client_id": {
+                "type": "string",
+                "description": "ID do cliente (opcional)"
             }
-        ),
-        Tool(
-            name="list_transactions",
-            description="Lista transações de uma conta",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "account_id": {
-                        "type": "string",
-                        "description": "ID da conta (GUID)"
-                    },
-                    "start_date": {
-                        "type": "string",
-                        "description": "Data de início (formato ISO 8601, opcional)"
-                    },
-                    "end_date": {
-                        "type": "string",
-                        "description": "Data de fim (formato ISO 8601, opcional)"
-                    },
-                    "correlation_id": {
-                        "type": "string",
-                        "description": "ID de correlação para rastreamento (opcional)"
-                    },
-                    "client_id": {
-                        "type": "string",
-                        "description": "ID do cliente (opcional)"
-                    }
-                },
-                "required": ["account_id"]
+        },
+        "required": ["transfers"]
+    }
+)
+async def handle_transfer_batch(arguments: dict[str, Any]) -> dict[str, Any]:
+    json_data = {
+        "transfers": [
+            {
+                "fromAccountId": transfer["from_account_id"],
+                "toAccountId": transfer["to_account_id"],
+                "amount": transfer["amount"]
             }
-        )
-    ]
+            for transfer in arguments["transfers"]
+        ]
+    }
+    if arguments.get("chunk_size") is not None:
+        json_data["chunkSize"] = arguments["chunk_size"]
+
+    return await call_api(
+        "POST",
+        "/transactions/batch",
+        json_data=json_data,
+        **tracing_ids(arguments)
+    )
+
+
+@registry.tool(
+    name="list_transactions",
+    description="Lista transações de uma conta",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "account_id": {
+                "type": "string",
+                "description": "ID da conta (GUID)"
+            },
+            "start_date": {
+                "type": "string",
+                "description": "Data de início (formato ISO 8601, opcional)"
+            },
+            "end_date": {
+                "type": "string",
+                "description": "Data de fim (formato ISO 8601, opcional)"
+            },
+            "correlation_id": {
+                "type": "string",
+                "description": "ID de correlação para rastreamento (opcional)"
+            },
+            "client_id": {
+                "type": "string",
+                "description": "ID do cliente (opcional)"
+            }
+        },
+        "required": ["account_id"]
+    }
+)
+async def handle_list_transactions(arguments: dict[str, Any]) -> dict[str, Any]:
+    account_id = arguments["account_id"]
+    params = {}
+    if "start_date" in arguments:
+        params["startDate"] = arguments["start_date"]
+    if "end_date" in arguments:
+        params["endDate"] = arguments["end_date"]
+    
+    return await call_api(
+        "GET",
+        f"/accounts/{account_id}/transactions",
+        params=params,
+        **tracing_ids(arguments)
+    )
+
+
+@registry.tool(
+    name="get_admission_stats",
+    description="Estatísticas do controle de admissão: requisições em andamento e na fila, chamadas admitidas e rejeitadas por motivo e por tool. Não consome limite de taxa.",
+    input_schema={
+        "type": "object",
+        "properties": {},
+        "required": []
+    },
+    rate_limited=False
+)
+async def handle_get_admission_stats(arguments: dict[str, Any]) -> dict[str, Any]:
+    return admission_controller.stats()
+
+
+@server.list_tools()
+async def list_tools() -> list[Tool]:
+    """Lista todas as tools disponíveis (montada uma única vez, no registro)"""
+    return registry.tools
 
 
-@server.call_tool()
+@server.call_tool(validate_input=False)
 async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
     """Executa uma tool específica"""
     
-    correlation_id = arguments.get("correlation_id")
-    client_id = arguments.get("client_id")
+    spec = registry.get(name)
+    if spec is None:
+        return [TextContent(
+            type="text",
+            text=json.dumps({"error": f"Tool '{name}' não encontrada"}, indent=2)
+        )]
     
     try:
-        if name == "ping":
-            result = await call_api("GET", "/ping", correlation_id=correlation_id, client_id=client_id)
-            return [TextContent(
-                type="text",
-                text=json.dumps(result, indent=2, ensure_ascii=False)
-            )]
-        
-        elif name == "get_balance":
-            account_id = arguments["account_id"]
-            result = await call_api(
-                "GET",
-                f"/accounts/{account_id}/balance",
-                correlation_id=correlation_id,
-                client_id=client_id
-            )
-            return [TextContent(
-                type="text",
-                text=json.dumps(result, indent=2, ensure_ascii=False)
-            )]
-        
-        elif name == "create_user":
-            result = await call_api(
-                "POST",
-                "/users",
-                json_data={
-                    "name": arguments["name"],
-                    "email": arguments["email"],
-                    "password": arguments["password"],
-                    "initialBalance": arguments["initial_balance"]
-                },
-                correlation_id=correlation_id,
-                client_id=client_id
-            )
-            return [TextContent(
-                type="text",
-                text=json.dumps(result, indent=2, ensure_ascii=False)
-            )]
-        
-        elif name == "create_account":
-            result = await call_api(
-                "POST",
-                "/accounts",
-                json_data={
-                    "email": arguments["email"],
-                    "initialBalance": arguments["initial_balance"]
-                },
-                correlation_id=correlation_id,
-                client_id=client_id
-            )
-            return [TextContent(
-                type="text",
-                text=json.dumps(result, indent=2, ensure_ascii=False)
-            )]
-        
-        elif name == "login":
-            result = await call_api(
-                "POST",
-                "/auth/login",
-                json_data={
-                    "email": arguments["email"],
-                    "password": arguments["password"]
-                },
-                correlation_id=correlation_id,
-                client_id=client_id
-            )
-            return [TextContent(
-                type="text",
-                text=json.dumps(result, indent=2, ensure_ascii=False)
-            )]
+        arguments = spec.validate(arguments or {})
+        if spec.rate_limited:
+            admission_controller.check_rate(name, admission_client_key(arguments))
         
-        elif name == "transfer":
-            result = await call_api(
-                "POST",
-                "/transactions",
-                json_data={
-                    "fromAccountId": arguments["from_account_id"],
-                    "toAccountId": arguments["to_account_id"],
-                    "amount": arguments["amount"]
-                },
-                correlation_id=correlation_id,
-                client_id=client_id
-            )
-            return [TextContent(
-                type="text",
-                text=json.dumps(result, indent=2, ensure_ascii=False)
-            )]
-        
-        elif name == "list_transactions":
-            account_id = arguments["account_id"]
-            params = {}
-            if "start_date" in arguments:
-                params["startDate"] = arguments["start_date"]
-            if "end_date" in arguments:
-                params["endDate"] = arguments["end_date"]
-            
-            result = await call_api(
-                "GET",
-                f"/accounts/{account_id}/transactions",
-                params=params,
-                correlation_id=correlation_id,
-                client_id=client_id
-            )
-            return [TextContent(
-                type="text",
-                text=json.dumps(result, indent=2, ensure_ascii=False)
-            )]
-        
-        else:
-            return [TextContent(
-                type="text",
-                text=json.dumps({"error": f"Tool '{name}' não encontrada"}, indent=2)
-            )]
+        result = await spec.handler(arguments)
+        return [TextContent(
+            type="text",
+            text=json.dumps(result, indent=2, ensure_ascii=False)
+        )]
     
+    except AdmissionRejected as e:
+        return [TextContent(
+            type="text",
+            text=json.dumps({
+                "error": str(e),
+                "reason": e.reason,
+                "retry_after_seconds": round(e.retry_after, 2)
+            }, indent=2, ensure_ascii=False)
+        )]
     except KeyError as e:
         return [TextContent(
             type="text",
@@ -0,0 +1,170 @@
+"""
+Controle de admissão: token buckets por tool e por cliente e limite global de concorrência
+
+Os token buckets são verificados na entrada de cada tool; o limite de concorrência
+(com fila de espera limitada) protege as chamadas ao backend. Quando um limite é
+atingido a chamada falha imediatamente com AdmissionRejected e um retry_after.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+
+class AdmissionRejected(Exception):
+    """Chamada rejeitada pelo controle de admissão"""
+
+    def __init__(self, reason: str, retry_after: float):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"Limite atingido ({reason}); tente novamente em {retry_after:.1f}s")
+
+
+class TokenBucket:
+    """Token bucket com reposição contínua de `rate` tokens/s e capacidade `burst`"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def try_acquire(self) -> float:
+        """Consome um token; retorna 0 se conseguiu ou os segundos até haver um token disponível"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class AdmissionController:
+    """
+    Limites de taxa por tool e por cliente mais concorrência global com fila limitada
+
+    Args:
+        max_concurrent: Chamadas simultâneas ao backend
+        max_queue: Chamadas aguardando vaga; além disso a chamada falha imediatamente
+        queue_timeout: Tempo máximo de espera na fila (segundos)
+        tool_rate / tool_burst: Token bucket de cada tool
+        client_rate / client_burst: Token bucket de cada cliente/sessão
+        max_clients: Buckets de cliente mantidos (LRU)
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        queue_timeout: float,
+        tool_rate: float,
+        tool_burst: float,
+        client_rate: float,
+        client_burst: float,
+        max_clients: int = 1000
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.tool_rate = tool_rate
+        self.tool_burst = tool_burst
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.max_clients = max_clients
+
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.tool_buckets: Dict[str, TokenBucket] = {}
+        self.client_buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        # Média móvel exponencial do tempo de uso de uma vaga, para estimar retry_after
+        self.average_hold = 0.1
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {}
+        self.tool_calls: Dict[str, Dict[str, int]] = {}
+
+    def _reject(self, reason: str, retry_after: float, tool: Optional[str] = None) -> AdmissionRejected:
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        if tool is not None:
+            self.tool_calls.setdefault(tool, {"admitted": 0, "rejected": 0})["rejected"] += 1
+        return AdmissionRejected(reason, retry_after)
+
+    def _client_bucket(self, client: str) -> TokenBucket:
+        bucket = self.client_buckets.get(client)
+        if bucket is None:
+            bucket = TokenBucket(self.client_rate, self.client_burst)
+            self.client_buckets[client] = bucket
+            if len(self.client_buckets) > self.max_clients:
+                self.client_buckets.popitem(last=False)
+        else:
+            self.client_buckets.move_to_end(client)
+        return bucket
+
+    def check_rate(self, tool: str, client: str) -> None:
+        """Consome um token do bucket da tool e do cliente ou levanta AdmissionRejected"""
+        tool_bucket = self.tool_buckets.get(tool)
+        if tool_bucket is None:
+            tool_bucket = self.tool_buckets[tool] = TokenBucket(self.tool_rate, self.tool_burst)
+
+        wait = tool_bucket.try_acquire()
+        if wait:
+            raise self._reject("tool_rate", wait, tool)
+
+        wait = self._client_bucket(client).try_acquire()
+        if wait:
+            # Devolve o token da tool: a chamada não vai acontecer
+            tool_bucket.tokens = min(tool_bucket.burst, tool_bucket.tokens + 1)
+            raise self._reject("client_rate", wait, tool)
+
+        self.tool_calls.setdefault(tool, {"admitted": 0, "rejected": 0})["admitted"] += 1
+
+    def _queue_retry_after(self) -> float:
+        return self.average_hold * (self.waiting + 1) / self.max_concurrent
+
+    @asynccontextmanager
+    async def slot(self):
+        """Ocupa uma vaga de concorrência global, aguardando na fila limitada se necessário"""
+        if self.semaphore.locked():
+            if self.waiting >= self.max_queue:
+                raise self._reject("queue_full", self._queue_retry_after())
+
+            self.waiting += 1
+            self.peak_waiting = max(self.peak_waiting, self.waiting)
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise self._reject("queue_timeout", self._queue_retry_after())
+            finally:
+                self.waiting -= 1
+        else:
+            await self.semaphore.acquire()
+
+        self.in_flight += 1
+        self.admitted += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.average_hold = 0.9 * self.average_hold + 0.1 * (time.monotonic() - started)
+            self.semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Estatísticas para monitoramento"""
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrent": self.max_concurrent,
+            "waiting": self.waiting,
+            "max_queue": self.max_queue,
+            "peak_waiting": self.peak_waiting,
+            "average_hold_ms": round(self.average_hold * 1000, 2),
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "tools": {tool: dict(counts) for tool, counts in self.tool_calls.items()},
+            "tracked_clients": len(self.client_buckets)
+        }
@@ -0,0 +1,109 @@
+"""
+Modo aproximado para períodos longos
+
+Em vez de contar e agregar todos os documentos do período, divide o range em
+fatias de tempo, sorteia uma amostra delas e extrapola contagens e agregações
+(amostragem aleatória simples de fatias), com margem de erro de 95%.
+"""
+import asyncio
+import math
+import random
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List
+
+from sliced_search import split_time_range
+
+# Valor z para intervalo de confiança de 95%
+Z_95 = 1.96
+
+
+def estimate_total(sample_counts: List[float], total_slices: int) -> Dict[str, float]:
+    """
+    Estima o total populacional a partir das contagens das fatias sorteadas
+
+    Usa o estimador de expansão N * média com correção de população finita:
+    margem = z * N * sqrt((1 - n/N) * s² / n). Com todas as fatias consultadas
+    a margem é zero (contagem exata).
+    """
+    n = len(sample_counts)
+    if n == 0:
+        return {"estimate": 0.0, "margin": math.inf}
+
+    mean = sum(sample_counts) / n
+    estimate = total_slices * mean
+
+    if n >= total_slices:
+        return {"estimate": estimate, "margin": 0.0}
+    if n < 2:
+        return {"estimate": estimate, "margin": math.inf}
+
+    variance = sum((count - mean) ** 2 for count in sample_counts) / (n - 1)
+    margin = Z_95 * total_slices * math.sqrt((1 - n / total_slices) * variance / n)
+    return {"estimate": estimate, "margin": margin}
+
+
+async def approximate_counts(
+    search: Callable[[dict], Awaitable[dict]],
+    build_slice_query: Callable[[Dict[str, str]], dict],
+    time_range: Dict[str, str],
+    total_slices: int,
+    sample_slices: int,
+    budget_seconds: float
+) -> Dict[str, Any]:
+    """
+    Estima o total e as contagens por grupo (agregação "groups") de um período
+
+    As fatias sorteadas são consultadas em paralelo; as que não terminarem dentro
+    de budget_seconds são canceladas e a estimativa usa apenas as concluídas.
+    Como as fatias canceladas tendem a ser as mais pesadas, a extrapolação deixa
+    de ser não enviesada: o resultado vem marcado com lower_bound (e a margem de
+    erro não se aplica) quando alguma fatia sorteada ficou de fora ou teve a
+    contagem limitada por terminate_after ou pelo timeout do OpenSearch.
+
+    Args:
+        search: Função que executa uma query (ex: search_opensearch)
+        build_slice_query: Constrói a query de contagem (size 0) de uma fatia
+        time_range: Range completo retornado por parse_period()
+        total_slices: Em quantas fatias dividir o período
+        sample_slices: Quantas fatias sortear
+        budget_seconds: Orçamento de latência para as consultas de contagem
+    """
+    span = datetime.fromisoformat(time_range["lte"]) - datetime.fromisoformat(time_range["gte"])
+    slices = split_time_range(time_range, span / total_slices)
+    sampled = random.sample(slices, min(sample_slices, len(slices)))
+
+    tasks = [asyncio.ensure_future(search(build_slice_query(slice_range))) for slice_range in sampled]
+    done, pending = await asyncio.wait(tasks, timeout=budget_seconds)
+    for task in pending:
+        task.cancel()
+
+    results = [task.result() for task in done if not task.exception()]
+    if done and not results:
+        # Todas as fatias concluídas falharam: propagar o erro do OpenSearch
+        raise next(iter(done)).exception()
+
+    group_samples: Dict[str, List[float]] = {}
+    for i, result in enumerate(results):
+        buckets = result.get("aggregations", {}).get("groups", {}).get("buckets", [])
+        counts = {bucket["key"]: bucket["doc_count"] for bucket in buckets}
+        for key in counts:
+            # Grupos ausentes nas fatias anteriores contam como zero nelas
+            group_samples.setdefault(key, [0.0] * i)
+        for key, samples in group_samples.items():
+            samples.append(float(counts.get(key, 0)))
+
+    groups = {
+        key: estimate_total(samples, len(slices))
+        for key, samples in group_samples.items()
+    }
+
+    truncated = any(result.get("terminated_early") or result.get("timed_out") for result in results)
+    return {
+        "total": estimate_total([float(result["hits"]["total"]["value"]) for result in results], len(slices)),
+        "groups": dict(sorted(groups.items(), key=lambda item: item[1]["estimate"], reverse=True)),
+        "slices_sampled": len(results),
+        "slices_missing": len(sampled) - len(results),
+        "slices_total": len(slices),
+        "truncated": truncated,
+        "lower_bound": truncated or len(results) < len(sampled)
+    }
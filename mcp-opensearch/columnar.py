@@ -0,0 +1,298 @@
+"""
+Exportação colunar (Arrow/Parquet) de logs e traces para análise offline
+
+A exportação percorre todos os hits de uma query com PIT + search_after e grava
+cada página como um record batch com colunas tipadas. As consultas locais abrem o
+arquivo com memory map e respondem filtros, group-by e percentis de forma
+vetorizada, sem voltar ao OpenSearch.
+"""
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+import latency_stats
+import query_builder
+
+# Colunas do arquivo exportado (logs e traces compartilham o schema; campos
+# inexistentes no tipo de documento ficam nulos)
+EXPORT_SCHEMA = pa.schema([
+    ("timestamp", pa.timestamp("ns", tz="UTC")),
+    ("duration_ms", pa.float64()),
+    ("name", pa.string()),
+    ("severity", pa.string()),
+    ("correlationId", pa.string()),
+    ("clientId", pa.string()),
+    ("trace_id", pa.string()),
+    ("is_error", pa.bool_()),
+    ("message", pa.string())
+])
+
+# Coluna do schema -> campo no _source
+EXPORT_SOURCE_FIELDS = {
+    "timestamp": "@timestamp",
+    "duration_ms": "duration_ms",
+    "name": "Name",
+    "severity": "SeverityText",
+    "correlationId": "correlationId",
+    "clientId": "clientId",
+    "trace_id": "TraceId",
+    "is_error": "is_error",
+    "message": "Body"
+}
+
+# Campos pedidos no _source: os do schema mais os originais de documentos indexados
+# antes dos ingest pipelines (ids em Attributes.*, Duration e TraceStatus)
+EXPORT_REQUEST_FIELDS = list(dict.fromkeys(
+    list(EXPORT_SOURCE_FIELDS.values())
+    + query_builder.correlation_source_fields()
+    + query_builder.TRACE_SOURCE_FIELDS
+))
+
+EXPORT_FORMATS = {"arrow": ".arrow", "parquet": ".parquet"}
+
+# Colunas que podem ser usadas em group_by e nos filtros de igualdade
+GROUPABLE_COLUMNS = ["name", "severity", "correlationId", "clientId", "trace_id", "is_error"]
+
+
+def _source_value(source: Dict[str, Any], column: str) -> Any:
+    """Valor de uma coluna no _source, com fallback para os campos anteriores aos pipelines"""
+    if column in query_builder.CORRELATION_FIELDS:
+        return query_builder.correlation_value(source, column, None)
+    if column == "duration_ms":
+        return query_builder.duration_ms_value(source)
+    if column == "is_error" and "is_error" not in source and query_builder.STATUS_FIELD in source:
+        return query_builder.is_error_value(source)
+    return source.get(EXPORT_SOURCE_FIELDS[column])
+
+
+def hits_to_record_batch(hits: List[Dict[str, Any]]) -> pa.RecordBatch:
+    """Converte uma página de hits em um record batch com o EXPORT_SCHEMA"""
+    sources = [hit.get("_source", {}) for hit in hits]
+    columns = []
+
+    for field in EXPORT_SCHEMA:
+        values = [_source_value(source, field.name) for source in sources]
+        if pa.types.is_timestamp(field.type):
+            # @timestamp chega como string ISO 8601 (com até nanossegundos)
+            columns.append(pa.array(values, type=pa.string()).cast(field.type))
+        else:
+            columns.append(pa.array(values, type=field.type))
+
+    return pa.RecordBatch.from_arrays(columns, schema=EXPORT_SCHEMA)
+
+
+def open_writer(path: str, export_format: str):
+    """Abre o writer do formato: Arrow IPC (sem compressão, mapeável sem cópia) ou Parquet (zstd)"""
+    if export_format == "parquet":
+        return pq.ParquetWriter(path, EXPORT_SCHEMA, compression="zstd")
+    return ipc.new_file(path, EXPORT_SCHEMA)
+
+
+async def export_hits(
+    search: Callable[[dict], Awaitable[dict]],
+    build_page_query: Callable[[str, Optional[list]], dict],
+    pit_id: str,
+    path: str,
+    export_format: str,
+    max_docs: int
+) -> Dict[str, Any]:
+    """
+    Grava todos os hits de uma query (até max_docs) paginando com PIT + search_after
+
+    O arquivo é escrito em `path`.tmp e renomeado ao final, para que uma exportação
+    interrompida não deixe um arquivo incompleto com o nome final.
+
+    Args:
+        search: Função que executa uma query (ex: search_opensearch)
+        build_page_query: Constrói a query de uma página a partir do PIT e do cursor
+        pit_id: ID do point in time aberto para a exportação
+        path: Caminho do arquivo de saída
+        export_format: "arrow" ou "parquet"
+        max_docs: Limite de documentos exportados
+
+    Retorna o número de linhas, páginas, se o limite foi atingido e o PIT mais recente.
+    """
+    temp_path = f"{path}.tmp"
+    writer = open_writer(temp_path, export_format)
+    rows = 0
+    pages = 0
+    cursor = None
+    exhausted = False
+
+    try:
+        try:
+            while rows < max_docs:
+                results = await search(build_page_query(pit_id, cursor))
+                # O OpenSearch pode devolver um novo ID de PIT a cada página
+                pit_id = results.get("pit_id", pit_id)
+                hits = results["hits"]["hits"][:max_docs - rows]
+                if not hits:
+                    exhausted = True
+                    break
+
+                writer.write_batch(hits_to_record_batch(hits))
+                rows += len(hits)
+                pages += 1
+                cursor = hits[-1]["sort"]
+        finally:
+            writer.close()
+
+        os.replace(temp_path, path)
+    except BaseException:
+        # Falha na paginação, na escrita ou cancelamento: não deixar o .tmp para trás
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return {
+        "rows": rows,
+        "pages": pages,
+        "truncated": not exhausted and rows >= max_docs,
+        "pit_id": pit_id
+    }
+
+
+def load_table(path: str, columns: Optional[List[str]] = None) -> pa.Table:
+    """
+    Abre um arquivo exportado com memory map
+
+    Arquivos Arrow IPC são lidos sem cópia (os buffers apontam para o mapeamento);
+    Parquet é descomprimido lendo apenas as colunas pedidas.
+    """
+    if path.endswith(EXPORT_FORMATS["parquet"]):
+        return pq.read_table(path, columns=columns, memory_map=True)
+
+    # O mapeamento fica aberto enquanto a tabela referenciar seus buffers
+    table = ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return table.select(columns) if columns else table
+
+
+def filter_table(
+    table: pa.Table,
+    where: Optional[Dict[str, Any]] = None,
+    min_duration_ms: Optional[float] = None
+) -> pa.Table:
+    """
+    Aplica filtros de igualdade (valor ou lista de valores por coluna) e duração mínima
+
+    Args:
+        where: Coluna -> valor ou lista de valores aceitos (ex: {"name": "TransferFunds"})
+        min_duration_ms: Manter apenas linhas com duration_ms >= este valor
+    """
+    mask = None
+
+    for column, value in (where or {}).items():
+        if column not in GROUPABLE_COLUMNS:
+            raise ValueError(f"Coluna de filtro inválida: '{column}' (use {', '.join(GROUPABLE_COLUMNS)})")
+        values = value if isinstance(value, list) else [value]
+        condition = pc.is_in(table[column], value_set=pa.array(values, type=table.schema.field(column).type))
+        mask = condition if mask is None else pc.and_(mask, condition)
+
+    if min_duration_ms is not None:
+        condition = pc.greater_equal(table["duration_ms"], min_duration_ms)
+        mask = condition if mask is None else pc.and_(mask, condition)
+
+    return table if mask is None else table.filter(mask)
+
+
+def summarize_groups(
+    table: pa.Table,
+    group_by: Optional[str] = None,
+    percentiles: Optional[List[float]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Contagem, taxa de erro e percentis de duration_ms por grupo (ou do total)
+
+    Contagens e erros usam o group_by do Arrow; os percentis agrupam as durações
+    não nulas com uma única ordenação (latency_stats.group_durations).
+    """
+    percentiles = percentiles or latency_stats.PERCENTILES
+    invalid = [
+        value for value in percentiles
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 100
+    ]
+    if invalid:
+        raise ValueError(f"Percentis devem estar entre 0 e 100: {', '.join(str(value) for value in invalid)}")
+    if group_by is not None and group_by not in GROUPABLE_COLUMNS:
+        raise ValueError(f"Coluna de agrupamento inválida: '{group_by}' (use {', '.join(GROUPABLE_COLUMNS)})")
+
+    if group_by is None:
+        keys = pa.array(["total"] * table.num_rows, type=pa.string())
+    else:
+        keys = pc.fill_null(pc.cast(table[group_by], pa.string()), "N/A")
+    table = table.append_column("group", keys)
+
+    counts = table.group_by("group").aggregate([
+        ("group", "count"),
+        ("is_error", "sum"),
+        ("is_error", "count")
+    ]).to_pydict()
+
+    with_duration = table.filter(pc.is_valid(table["duration_ms"]))
+    durations = latency_stats.group_durations(
+        with_duration["group"].to_numpy(zero_copy_only=False).astype(object),
+        with_duration["duration_ms"].to_numpy()
+    )
+
+    groups = []
+    for key, count, errors, flagged in zip(
+        counts["group"], counts["group_count"], counts["is_error_sum"], counts["is_error_count"]
+    ):
+        group_durations = durations.get(key)
+        has_durations = group_durations is not None and len(group_durations) > 0
+        groups.append({
+            "group": key,
+            "count": count,
+            "error_rate": errors / flagged if flagged else None,
+            "percentiles": dict(zip(percentiles, np.percentile(group_durations, percentiles))) if has_durations else None,
+            "max_ms": float(group_durations.max()) if has_durations else None
+        })
+
+    return sorted(groups, key=lambda group: group["count"], reverse=True)
+
+
+def format_export_result(export: Dict[str, Any], file_name: str, size_bytes: int, source: str) -> str:
+    """Formata o resultado de uma exportação"""
+    truncated = " (limite de documentos atingido)" if export["truncated"] else ""
+    return (
+        f"Exportados {export['rows']} {source} em {export['pages']} página(s){truncated}\n"
+        f"Arquivo: {file_name} ({size_bytes / 1024 / 1024:.2f} MB)\n"
+        f"Colunas: {', '.join(EXPORT_SCHEMA.names)}\n"
+        f"Use query_columnar com file='{file_name}' para filtrar, agrupar e calcular percentis localmente."
+    )
+
+
+def format_group_summary(
+    groups: List[Dict[str, Any]],
+    total_rows: int,
+    matched_rows: int,
+    group_by: Optional[str],
+    top_n: int = 50
+) -> str:
+    """Formata o resultado de uma consulta local"""
+    if matched_rows == 0:
+        return f"Nenhuma linha atende aos filtros ({total_rows} linhas no arquivo)."
+
+    formatted = [
+        f"Linhas: {matched_rows} de {total_rows}"
+        + (f" | Agrupado por {group_by} ({len(groups)} grupos)" if group_by else "")
+    ]
+
+    for group in groups[:top_n]:
+        line = f"\n{group['group']}: {group['count']} linhas"
+        if group["error_rate"] is not None:
+            line += f", erro {group['error_rate'] * 100:.1f}%"
+        formatted.append(line)
+        if group["percentiles"]:
+            values = ", ".join(f"p{percentile:g}={value:.1f}ms" for percentile, value in group["percentiles"].items())
+            formatted.append(f"  {values}, max={group['max_ms']:.1f}ms")
+
+    if len(groups) > top_n:
+        formatted.append(f"\n... {len(groups) - top_n} grupos omitidos")
+
+    return "\n".join(formatted)
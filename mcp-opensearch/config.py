@@ -11,3 +11,68 @@ OPENSEARCH_PASSWORD = os.getenv("OPENSEARCH_PASSWORD", "")
 LOGS_INDEX = os.getenv("LOGS_INDEX", "logs-banking-api")
 TRACES_INDEX = os.getenv("TRACES_INDEX", "traces-banking-api")
 
+# URL do OpenSearch Dashboards (usada para gerar links de traces)
+DASHBOARDS_URL = os.getenv("DASHBOARDS_URL", "http://localhost:5601")
+
+# Campo com o message template do Serilog (usado para agrupar mensagens de log)
+LOG_TEMPLATE_FIELD = os.getenv("LOG_TEMPLATE_FIELD", "Attributes.message_template.text")
+
+# Comparação de períodos: amostra aleatória de Duration por operação e período
+# (para o teste de Mann-Whitney) e quantas amostras são buscadas em paralelo
+COMPARISON_SAMPLE_SIZE = int(os.getenv("COMPARISON_SAMPLE_SIZE", "2000"))
+COMPARISON_CONCURRENCY = int(os.getenv("COMPARISON_CONCURRENCY", "8"))
+
+# Máximo de buckets de tempo de um histograma: um intervalo pedido que gere mais
+# buckets que isso é elevado ao menor intervalo padrão que caiba no limite
+HISTOGRAM_MAX_BUCKETS = int(os.getenv("HISTOGRAM_MAX_BUCKETS", "500"))
+
+# Máximo de sessões de tail com cursor mantidas em memória
+TAIL_MAX_SESSIONS = int(os.getenv("TAIL_MAX_SESSIONS", "1000"))
+
+# Um documento fica pesquisável até o batch do Collector (timeout 10s) + o refresh
+# do índice (5s) depois do seu @timestamp: o tail relê essa janela a cada chamada e
+# descarta pelo _id o que a sessão já viu (até TAIL_MAX_SEEN_IDS ids por sessão)
+TAIL_OVERLAP_MS = int(os.getenv("TAIL_OVERLAP_MS", "20000"))
+TAIL_MAX_SEEN_IDS = int(os.getenv("TAIL_MAX_SEEN_IDS", "5000"))
+
+# Busca fatiada por tempo: períodos maiores que SLICED_SEARCH_MIN_HOURS são
+# consultados em fatias de SLICE_HOURS, SLICED_SEARCH_CONCURRENCY por vez
+SLICED_SEARCH_MIN_HOURS = int(os.getenv("SLICED_SEARCH_MIN_HOURS", "48"))
+SLICE_HOURS = int(os.getenv("SLICE_HOURS", "24"))
+SLICED_SEARCH_CONCURRENCY = int(os.getenv("SLICED_SEARCH_CONCURRENCY", "4"))
+
+# Índices diários (<índice>-YYYY.MM.DD) atrás de um alias com o nome do índice.
+# Quando habilitado, as queries com período consultam apenas os dias do range;
+# ranges com mais de MAX_DAILY_INDICES dias usam o alias. Desligado na inicialização
+# se o nome base ainda for um índice comum (instalação anterior aos templates).
+DAILY_INDICES = os.getenv("DAILY_INDICES", "true").lower() == "true"
+MAX_DAILY_INDICES = int(os.getenv("MAX_DAILY_INDICES", "62"))
+
+# Modo aproximado das tools de período: períodos maiores que APPROX_MIN_HOURS são
+# divididos em APPROX_SLICES fatias, das quais APPROX_SAMPLE_SLICES são sorteadas
+# e consultadas dentro de APPROX_BUDGET_MS
+APPROX_MIN_HOURS = int(os.getenv("APPROX_MIN_HOURS", "24"))
+APPROX_SLICES = int(os.getenv("APPROX_SLICES", "48"))
+APPROX_SAMPLE_SLICES = int(os.getenv("APPROX_SAMPLE_SLICES", "12"))
+APPROX_BUDGET_MS = int(os.getenv("APPROX_BUDGET_MS", "2000"))
+APPROX_TRACK_TOTAL_HITS = int(os.getenv("APPROX_TRACK_TOTAL_HITS", "1000"))
+APPROX_TERMINATE_AFTER = int(os.getenv("APPROX_TERMINATE_AFTER", "1000000"))
+
+# Controle de admissão: token bucket por tool e por cliente (clientId ou sessão)
+# e limite global de buscas simultâneas com fila de espera limitada. Acima da fila
+# (ou após ADMISSION_QUEUE_TIMEOUT segundos) a chamada falha com retry_after.
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "4"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "15"))
+TOOL_RATE_PER_SECOND = float(os.getenv("TOOL_RATE_PER_SECOND", "10"))
+TOOL_BURST = float(os.getenv("TOOL_BURST", "20"))
+CLIENT_RATE_PER_SECOND = float(os.getenv("CLIENT_RATE_PER_SECOND", "5"))
+CLIENT_BURST = float(os.getenv("CLIENT_BURST", "10"))
+ADMISSION_MAX_CLIENTS = int(os.getenv("ADMISSION_MAX_CLIENTS", "1000"))
+
+# Exportação colunar (Arrow/Parquet): diretório dos arquivos, documentos por
+# página (PIT + search_after), limite por exportação e keep_alive do PIT
+EXPORT_DIR = os.getenv("EXPORT_DIR", "/tmp/mcp-opensearch-exports")
+EXPORT_PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", "5000"))
+EXPORT_MAX_DOCS = int(os.getenv("EXPORT_MAX_DOCS", "1000000"))
+EXPORT_PIT_KEEP_ALIVE = os.getenv("EXPORT_PIT_KEEP_ALIVE", "2m")
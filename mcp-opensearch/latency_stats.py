@@ -0,0 +1,182 @@
+"""
+Estatísticas de latência por operação com NumPy para comparação entre períodos
+"""
+import math
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+
+import query_builder
+
+PERCENTILES = [50, 95, 99]
+
+
+def period_seconds(time_range: Dict[str, str]) -> float:
+    """Duração em segundos de um range retornado por parse_period()"""
+    span = datetime.fromisoformat(time_range["lte"]) - datetime.fromisoformat(time_range["gte"])
+    return max(span.total_seconds(), 1.0)
+
+
+def hits_to_durations(hits: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Converte hits em um array de durações em ms (duration_ms ou Duration em ns)
+
+    Hits sem nenhuma das duas são descartados: contá-los como 0 enviesaria os
+    percentis e o teste de Mann-Whitney.
+    """
+    durations = (query_builder.duration_ms_value(hit.get("_source", {})) for hit in hits)
+    return np.array([duration for duration in durations if duration is not None], dtype=np.float64)
+
+
+def group_durations(names: np.ndarray, durations: np.ndarray) -> Dict[str, np.ndarray]:
+    """Agrupa durações por operação ordenando uma única vez (sem loop por documento)"""
+    if len(names) == 0:
+        return {}
+
+    operations, inverse = np.unique(names, return_inverse=True)
+    order = np.argsort(inverse, kind="stable")
+    boundaries = np.cumsum(np.bincount(inverse, minlength=len(operations)))[:-1]
+    groups = np.split(durations[order], boundaries)
+
+    return {str(operation): group for operation, group in zip(operations, groups)}
+
+
+def rank_with_ties(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ranks (1-based) com média para empates, mais o tamanho de cada grupo de empate
+
+    Equivalente a scipy.stats.rankdata(method="average"), sem a dependência.
+    """
+    order = np.argsort(values, kind="mergesort")
+    _, first_index, tie_counts = np.unique(values[order], return_index=True, return_counts=True)
+    average_ranks = first_index + (tie_counts + 1) / 2.0
+
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[order] = np.repeat(average_ranks, tie_counts)
+    return ranks, tie_counts
+
+
+def mann_whitney_p_value(baseline: np.ndarray, target: np.ndarray) -> float:
+    """
+    p-valor bilateral do teste de Mann-Whitney U (aproximação normal com correção de empates)
+
+    Não assume distribuição normal das latências, que costumam ter cauda longa.
+    """
+    n1, n2 = len(baseline), len(target)
+    if n1 == 0 or n2 == 0:
+        return 1.0
+
+    ranks, tie_counts = rank_with_ties(np.concatenate([baseline, target]))
+    n = n1 + n2
+    u1 = ranks[:n1].sum() - n1 * (n1 + 1) / 2.0
+
+    tie_term = float((tie_counts ** 3 - tie_counts).sum()) / (n * (n - 1)) if n > 1 else 0.0
+    variance = n1 * n2 / 12.0 * ((n + 1) - tie_term)
+    if variance <= 0:
+        return 1.0
+
+    z = (u1 - n1 * n2 / 2.0) / math.sqrt(variance)
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
+def two_proportion_p_value(errors1: int, total1: int, errors2: int, total2: int) -> float:
+    """p-valor bilateral do teste z para diferença entre duas taxas de erro"""
+    if total1 == 0 or total2 == 0:
+        return 1.0
+
+    pooled = (errors1 + errors2) / (total1 + total2)
+    variance = pooled * (1 - pooled) * (1 / total1 + 1 / total2)
+    if variance <= 0:
+        return 1.0
+
+    z = (errors2 / total2 - errors1 / total1) / math.sqrt(variance)
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
+def relative_change(baseline: Optional[float], target: Optional[float]) -> Optional[float]:
+    """Variação relativa (target - baseline) / baseline; inf quando a base é zero e o alvo não"""
+    if baseline is None or target is None:
+        return None
+    if baseline == 0:
+        return 0.0 if target == 0 else math.inf
+    return (target - baseline) / baseline
+
+
+def compare_operations(
+    baseline: Dict[str, Any],
+    target: Dict[str, Any],
+    alpha: float = 0.05,
+    min_relative_change: float = 0.1,
+    min_error_rate_change: float = 0.01
+) -> List[Dict[str, Any]]:
+    """
+    Compara latência, throughput e taxa de erro por operação entre dois períodos
+
+    Com amostras grandes, diferenças irrelevantes já dão p-valor baixo; por isso uma
+    mudança só é marcada quando, além de p < alpha, o efeito passa do mínimo: variação
+    relativa do p50 para latência e diferença absoluta para a taxa de erro.
+
+    Args:
+        baseline / target: dicts com "durations" (operação -> amostra np.ndarray em ms),
+            "counts" e "errors" (operação -> contagem exata), opcionalmente "percentiles"
+            (operação -> p50/p95/p99 calculados sobre todos os documentos) e "seconds"
+            (duração do período). Sem "percentiles", eles são calculados da amostra.
+        alpha: Nível de significância
+        min_relative_change: Variação relativa mínima do p50 (0.1 = 10%)
+        min_error_rate_change: Diferença mínima da taxa de erro (0.01 = 1 ponto percentual)
+    """
+    operations = sorted(set(baseline["counts"]) | set(target["counts"]))
+    empty = np.empty(0, dtype=np.float64)
+    comparisons = []
+
+    def percentiles_of(period: Dict[str, Any], operation: str, durations: np.ndarray):
+        exact = period.get("percentiles", {}).get(operation)
+        if exact is not None:
+            return np.asarray(exact, dtype=np.float64)
+        return np.percentile(durations, PERCENTILES) if len(durations) else None
+
+    for operation in operations:
+        baseline_durations = baseline["durations"].get(operation, empty)
+        target_durations = target["durations"].get(operation, empty)
+        baseline_count = baseline["counts"].get(operation, 0)
+        target_count = target["counts"].get(operation, 0)
+        baseline_errors = baseline["errors"].get(operation, 0)
+        target_errors = target["errors"].get(operation, 0)
+
+        baseline_percentiles = percentiles_of(baseline, operation, baseline_durations)
+        target_percentiles = percentiles_of(target, operation, target_durations)
+        baseline_error_rate = baseline_errors / baseline_count if baseline_count else 0.0
+        target_error_rate = target_errors / target_count if target_count else 0.0
+
+        latency_p_value = mann_whitney_p_value(baseline_durations, target_durations)
+        error_p_value = two_proportion_p_value(baseline_errors, baseline_count, target_errors, target_count)
+        latency_change = relative_change(
+            None if baseline_percentiles is None else float(baseline_percentiles[0]),
+            None if target_percentiles is None else float(target_percentiles[0])
+        )
+
+        comparisons.append({
+            "operation": operation,
+            "baseline_percentiles": baseline_percentiles,
+            "target_percentiles": target_percentiles,
+            "baseline_samples": len(baseline_durations),
+            "target_samples": len(target_durations),
+            "baseline_throughput": baseline_count / baseline["seconds"],
+            "target_throughput": target_count / target["seconds"],
+            "baseline_error_rate": baseline_error_rate,
+            "target_error_rate": target_error_rate,
+            "latency_p_value": latency_p_value,
+            "error_p_value": error_p_value,
+            "latency_change": latency_change,
+            "latency_significant": (
+                latency_p_value < alpha
+                and latency_change is not None
+                and abs(latency_change) >= min_relative_change
+            ),
+            "error_significant": (
+                error_p_value < alpha
+                and abs(target_error_rate - baseline_error_rate) >= min_error_rate_change
+            )
+        })
+
+    return comparisons
@@ -0,0 +1,204 @@
+"""
+Resumo de respostas com profile: true do OpenSearch e detecção de cláusulas custosas
+"""
+from typing import Any, Dict, List, Set
+
+# Queries que varrem o dicionário de termos do campo
+EXPENSIVE_QUERY_TYPES = {"wildcard", "prefix", "regexp", "fuzzy", "query_string"}
+
+# Queries/agregações que esperam campos keyword/numéricos/date (não analisados)
+EXACT_MATCH_KEYS = {"term", "terms", "range"}
+
+# A partir de quantos documentos ordenados por shard um sort é considerado profundo
+DEEP_SORT_THRESHOLD = 1000
+
+
+def collect_fields(body: Dict[str, Any]) -> Set[str]:
+    """Retorna os campos usados em term/terms/range, sort e agregações de um body"""
+    fields: Set[str] = set()
+
+    def walk_query(node: Any) -> None:
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key in EXACT_MATCH_KEYS and isinstance(value, dict):
+                    fields.update(field for field in value if field not in ("boost", "format"))
+                walk_query(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk_query(item)
+
+    walk_query(body.get("query", {}))
+
+    for aggregation in _iter_aggregations(body.get("aggs", {})):
+        for aggregation_type, params in aggregation.items():
+            if aggregation_type == "filter":
+                walk_query(params)
+            elif aggregation_type != "aggs" and isinstance(params, dict) and "field" in params:
+                fields.add(params["field"])
+
+    for sort in body.get("sort", []):
+        if isinstance(sort, dict):
+            fields.update(sort)
+
+    return {field for field in fields if not field.startswith("_")}
+
+
+def _iter_aggregations(aggs: Dict[str, Any]):
+    """Percorre as definições de agregação (inclusive sub-agregações)"""
+    for aggregation in aggs.values():
+        if isinstance(aggregation, dict):
+            yield aggregation
+            yield from _iter_aggregations(aggregation.get("aggs", {}))
+
+
+def find_costly_clauses(body: Dict[str, Any], field_types: Dict[str, Set[str]]) -> List[str]:
+    """
+    Aponta cláusulas custosas no body de uma query
+
+    Args:
+        body: Body enviado ao OpenSearch
+        field_types: Tipos de mapping por campo (resultado de _field_caps)
+    """
+    findings = []
+
+    def walk(node: Any, path: str) -> None:
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key == "bool" and isinstance(value, dict):
+                    must = value.get("must", [])
+                    if must:
+                        findings.append(
+                            f"{path}bool.must com {len(must)} cláusula(s): calcula score sem necessidade; "
+                            f"use bool.filter (cacheável, sem scoring)"
+                        )
+                if key in EXPENSIVE_QUERY_TYPES:
+                    findings.append(f"{path}{key}: varre o dicionário de termos do campo; evite em campos de alta cardinalidade")
+                walk(value, f"{path}{key}.")
+        elif isinstance(node, list):
+            for item in node:
+                walk(item, path)
+
+    walk(body.get("query", {}), "query.")
+
+    for field in sorted(collect_fields(body)):
+        types = field_types.get(field, set())
+        if not types:
+            findings.append(f"Campo '{field}' não existe no mapping (filtro/agregação sempre vazio)")
+        elif "text" in types:
+            findings.append(
+                f"Campo '{field}' mapeado como text (analisado, provavelmente via mapping dinâmico): "
+                f"term/sort/agregações não funcionam como esperado; mapeie como keyword"
+            )
+        elif len(types) > 1:
+            findings.append(f"Campo '{field}' tem tipos diferentes entre índices: {', '.join(sorted(types))}")
+
+    sort = body.get("sort", [])
+    depth = body.get("from", 0) + body.get("size", 10)
+    if sort and sort != ["_doc"] and depth > DEEP_SORT_THRESHOLD:
+        findings.append(
+            f"Sort profundo: {depth} documentos ordenados por shard; use search_after ou reduza size"
+        )
+
+    return findings
+
+
+def _node_time(node: Dict[str, Any]) -> int:
+    return node.get("time_in_nanos", 0)
+
+
+def _flatten_query_nodes(nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    flattened = []
+    for node in nodes:
+        flattened.append(node)
+        flattened.extend(_flatten_query_nodes(node.get("children", [])))
+    return flattened
+
+
+def summarize_profile(response: Dict[str, Any], top_nodes: int = 5) -> Dict[str, Any]:
+    """
+    Resume o profile de uma resposta: took, shards e tempos de query/collector/fetch/aggs por shard
+
+    Também retorna os nós de query mais caros (tipo, descrição e tempo) entre todos os shards.
+    """
+    shards = []
+    nodes = []
+
+    for shard in response.get("profile", {}).get("shards", []):
+        query_ns = 0
+        rewrite_ns = 0
+        collector_ns = 0
+        for search in shard.get("searches", []):
+            query_ns += sum(_node_time(node) for node in search.get("query", []))
+            rewrite_ns += search.get("rewrite_time", 0)
+            collector_ns += sum(_node_time(node) for node in search.get("collector", []))
+            nodes.extend(_flatten_query_nodes(search.get("query", [])))
+
+        fetch = shard.get("fetch")
+        if isinstance(fetch, list):
+            fetch = {"time_in_nanos": sum(_node_time(node) for node in fetch)}
+        shards.append({
+            "id": shard.get("id", "N/A"),
+            "query_ms": query_ns / 1_000_000,
+            "rewrite_ms": rewrite_ns / 1_000_000,
+            "collector_ms": collector_ns / 1_000_000,
+            "fetch_ms": _node_time(fetch) / 1_000_000 if fetch else None,
+            "aggregations_ms": sum(_node_time(node) for node in shard.get("aggregations", [])) / 1_000_000
+        })
+
+    slowest_nodes = sorted(nodes, key=_node_time, reverse=True)[:top_nodes]
+
+    return {
+        "took_ms": response.get("took", 0),
+        "shards_total": response.get("_shards", {}).get("total", len(shards)),
+        "shards_failed": response.get("_shards", {}).get("failed", 0),
+        "shards": shards,
+        "slowest_nodes": [
+            {
+                "type": node.get("type", "N/A"),
+                "description": node.get("description", "")[:200],
+                "ms": _node_time(node) / 1_000_000
+            }
+            for node in slowest_nodes
+        ]
+    }
+
+
+def format_profile_report(tool_name: str, profiled: List[Dict[str, Any]]) -> str:
+    """
+    Formata o relatório de profiling de todas as buscas executadas por uma tool
+
+    Args:
+        tool_name: Nome da tool perfilada
+        profiled: Lista com "index", "body", "summary" e "findings" de cada busca
+    """
+    if not profiled:
+        return f"A tool '{tool_name}' não executou buscas no OpenSearch."
+
+    formatted = [f"=== PROFILE - {tool_name} ({len(profiled)} busca(s)) ==="]
+
+    for i, search in enumerate(profiled, 1):
+        summary = search["summary"]
+        formatted.append(f"\n--- Busca {i}: {search['index'] or 'point in time'} ---")
+        formatted.append(
+            f"took: {summary['took_ms']}ms | shards: {summary['shards_total']} "
+            f"(falhas: {summary['shards_failed']})"
+        )
+
+        for shard in summary["shards"]:
+            fetch = f"{shard['fetch_ms']:.2f}ms" if shard["fetch_ms"] is not None else "N/A"
+            formatted.append(
+                f"  {shard['id']}: query {shard['query_ms']:.2f}ms, rewrite {shard['rewrite_ms']:.2f}ms, "
+                f"collector {shard['collector_ms']:.2f}ms, aggs {shard['aggregations_ms']:.2f}ms, fetch {fetch}"
+            )
+
+        if summary["slowest_nodes"]:
+            formatted.append("Nós de query mais caros:")
+            for node in summary["slowest_nodes"]:
+                formatted.append(f"  {node['ms']:.2f}ms {node['type']}: {node['description']}")
+
+        if search["findings"]:
+            formatted.append("Pontos de atenção:")
+            for finding in search["findings"]:
+                formatted.append(f"  ⚠️ {finding}")
+
+    return "\n".join(formatted)
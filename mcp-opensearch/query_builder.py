@@ -1,11 +1,14 @@
 """
 Query Builder para OpenSearch com suporte a linguagem natural para períodos
 """
+import re
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import dateparser
 import pytz
 
+import config
+
 
 def parse_period(period_text: str, reference_time: Optional[datetime] = None) -> Dict[str, str]:
     """
@@ -109,13 +112,106 @@ def parse_period(period_text: str, reference_time: Optional[datetime] = None) ->
     }
 
 
+def target_indices(index: str, time_range: Optional[Dict[str, str]] = None) -> str:
+    """
+    Retorna os índices diários que cobrem o range (ex: "logs-banking-api-2025.11.24,...")
+
+    Sem range, com DAILY_INDICES desabilitado ou com ranges muito longos, retorna
+    o próprio nome do índice (alias sobre todos os índices diários).
+    """
+    if not time_range or not config.DAILY_INDICES:
+        return index
+
+    start = datetime.fromisoformat(time_range["gte"]).astimezone(pytz.UTC).date()
+    end = datetime.fromisoformat(time_range.get("lte") or time_range["lt"]).astimezone(pytz.UTC).date()
+    days = (end - start).days + 1
+
+    if days > config.MAX_DAILY_INDICES:
+        return index
+
+    return ",".join(
+        f"{index}-{(start + timedelta(days=offset)).strftime('%Y.%m.%d')}"
+        for offset in range(days)
+    )
+
+
+# Campos de correlação promovidos para o topo do documento pelo ingest pipeline;
+# documentos indexados antes dele só têm os originais em Attributes.*
+CORRELATION_FIELDS = ["correlationId", "clientId"]
+
+
+def build_correlation_filter(field: str, value: str) -> Dict[str, Any]:
+    """
+    Filtro por clientId/correlationId no campo promovido OU no original em Attributes.*
+
+    Mantém as buscas corretas em períodos indexados antes dos ingest pipelines,
+    sem exigir reindex dos índices antigos.
+    """
+    return {
+        "bool": {
+            "should": [
+                {"term": {field: value}},
+                {"term": {f"Attributes.{field}": value}}
+            ],
+            "minimum_should_match": 1
+        }
+    }
+
+
+def correlation_source_fields() -> List[str]:
+    """Campos de _source com os ids de correlação (promovidos e originais em Attributes.*)"""
+    return CORRELATION_FIELDS + [f"Attributes.{field}" for field in CORRELATION_FIELDS]
+
+
+def correlation_value(source: Dict[str, Any], field: str, default: Any = "N/A") -> Any:
+    """Lê clientId/correlationId do _source: campo promovido ou, em documentos antigos, Attributes.*"""
+    value = source.get(field)
+    if value is None:
+        value = source.get("Attributes", {}).get(field)
+    return default if value is None else value
+
+
+# Campos de trace calculados pelo pipeline banking-traces (duration_ms, is_error).
+# Documentos indexados antes dele só têm Duration (ns) e TraceStatus (código do
+# OpenTelemetry); como esses dois continuam em todos os spans, sort, filtros e
+# agregações usam os originais e apenas a leitura do _source prefere os promovidos
+DURATION_FIELD = "Duration"
+STATUS_FIELD = "TraceStatus"
+TRACE_STATUS_ERROR = 2
+NANOS_PER_MS = 1_000_000
+TRACE_SOURCE_FIELDS = ["duration_ms", DURATION_FIELD, "is_error", STATUS_FIELD]
+
+
+def build_error_filter() -> Dict[str, Any]:
+    """Filtro de spans com erro (TraceStatus = Error), válido com ou sem o pipeline"""
+    return {"term": {STATUS_FIELD: TRACE_STATUS_ERROR}}
+
+
+def duration_ms_value(source: Dict[str, Any]) -> Optional[float]:
+    """Duração do span em ms: duration_ms ou, em documentos antigos, Duration (ns); None se ausente"""
+    value = source.get("duration_ms")
+    if value is None and source.get(DURATION_FIELD) is not None:
+        value = source[DURATION_FIELD] / NANOS_PER_MS
+    return value
+
+
+def is_error_value(source: Dict[str, Any]) -> bool:
+    """Se o span terminou com erro: is_error ou, em documentos antigos, TraceStatus"""
+    value = source.get("is_error")
+    if value is None:
+        return source.get(STATUS_FIELD) == TRACE_STATUS_ERROR
+    return bool(value)
+
+
 def build_query(
     index: str,
     client_id: Optional[str] = None,
     correlation_id: Optional[str] = None,
     period: Optional[str] = None,
     additional_filters: Optional[Dict[str, Any]] = None,
-    size: int = 100
+    size: int = 100,
+    time_range: Optional[Dict[str, str]] = None,
+    track_total_hits: Optional[Any] = None
 ) -> Dict[str, Any]:
     """
     Constrói uma query do OpenSearch com filtros opcionais
@@ -127,28 +223,24 @@ def build_query(
         period: Período em linguagem natural (ex: "ontem", "há 2 horas")
         additional_filters: Filtros adicionais em formato OpenSearch
         size: Número máximo de resultados
+        time_range: Range de @timestamp já calculado (tem precedência sobre period)
+        track_total_hits: Limite da contagem de hits (True = exata, int = contar até o limite)
     """
     must_clauses = []
     
     # Filtro por clientId
     if client_id:
-        must_clauses.append({
-            "term": {
-                "Attributes.clientId": client_id
-            }
-        })
+        must_clauses.append(build_correlation_filter("clientId", client_id))
     
     # Filtro por correlationId
     if correlation_id:
-        must_clauses.append({
-            "term": {
-                "Attributes.correlationId": correlation_id
-            }
-        })
+        must_clauses.append(build_correlation_filter("correlationId", correlation_id))
     
     # Filtro por período
-    if period:
+    if period and not time_range:
         time_range = parse_period(period)
+    
+    if time_range:
         must_clauses.append({
             "range": {
                 "@timestamp": time_range
@@ -160,7 +252,7 @@ def build_query(
         must_clauses.extend(additional_filters.get("must", []))
     
     query = {
-        "index": index,
+        "index": target_indices(index, time_range),
         "body": {
             "size": size,
             "sort": [
@@ -173,6 +265,9 @@ def build_query(
         }
     }
     
+    if track_total_hits is not None:
+        query["body"]["track_total_hits"] = track_total_hits
+    
     if must_clauses:
         query["body"]["query"] = {
             "bool": {
@@ -204,7 +299,9 @@ def format_results_for_ai(results: Dict[str, Any], result_type: str = "logs") ->
     if total == 0:
         return "Nenhum resultado encontrado."
     
-    formatted = [f"Total de {result_type}: {total}\n"]
+    # relation "gte" indica total parcial (ex: busca fatiada encerrada antecipadamente)
+    prefix = "pelo menos " if results["hits"]["total"].get("relation") == "gte" else ""
+    formatted = [f"Total de {result_type}: {prefix}{total}\n"]
     
     for i, hit in enumerate(hits[:20], 1):  # Limitar a 20 resultados
         source = hit.get("_source", {})
@@ -213,8 +310,8 @@ def format_results_for_ai(results: Dict[str, Any], result_type: str = "logs") ->
         if result_type == "logs":
             severity = source.get("SeverityText", "N/A")
             body = source.get("Body", "N/A")
-            correlation_id = source.get("Attributes", {}).get("correlationId", "N/A")
-            client_id = source.get("Attributes", {}).get("clientId", "N/A")
+            correlation_id = correlation_value(source, "correlationId")
+            client_id = correlation_value(source, "clientId")
             
             formatted.append(f"\n--- Log {i} ---")
             formatted.append(f"Timestamp: {timestamp}")
@@ -226,7 +323,7 @@ def format_results_for_ai(results: Dict[str, Any], result_type: str = "logs") ->
         elif result_type == "traces":
             name = source.get("Name", "N/A")
             kind = source.get("Kind", "N/A")
-            duration = source.get("Duration", "N/A")
+            duration_ms = duration_ms_value(source)
             trace_id = source.get("TraceId", "N/A")
             span_id = source.get("SpanId", "N/A")
             
@@ -234,7 +331,7 @@ def format_results_for_ai(results: Dict[str, Any], result_type: str = "logs") ->
             formatted.append(f"Timestamp: {timestamp}")
             formatted.append(f"Name: {name}")
             formatted.append(f"Kind: {kind}")
-            formatted.append(f"Duration: {duration}ns")
+            formatted.append(f"Duration: {duration_ms:.2f}ms" if duration_ms is not None else "Duration: N/A")
             formatted.append(f"TraceId: {trace_id}")
             formatted.append(f"SpanId: {span_id}")
     
@@ -243,3 +340,1023 @@ def format_results_for_ai(results: Dict[str, Any], result_type: str = "logs") ->
     
     return "\n".join(formatted)
 
+
+
+def build_root_span_filter() -> Dict[str, Any]:
+    """
+    Filtro que seleciona apenas root spans (sem ParentSpanId)
+
+    O exporter do collector pode omitir o campo ou gravá-lo vazio,
+    por isso os dois casos são aceitos.
+    """
+    return {
+        "bool": {
+            "should": [
+                {"bool": {"must_not": {"exists": {"field": "ParentSpanId"}}}},
+                {"term": {"ParentSpanId": ""}}
+            ],
+            "minimum_should_match": 1
+        }
+    }
+
+
+def build_slowest_traces_query(
+    index: str,
+    time_range: Dict[str, str],
+    operation_name: Optional[str] = None,
+    size: int = 10,
+    percentile: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Constrói uma query para os root spans mais lentos de um período
+
+    Usa apenas cláusulas de filtro (sem scoring) e ordena no servidor por
+    Duration (presente em todos os spans, com ou sem o pipeline), evitando
+    paginar resultados ordenados por @timestamp.
+
+    Args:
+        index: Nome do índice de traces
+        time_range: Range de @timestamp retornado por parse_period()
+        operation_name: Filtrar por nome da operação (campo Name)
+        size: Quantidade de spans retornados (top-K)
+        percentile: Se informado, calcula o percentil de Duration na mesma
+            requisição para permitir filtrar apenas spans acima dele
+    """
+    filter_clauses = [
+        {"range": {"@timestamp": time_range}},
+        build_root_span_filter()
+    ]
+
+    if operation_name:
+        filter_clauses.append({"term": {"Name": operation_name}})
+
+    query = {
+        "index": target_indices(index, time_range),
+        "body": {
+            "size": size,
+            "_source": [
+                "@timestamp",
+                "Name",
+                "duration_ms",
+                DURATION_FIELD,
+                "TraceId",
+                "SpanId",
+                *correlation_source_fields()
+            ],
+            "query": {
+                "bool": {
+                    "filter": filter_clauses
+                }
+            },
+            "sort": [
+                {DURATION_FIELD: {"order": "desc"}},
+                {"@timestamp": {"order": "desc"}}
+            ]
+        }
+    }
+
+    if percentile is not None:
+        query["body"]["aggs"] = {
+            "duration_threshold": {
+                "percentiles": {
+                    "field": DURATION_FIELD,
+                    "percents": [percentile]
+                }
+            }
+        }
+
+    return query
+
+
+def build_trace_link(trace_id: str, time_range: Dict[str, str]) -> str:
+    """Gera um link do Discover do OpenSearch Dashboards para a árvore de um trace"""
+    return (
+        f"{config.DASHBOARDS_URL}/app/discover#/"
+        f"?_g=(time:(from:'{time_range['gte']}',to:'{time_range['lte']}'))"
+        f"&_a=(index:'{config.TRACES_INDEX}',"
+        f"query:(language:kuery,query:'TraceId:\"{trace_id}\"'),"
+        f"sort:!(!('@timestamp',asc)))"
+    )
+
+
+def format_slowest_traces(
+    results: Dict[str, Any],
+    time_range: Dict[str, str],
+    percentile: Optional[float] = None
+) -> str:
+    """
+    Formata os root spans mais lentos para contexto da IA
+
+    Quando percentile é informado, descarta os spans abaixo do valor do
+    percentil calculado pela agregação duration_threshold.
+    """
+    if not results or "hits" not in results or "hits" not in results["hits"]:
+        return "Nenhum resultado encontrado."
+
+    hits = results["hits"]["hits"]
+    threshold = None
+
+    if percentile is not None:
+        values = results.get("aggregations", {}).get("duration_threshold", {}).get("values", {})
+        threshold = next(iter(values.values()), None)
+        if threshold is not None:
+            # O percentil vem em ns (Duration); as durações lidas do _source, em ms
+            threshold /= NANOS_PER_MS
+            hits = [hit for hit in hits if (duration_ms_value(hit.get("_source", {})) or 0) >= threshold]
+
+    if not hits:
+        return "Nenhum resultado encontrado."
+
+    formatted = [f"Top {len(hits)} root spans mais lentos"]
+    if threshold is not None:
+        formatted.append(f"Percentil p{percentile:g} de duração: {threshold:.2f}ms")
+
+    for i, hit in enumerate(hits, 1):
+        source = hit.get("_source", {})
+        trace_id = source.get("TraceId", "N/A")
+
+        formatted.append(f"\n--- Span {i} ---")
+        formatted.append(f"Timestamp: {source.get('@timestamp', 'N/A')}")
+        formatted.append(f"Name: {source.get('Name', 'N/A')}")
+        formatted.append(f"Duration: {duration_ms_value(source) or 0:.2f}ms")
+        formatted.append(f"CorrelationId: {correlation_value(source, 'correlationId')}")
+        formatted.append(f"ClientId: {correlation_value(source, 'clientId')}")
+        formatted.append(f"TraceId: {trace_id}")
+        formatted.append(f"Link: {build_trace_link(trace_id, time_range)}")
+
+    return "\n".join(formatted)
+
+
+# Intervalos candidatos para date_histogram, do mais fino ao mais grosso
+HISTOGRAM_INTERVALS = [
+    ("1m", timedelta(minutes=1)),
+    ("5m", timedelta(minutes=5)),
+    ("10m", timedelta(minutes=10)),
+    ("30m", timedelta(minutes=30)),
+    ("1h", timedelta(hours=1)),
+    ("3h", timedelta(hours=3)),
+    ("6h", timedelta(hours=6)),
+    ("12h", timedelta(hours=12)),
+    ("1d", timedelta(days=1)),
+    ("7d", timedelta(days=7))
+]
+
+# Rótulos do campo TraceStatus (códigos de status do OpenTelemetry)
+TRACE_STATUS_LABELS = {0: "Unset", 1: "Ok", TRACE_STATUS_ERROR: "Error"}
+
+SPARKLINE_CHARS = "▁▂▃▄▅▆▇█"
+
+
+def select_histogram_interval(time_range: Dict[str, str], max_buckets: int = 48) -> str:
+    """
+    Escolhe o menor intervalo fixo que mantém o histograma com até max_buckets buckets
+
+    Args:
+        time_range: Range de @timestamp retornado por parse_period()
+        max_buckets: Número máximo de buckets desejado
+    """
+    span = datetime.fromisoformat(time_range["lte"]) - datetime.fromisoformat(time_range["gte"])
+
+    for interval, size in HISTOGRAM_INTERVALS:
+        if span / size <= max_buckets:
+            return interval
+
+    return HISTOGRAM_INTERVALS[-1][0]
+
+
+INTERVAL_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+
+
+def parse_interval(interval: str) -> timedelta:
+    """
+    Converte um fixed_interval do OpenSearch (ex: '30s', '5m', '1h', '1d') em timedelta
+
+    Raises:
+        ValueError: Se o intervalo não estiver no formato <número><s|m|h|d>
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*([smhd])\s*", interval or "")
+    if not match or int(match.group(1)) <= 0:
+        raise ValueError(
+            f"Intervalo inválido: '{interval}'. Use um número positivo seguido de s, m, h ou d (ex: '5m', '1h')"
+        )
+
+    return timedelta(**{INTERVAL_UNITS[match.group(2)]: int(match.group(1))})
+
+
+def resolve_histogram_interval(
+    time_range: Dict[str, str],
+    interval: Optional[str] = None,
+    max_buckets: Optional[int] = None
+) -> str:
+    """
+    Valida o intervalo pedido para o histograma, elevando-o se gerar buckets demais
+
+    Com min_doc_count 0 e extended_bounds cada intervalo vira um bucket, mesmo vazio:
+    um '1s' sobre um mês estouraria o limite de buckets do cluster.
+
+    Args:
+        time_range: Range de @timestamp retornado por parse_period()
+        interval: Intervalo pedido (opcional); se ausente, é escolhido automaticamente
+        max_buckets: Máximo de buckets aceito (padrão: config.HISTOGRAM_MAX_BUCKETS)
+
+    Returns:
+        O intervalo pedido, ou o menor de HISTOGRAM_INTERVALS que caiba em max_buckets
+
+    Raises:
+        ValueError: Se o intervalo não puder ser interpretado
+    """
+    if not interval:
+        return select_histogram_interval(time_range)
+
+    max_buckets = max_buckets or config.HISTOGRAM_MAX_BUCKETS
+    span = datetime.fromisoformat(time_range["lte"]) - datetime.fromisoformat(time_range["gte"])
+
+    if span / parse_interval(interval) <= max_buckets:
+        return interval.strip()
+
+    return select_histogram_interval(time_range, max_buckets=max_buckets)
+
+
+def build_histogram_query(
+    index: str,
+    time_range: Dict[str, str],
+    interval: str,
+    split_field: str,
+    client_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Constrói uma agregação date_histogram com contagens por bucket divididas por split_field
+
+    Não retorna documentos (size 0): todo o trabalho é feito na agregação.
+
+    Args:
+        index: Nome do índice
+        time_range: Range de @timestamp retornado por parse_period()
+        interval: Intervalo fixo do histograma (ex: "5m", "1h")
+        split_field: Campo usado para dividir cada bucket (ex: SeverityText, TraceStatus)
+        client_id: Filtrar por clientId
+    """
+    filter_clauses = [{"range": {"@timestamp": time_range}}]
+
+    if client_id:
+        filter_clauses.append(build_correlation_filter("clientId", client_id))
+
+    return {
+        "index": target_indices(index, time_range),
+        "body": {
+            "size": 0,
+            "track_total_hits": True,
+            "query": {
+                "bool": {
+                    "filter": filter_clauses
+                }
+            },
+            "aggs": {
+                "over_time": {
+                    "date_histogram": {
+                        "field": "@timestamp",
+                        "fixed_interval": interval,
+                        "min_doc_count": 0,
+                        "extended_bounds": {
+                            "min": time_range["gte"],
+                            "max": time_range["lte"]
+                        }
+                    },
+                    "aggs": {
+                        "split": {
+                            "terms": {
+                                "field": split_field,
+                                "size": 10
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+
+
+def build_sparkline(values: list) -> str:
+    """Representa uma série de contagens como sparkline de uma linha"""
+    peak = max(values, default=0)
+    if peak == 0:
+        return SPARKLINE_CHARS[0] * len(values)
+
+    scale = len(SPARKLINE_CHARS) - 1
+    return "".join(SPARKLINE_CHARS[round(value / peak * scale)] for value in values)
+
+
+def format_histogram(
+    results: Dict[str, Any],
+    title: str,
+    labels: Optional[Dict[Any, str]] = None,
+    highlight: Optional[str] = None
+) -> str:
+    """
+    Formata um date_histogram como sparkline + tabela compacta para contexto da IA
+
+    Args:
+        results: Resultado de build_histogram_query()
+        title: Título da seção (ex: "Logs", "Traces")
+        labels: Mapeamento opcional de chave do terms para rótulo exibido
+        highlight: Rótulo que recebe uma sparkline própria (ex: "Error")
+    """
+    buckets = results.get("aggregations", {}).get("over_time", {}).get("buckets", [])
+    if not buckets:
+        return f"{title}: nenhum resultado encontrado."
+
+    labels = labels or {}
+    rows = []
+    columns = []
+
+    for bucket in buckets:
+        counts = {}
+        for split in bucket.get("split", {}).get("buckets", []):
+            label = labels.get(split["key"], str(split["key"]))
+            counts[label] = split["doc_count"]
+            if label not in columns:
+                columns.append(label)
+        rows.append((bucket.get("key_as_string", str(bucket["key"])), bucket["doc_count"], counts))
+
+    totals = [total for _, total, _ in rows]
+    formatted = [f"{title} ({sum(totals)} documentos, {len(rows)} buckets)"]
+    formatted.append(f"Total  {build_sparkline(totals)}")
+
+    if highlight:
+        highlighted = [counts.get(highlight, 0) for _, _, counts in rows]
+        formatted.append(f"{highlight:<6} {build_sparkline(highlighted)}")
+
+    formatted.append("")
+    formatted.append(" | ".join(["Bucket", "Total"] + columns))
+    for key, total, counts in rows:
+        if total == 0:
+            continue
+        formatted.append(" | ".join([key, str(total)] + [str(counts.get(column, 0)) for column in columns]))
+
+    return "\n".join(formatted)
+
+
+# Padrões mascarados ao normalizar o Body de logs sem message template indexado.
+# A ordem importa: GUIDs e ids hexadecimais antes de números soltos.
+MESSAGE_MASKS = [
+    (re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"), "<guid>"),
+    (re.compile(r"\b[0-9a-fA-F]{16,32}\b"), "<hex>"),
+    (re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+"), "<email>"),
+    (re.compile(r"-?\d+(?:[.,]\d+)?"), "<num>")
+]
+
+
+def build_template_clusters_query(
+    index: str,
+    time_range: Dict[str, str],
+    template_field: str,
+    size: int = 10,
+    severity: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Constrói uma agregação terms por message template com primeira/última ocorrência
+
+    Cada bucket traz um documento de exemplo (top_hits) com o correlationId.
+
+    Args:
+        index: Nome do índice de logs
+        time_range: Range de @timestamp retornado por parse_period()
+        template_field: Campo keyword com o message template
+        size: Número de clusters retornados (top-N)
+        severity: Filtrar por SeverityText
+    """
+    filter_clauses = [{"range": {"@timestamp": time_range}}]
+
+    if severity:
+        filter_clauses.append({"term": {"SeverityText": severity}})
+
+    return {
+        "index": target_indices(index, time_range),
+        "body": {
+            "size": 0,
+            "track_total_hits": True,
+            "query": {
+                "bool": {
+                    "filter": filter_clauses
+                }
+            },
+            "aggs": {
+                "templates": {
+                    "terms": {
+                        "field": template_field,
+                        "size": size
+                    },
+                    "aggs": {
+                        "first_seen": {"min": {"field": "@timestamp"}},
+                        "last_seen": {"max": {"field": "@timestamp"}},
+                        "sample": {
+                            "top_hits": {
+                                "size": 1,
+                                "sort": [{"@timestamp": {"order": "desc"}}],
+                                "_source": ["correlationId", "Attributes.correlationId"]
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+
+
+def build_message_sample_query(
+    index: str,
+    time_range: Dict[str, str],
+    size: int = 1000,
+    severity: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Constrói uma query que busca apenas os campos necessários para agrupar mensagens localmente
+
+    Usada quando o message template não está indexado como keyword.
+    """
+    filter_clauses = [{"range": {"@timestamp": time_range}}]
+
+    if severity:
+        filter_clauses.append({"term": {"SeverityText": severity}})
+
+    return {
+        "index": target_indices(index, time_range),
+        "body": {
+            "size": size,
+            "track_total_hits": True,
+            "_source": ["@timestamp", "Body", "correlationId", "Attributes.correlationId"],
+            "query": {
+                "bool": {
+                    "filter": filter_clauses
+                }
+            },
+            "sort": [
+                {
+                    "@timestamp": {
+                        "order": "desc"
+                    }
+                }
+            ]
+        }
+    }
+
+
+def mask_message(message: str) -> str:
+    """Normaliza uma mensagem renderizada trocando ids, emails e números por marcadores"""
+    for pattern, placeholder in MESSAGE_MASKS:
+        message = pattern.sub(placeholder, message)
+    return message
+
+
+def clusters_from_aggregation(results: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Converte os buckets de build_template_clusters_query() em clusters"""
+    buckets = results.get("aggregations", {}).get("templates", {}).get("buckets", [])
+    clusters = []
+
+    for bucket in buckets:
+        sample_hits = bucket.get("sample", {}).get("hits", {}).get("hits", [])
+        sample = sample_hits[0].get("_source", {}) if sample_hits else {}
+        clusters.append({
+            "template": bucket["key"],
+            "count": bucket["doc_count"],
+            "first_seen": bucket.get("first_seen", {}).get("value_as_string", "N/A"),
+            "last_seen": bucket.get("last_seen", {}).get("value_as_string", "N/A"),
+            "correlation_id": correlation_value(sample, "correlationId")
+        })
+
+    return clusters
+
+
+def clusters_from_hits(hits: List[Dict[str, Any]], size: int = 10) -> List[Dict[str, Any]]:
+    """
+    Agrupa logs localmente pelo Body normalizado com mask_message()
+
+    Os hits chegam ordenados por @timestamp desc, então a primeira ocorrência
+    vista de cada cluster é a mais recente.
+    """
+    clusters: Dict[str, Dict[str, Any]] = {}
+
+    for hit in hits:
+        source = hit.get("_source", {})
+        timestamp = source.get("@timestamp", "N/A")
+        template = mask_message(str(source.get("Body", "")))
+
+        cluster = clusters.get(template)
+        if cluster is None:
+            clusters[template] = {
+                "template": template,
+                "count": 1,
+                "first_seen": timestamp,
+                "last_seen": timestamp,
+                "correlation_id": correlation_value(source, "correlationId")
+            }
+        else:
+            cluster["count"] += 1
+            cluster["first_seen"] = timestamp
+
+    return sorted(clusters.values(), key=lambda cluster: cluster["count"], reverse=True)[:size]
+
+
+def format_message_clusters(
+    clusters: List[Dict[str, Any]],
+    total: int,
+    method: str,
+    sampled: Optional[int] = None
+) -> str:
+    """
+    Formata clusters de mensagens para contexto da IA
+
+    Args:
+        clusters: Lista retornada por clusters_from_aggregation() ou clusters_from_hits()
+        total: Total de logs do período
+        method: Descrição de como os clusters foram calculados
+        sampled: Quantos logs (os mais recentes) foram agrupados, quando os clusters
+            vêm de uma amostra e não de todos os logs do período
+    """
+    if not clusters:
+        return "Nenhum resultado encontrado."
+
+    partial = sampled is not None and sampled < total
+    if partial:
+        formatted = [
+            f"Total de logs: {total}. Clusters calculados sobre uma amostra dos {sampled} logs mais recentes "
+            f"({sampled / total * 100:.1f}% do período; {len(clusters)} clusters, agrupados por {method}). "
+            f"Contagens e primeira ocorrência referem-se apenas à amostra."
+        ]
+    else:
+        formatted = [f"Total de logs: {total} ({len(clusters)} clusters, agrupados por {method})"]
+
+    for i, cluster in enumerate(clusters, 1):
+        formatted.append(f"\n--- Cluster {i} ---")
+        formatted.append(f"Template: {cluster['template']}")
+        if partial:
+            formatted.append(f"Count: {cluster['count']} de {sampled} na amostra ({cluster['count'] / sampled * 100:.1f}%)")
+        else:
+            formatted.append(f"Count: {cluster['count']}")
+        formatted.append(f"First seen: {cluster['first_seen']}")
+        formatted.append(f"Last seen: {cluster['last_seen']}")
+        formatted.append(f"Sample CorrelationId: {cluster['correlation_id']}")
+
+    return "\n".join(formatted)
+
+
+def build_operation_stats_query(
+    index: str,
+    time_range: Dict[str, str],
+    operation_name: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Constrói uma query com total, erros e p50/p95/p99 de duração por operação
+
+    Os percentis vêm da agregação percentiles de cada operação, calculada sobre
+    todos os documentos do período (não sobre uma amostra). Erros e percentis usam
+    TraceStatus e Duration, presentes também em documentos anteriores ao pipeline.
+
+    Args:
+        index: Nome do índice de traces
+        time_range: Range de @timestamp retornado por parse_period()
+        operation_name: Filtrar por nome da operação
+    """
+    filter_clauses = [{"range": {"@timestamp": time_range}}]
+
+    if operation_name:
+        filter_clauses.append({"term": {"Name": operation_name}})
+
+    return {
+        "index": target_indices(index, time_range),
+        "body": {
+            "size": 0,
+            "track_total_hits": True,
+            "query": {
+                "bool": {
+                    "filter": filter_clauses
+                }
+            },
+            "aggs": {
+                "by_operation": {
+                    "terms": {
+                        "field": "Name",
+                        "size": 100
+                    },
+                    "aggs": {
+                        "errors": {
+                            "filter": build_error_filter()
+                        },
+                        "latency": {
+                            "percentiles": {
+                                "field": DURATION_FIELD,
+                                "percents": [50, 95, 99]
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+
+
+def build_operation_sample_query(
+    index: str,
+    time_range: Dict[str, str],
+    operation_name: str,
+    size: int = 2000,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """
+    Constrói uma query que retorna uma amostra aleatória das durações de uma operação
+
+    random_score (semente fixa, sobre _seq_no) sorteia os documentos de forma
+    uniforme dentro da operação, independente da ordem do índice. Cada operação tem
+    a sua amostra, então operações raras não perdem espaço para as frequentes.
+
+    Args:
+        index: Nome do índice de traces
+        time_range: Range de @timestamp retornado por parse_period()
+        operation_name: Nome da operação amostrada
+        size: Tamanho da amostra
+        seed: Semente do sorteio (mesma semente = mesma amostra)
+    """
+    return {
+        "index": target_indices(index, time_range),
+        "body": {
+            "size": size,
+            "_source": ["duration_ms", DURATION_FIELD],
+            "query": {
+                "function_score": {
+                    "query": {
+                        "bool": {
+                            "filter": [
+                                {"range": {"@timestamp": time_range}},
+                                {"term": {"Name": operation_name}}
+                            ]
+                        }
+                    },
+                    "random_score": {"seed": seed, "field": "_seq_no"},
+                    "boost_mode": "replace"
+                }
+            }
+        }
+    }
+
+
+def operation_stats_from_aggregation(results: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Extrai totais, erros e percentis em ms (lista p50/p95/p99 ou None) por operação da agregação by_operation"""
+    buckets = results.get("aggregations", {}).get("by_operation", {}).get("buckets", [])
+
+    def percentiles(bucket):
+        values = bucket.get("latency", {}).get("values", {})
+        ordered = [values.get(key) for key in ("50.0", "95.0", "99.0")]
+        return None if any(value is None for value in ordered) else [value / NANOS_PER_MS for value in ordered]
+
+    return {
+        "counts": {bucket["key"]: bucket["doc_count"] for bucket in buckets},
+        "errors": {bucket["key"]: bucket.get("errors", {}).get("doc_count", 0) for bucket in buckets},
+        "percentiles": {bucket["key"]: percentiles(bucket) for bucket in buckets}
+    }
+
+
+def format_period_comparison(
+    comparisons: List[Dict[str, Any]],
+    baseline_range: Dict[str, str],
+    target_range: Dict[str, str],
+    criteria: Optional[str] = None
+) -> str:
+    """
+    Formata a comparação de latência/throughput/erros entre dois períodos
+
+    Operações com mudança estatisticamente significativa e acima do efeito mínimo
+    são marcadas com ⚠️; criteria descreve esses limites no cabeçalho.
+    """
+    if not comparisons:
+        return "Nenhum resultado encontrado."
+
+    def ms(percentiles, index):
+        return "N/A" if percentiles is None else f"{percentiles[index]:.2f}ms"
+
+    def delta(baseline, target, index):
+        if baseline is None or target is None or baseline[index] == 0:
+            return ""
+        return f" ({(target[index] - baseline[index]) / baseline[index] * 100:+.1f}%)"
+
+    formatted = [
+        f"Base: {baseline_range['gte']} até {baseline_range['lte']}",
+        f"Alvo: {target_range['gte']} até {target_range['lte']}"
+    ]
+    if criteria:
+        formatted.append(f"Critério: {criteria}")
+
+    for comparison in comparisons:
+        baseline = comparison["baseline_percentiles"]
+        target = comparison["target_percentiles"]
+        flags = []
+        if comparison["latency_significant"]:
+            flags.append(f"latência p={comparison['latency_p_value']:.4f}")
+        if comparison["error_significant"]:
+            flags.append(f"erros p={comparison['error_p_value']:.4f}")
+
+        header = f"\n--- {comparison['operation']} ---"
+        if flags:
+            header += f" ⚠️ mudança significativa ({', '.join(flags)})"
+        formatted.append(header)
+
+        for index, percentile in enumerate([50, 95, 99]):
+            formatted.append(
+                f"p{percentile}: {ms(baseline, index)} -> {ms(target, index)}{delta(baseline, target, index)}"
+            )
+        formatted.append(
+            f"Throughput: {comparison['baseline_throughput']:.3f}/s -> {comparison['target_throughput']:.3f}/s"
+        )
+        formatted.append(
+            f"Taxa de erro: {comparison['baseline_error_rate'] * 100:.2f}% -> {comparison['target_error_rate'] * 100:.2f}%"
+        )
+        formatted.append(
+            f"Amostras do teste: {comparison['baseline_samples']} -> {comparison['target_samples']}"
+        )
+
+    return "\n".join(formatted)
+
+
+# Campos retornados pelo tail: apenas o necessário para acompanhar eventos
+TAIL_SOURCE_FIELDS = {
+    "logs": ["@timestamp", "SeverityText", "Body", *correlation_source_fields()],
+    "traces": ["@timestamp", "Name", *TRACE_SOURCE_FIELDS, "TraceId", *correlation_source_fields()]
+}
+
+
+def build_tail_query(
+    index: str,
+    result_type: str,
+    cursor: Optional[int] = None,
+    seen_ids: Optional[List[str]] = None,
+    overlap_ms: int = 0,
+    client_id: Optional[str] = None,
+    correlation_id: Optional[str] = None,
+    severity: Optional[str] = None,
+    lookback: str = "now-15m",
+    size: int = 50
+) -> Dict[str, Any]:
+    """
+    Constrói uma query incremental (tail) ordenada por @timestamp com _id como desempate
+
+    Sem cursor, retorna os documentos mais recentes da janela lookback (ordem desc).
+    Com cursor (@timestamp do documento mais novo já visto), relê a partir de
+    cursor - overlap_ms em ordem asc, excluindo os _id já vistos: documentos que
+    ficam pesquisáveis depois de outros mais novos (batch do Collector + refresh do
+    índice) ainda são entregues, e a exclusão no servidor garante que a leitura
+    avance mesmo com muitos documentos já vistos na janela.
+
+    Args:
+        index: Nome do índice
+        result_type: "logs" ou "traces" (define os campos retornados)
+        cursor: @timestamp (epoch millis) do documento mais novo já retornado
+        seen_ids: _id já retornados à sessão dentro da janela de sobreposição
+        overlap_ms: Quanto reler antes do cursor
+        client_id: Filtrar por clientId
+        correlation_id: Filtrar por correlationId
+        severity: Filtrar por SeverityText (apenas logs)
+        lookback: Início da janela na primeira chamada (date math do OpenSearch)
+        size: Número máximo de documentos por chamada
+    """
+    if cursor is not None:
+        filter_clauses = [{"range": {"@timestamp": {"gte": cursor - overlap_ms, "format": "epoch_millis"}}}]
+        order = "asc"
+    else:
+        filter_clauses = [{"range": {"@timestamp": {"gte": lookback}}}]
+        order = "desc"
+
+    if client_id:
+        filter_clauses.append(build_correlation_filter("clientId", client_id))
+
+    if correlation_id:
+        filter_clauses.append(build_correlation_filter("correlationId", correlation_id))
+
+    if severity:
+        filter_clauses.append({"term": {"SeverityText": severity}})
+
+    bool_query: Dict[str, Any] = {"filter": filter_clauses}
+    if seen_ids:
+        bool_query["must_not"] = [{"ids": {"values": list(seen_ids)}}]
+
+    return {
+        "index": index,
+        "body": {
+            "size": size,
+            "track_total_hits": False,
+            "_source": TAIL_SOURCE_FIELDS[result_type],
+            "query": {
+                "bool": bool_query
+            },
+            "sort": [
+                {"@timestamp": {"order": order}},
+                {"_id": {"order": order}}
+            ]
+        }
+    }
+
+
+def format_tail_results(hits: List[Dict[str, Any]], result_type: str, has_more: bool) -> str:
+    """
+    Formata documentos do tail em uma linha por documento (payload mínimo)
+
+    Args:
+        hits: Hits em ordem cronológica
+        result_type: "logs" ou "traces"
+        has_more: Se ainda há documentos novos além do limite desta chamada
+    """
+    if not hits:
+        return "Nenhum documento novo."
+
+    formatted = [f"{len(hits)} {result_type} novos"]
+
+    for hit in hits:
+        source = hit.get("_source", {})
+        timestamp = source.get("@timestamp", "N/A")
+        correlation_id = correlation_value(source, "correlationId", "-")
+        client_id = correlation_value(source, "clientId", "-")
+
+        if result_type == "logs":
+            formatted.append(
+                f"{timestamp} [{source.get('SeverityText', 'N/A')}] "
+                f"corr={correlation_id} client={client_id} {source.get('Body', '')}"
+            )
+        else:
+            status = "Error" if is_error_value(source) else "Ok"
+            formatted.append(
+                f"{timestamp} {source.get('Name', 'N/A')} {duration_ms_value(source) or 0:.2f}ms "
+                f"{status} corr={correlation_id} client={client_id} trace={source.get('TraceId', 'N/A')}"
+            )
+
+    if has_more:
+        formatted.append("... há mais documentos novos; chame novamente para continuar.")
+
+    return "\n".join(formatted)
+
+
+def build_count_query(
+    index: str,
+    time_range: Dict[str, str],
+    group_field: str,
+    additional_filters: Optional[Dict[str, Any]] = None,
+    terminate_after: Optional[int] = None,
+    group_size: int = 50,
+    timeout: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Constrói uma query de contagem (size 0) com contagens por grupo, usada por fatia no modo aproximado
+
+    Args:
+        index: Nome do índice
+        time_range: Range de @timestamp da fatia
+        group_field: Campo da agregação terms "groups" (ex: SeverityText, Name)
+        additional_filters: Filtros adicionais no formato de build_query()
+        terminate_after: Máximo de documentos coletados por shard
+        group_size: Número máximo de grupos por fatia
+        timeout: Timeout da busca no OpenSearch (ex: "2000ms"); ao expirar, os shards
+            devolvem o que já coletaram e a resposta vem com timed_out
+    """
+    filter_clauses = [{"range": {"@timestamp": time_range}}]
+
+    if additional_filters:
+        filter_clauses.extend(additional_filters.get("must", []))
+
+    query = {
+        "index": target_indices(index, time_range),
+        "body": {
+            "size": 0,
+            "track_total_hits": True,
+            "query": {
+                "bool": {
+                    "filter": filter_clauses
+                }
+            },
+            "aggs": {
+                "groups": {
+                    "terms": {
+                        "field": group_field,
+                        "size": group_size
+                    }
+                }
+            }
+        }
+    }
+
+    if terminate_after:
+        query["body"]["terminate_after"] = terminate_after
+
+    if timeout:
+        query["body"]["timeout"] = timeout
+
+    return query
+
+
+def format_estimate(estimate: Dict[str, Any], result_type: str, group_field: str) -> str:
+    """
+    Formata as estimativas do modo aproximado com a margem de erro de 95%
+
+    Quando fatias sorteadas foram canceladas pelo orçamento ou truncadas por
+    terminate_after (lower_bound), a estimativa é apresentada como limite
+    inferior, sem margem de erro.
+
+    Args:
+        estimate: Resultado de approximate.approximate_counts()
+        result_type: Tipo de resultado ("logs" ou "traces")
+        group_field: Campo usado para agrupar as contagens
+    """
+    lower_bound = estimate.get("lower_bound", False)
+
+    def approx(value):
+        if lower_bound:
+            return f"≥ ~{value['estimate']:.0f}"
+        if value["margin"] == 0:
+            return f"{value['estimate']:.0f} (exato)"
+        if value["margin"] == float("inf"):
+            return f"~{value['estimate']:.0f} (margem indisponível)"
+        return f"~{value['estimate']:.0f} ± {value['margin']:.0f}"
+
+    label = "limite inferior" if lower_bound else "IC 95%"
+    formatted = [
+        f"Estimativa (modo aproximado, {label}): {approx(estimate['total'])} {result_type} "
+        f"({estimate['slices_sampled']}/{estimate['slices_total']} fatias de tempo amostradas)"
+    ]
+
+    if estimate.get("slices_missing"):
+        formatted.append(
+            f"Atenção: {estimate['slices_missing']} fatia(s) sorteada(s) não terminaram dentro do orçamento "
+            "e ficaram de fora. As fatias lentas costumam ser as mais pesadas, então o total real tende a "
+            "ser maior e não há margem de erro válida; aumente latency_budget_ms ou use mode 'exact'."
+        )
+    if estimate["truncated"]:
+        formatted.append("Atenção: alguma fatia atingiu terminate_after ou o timeout; a estimativa é um limite inferior.")
+
+    if estimate["groups"]:
+        formatted.append(f"Por {group_field}:")
+        for key, value in estimate["groups"].items():
+            formatted.append(f"  {key}: {approx(value)}")
+
+    return "\n".join(formatted)
+
+
+def build_export_query(
+    pit_id: str,
+    keep_alive: str,
+    time_range: Dict[str, str],
+    source_fields: List[str],
+    client_id: Optional[str] = None,
+    correlation_id: Optional[str] = None,
+    severity: Optional[str] = None,
+    operation_name: Optional[str] = None,
+    cursor: Optional[list] = None,
+    size: int = 5000
+) -> Dict[str, Any]:
+    """
+    Constrói uma página da exportação colunar sobre um point in time (PIT)
+
+    O PIT fixa a visão dos índices durante toda a exportação, então a paginação
+    com search_after não perde nem repete documentos indexados no meio do caminho.
+    A query não tem "index": ele é definido na criação do PIT.
+
+    Args:
+        pit_id: ID do PIT (o mais recente devolvido pelo OpenSearch)
+        keep_alive: Quanto tempo manter o PIT aberto até a próxima página
+        time_range: Range de @timestamp retornado por parse_period()
+        source_fields: Campos do _source a retornar
+        client_id / correlation_id: Filtros opcionais
+        severity: Filtrar por SeverityText (logs)
+        operation_name: Filtrar por Name (traces)
+        cursor: Valores de sort do último documento da página anterior
+        size: Documentos por página
+    """
+    filter_clauses = [{"range": {"@timestamp": time_range}}]
+
+    if client_id:
+        filter_clauses.append(build_correlation_filter("clientId", client_id))
+
+    if correlation_id:
+        filter_clauses.append(build_correlation_filter("correlationId", correlation_id))
+
+    if severity:
+        filter_clauses.append({"term": {"SeverityText": severity}})
+
+    if operation_name:
+        filter_clauses.append({"term": {"Name": operation_name}})
+
+    body = {
+        "size": size,
+        "track_total_hits": False,
+        "_source": source_fields,
+        "pit": {"id": pit_id, "keep_alive": keep_alive},
+        "query": {
+            "bool": {
+                "filter": filter_clauses
+            }
+        },
+        "sort": [
+            {"@timestamp": {"order": "asc"}},
+            {"_id": {"order": "asc"}}
+        ]
+    }
+
+    if cursor:
+        body["search_after"] = cursor
+
+    return {"body": body}
@@ -4,9 +4,13 @@ MCP Server para OpenSearch
 Permite consultar logs e traces com filtros por clientId, correlationId e período
 """
 import asyncio
+import contextvars
 import json
 import sys
 import os
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from typing import Any, Optional
 from concurrent.futures import ThreadPoolExecutor
 from opensearchpy import OpenSearch
@@ -18,6 +22,13 @@ from mcp.types import Tool, TextContent
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 import config
 import query_builder
+import latency_stats
+import sliced_search
+import approximate
+import profiler
+import columnar
+from admission import AdmissionController, AdmissionRejected
+from tool_registry import ToolRegistry
 
 # Criar cliente OpenSearch
 opensearch_client = OpenSearch(
@@ -35,263 +46,494 @@ opensearch_client = OpenSearch(
 # Executor para operações síncronas do OpenSearch
 executor = ThreadPoolExecutor(max_workers=4)
 
+# Controle de admissão: protege o OpenSearch de loops de agentes e carga concorrente
+admission_controller = AdmissionController(
+    max_concurrent=config.ADMISSION_MAX_CONCURRENT,
+    max_queue=config.ADMISSION_MAX_QUEUE,
+    queue_timeout=config.ADMISSION_QUEUE_TIMEOUT,
+    tool_rate=config.TOOL_RATE_PER_SECOND,
+    tool_burst=config.TOOL_BURST,
+    client_rate=config.CLIENT_RATE_PER_SECOND,
+    client_burst=config.CLIENT_BURST,
+    max_clients=config.ADMISSION_MAX_CLIENTS
+)
+
+# Quando definido (pela tool profile_tool_query), cada busca é executada com
+# profile: true e registrada nesta lista junto com a resposta
+profiled_searches: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar(
+    "profiled_searches", default=None
+)
+
 
 async def search_opensearch(query: dict) -> dict:
     """Executa busca no OpenSearch de forma assíncrona"""
     loop = asyncio.get_event_loop()
     # Extrair index e body do query dict (criar cópia para não modificar original)
     query_copy = query.copy()
-    index = query_copy.pop("index")
+    # Buscas sobre um point in time não informam índice (ele é fixado no PIT)
+    index = query_copy.pop("index", None)
     body = query_copy.pop("body")
-    return await loop.run_in_executor(
+    if index is not None:
+        # Índices diários ainda não criados (dias sem dados) não devem gerar erro
+        query_copy.setdefault("ignore_unavailable", True)
+    
+    profiles = profiled_searches.get()
+    if profiles is not None:
+        body = {**body, "profile": True}
+    
+    async with admission_controller.slot():
+        future = loop.run_in_executor(
+            executor,
+            lambda: opensearch_client.search(index=index, body=body, **query_copy)
+        )
+        try:
+            result = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Cancelar a espera não interrompe a thread do executor: a vaga só é
+            # liberada quando a busca termina de fato, mantendo o limite de concorrência
+            await asyncio.wait([future])
+            raise
+    
+    if profiles is not None:
+        profiles.append({"index": index, "body": body, "response": result})
+    return result
+
+
+async def search_with_period(
+    index: str,
+    period: Optional[str] = None,
+    size: int = 100,
+    time_range: Optional[dict] = None,
+    **filters
+) -> dict:
+    """
+    Executa build_query() + busca, fatiando por tempo quando o período é longo
+
+    Períodos maiores que SLICED_SEARCH_MIN_HOURS são divididos em fatias de
+    SLICE_HOURS consultadas das mais recentes para as mais antigas, parando
+    assim que houver hits suficientes.
+    """
+    if time_range is None and period:
+        time_range = query_builder.parse_period(period)
+    
+    if time_range:
+        span = datetime.fromisoformat(time_range["lte"]) - datetime.fromisoformat(time_range["gte"])
+        if span > timedelta(hours=config.SLICED_SEARCH_MIN_HOURS):
+            return await sliced_search.search_time_sliced(
+                search=search_opensearch,
+                build_slice_query=lambda slice_range: query_builder.build_query(
+                    index=index, time_range=slice_range, size=size, **filters
+                ),
+                time_range=time_range,
+                size=size,
+                slice_size=timedelta(hours=config.SLICE_HOURS),
+                concurrency=config.SLICED_SEARCH_CONCURRENCY
+            )
+    
+    query = query_builder.build_query(index=index, time_range=time_range, size=size, **filters)
+    return await search_opensearch(query)
+
+
+async def search_period_tool(
+    index: str,
+    period: str,
+    result_type: str,
+    group_field: str,
+    additional_filters: Optional[dict] = None,
+    mode: str = "exact",
+    budget_ms: int = config.APPROX_BUDGET_MS
+) -> str:
+    """
+    Executa as tools de período (search_logs_by_period / search_traces_by_period)
+
+    O modo exato (padrão) conta tudo. No modo aproximado, períodos maiores que
+    APPROX_MIN_HOURS não são contados por inteiro: a contagem de hits é limitada a
+    APPROX_TRACK_TOTAL_HITS e o total (e as contagens por group_field) é estimado
+    a partir de uma amostra de fatias de tempo, com margem de erro. Cada fatia
+    leva o orçamento como timeout do OpenSearch, para que fatias atrasadas parem
+    também no servidor.
+    """
+    time_range = query_builder.parse_period(period)
+    span = datetime.fromisoformat(time_range["lte"]) - datetime.fromisoformat(time_range["gte"])
+    
+    if mode == "exact" or span <= timedelta(hours=config.APPROX_MIN_HOURS):
+        results = await search_with_period(
+            index=index,
+            time_range=time_range,
+            additional_filters=additional_filters,
+            size=100
+        )
+        return query_builder.format_results_for_ai(results, result_type)
+    
+    results, estimate = await asyncio.gather(
+        search_with_period(
+            index=index,
+            time_range=time_range,
+            additional_filters=additional_filters,
+            size=100,
+            track_total_hits=config.APPROX_TRACK_TOTAL_HITS
+        ),
+        approximate.approximate_counts(
+            search=search_opensearch,
+            build_slice_query=lambda slice_range: query_builder.build_count_query(
+                index=index,
+                time_range=slice_range,
+                group_field=group_field,
+                additional_filters=additional_filters,
+                terminate_after=config.APPROX_TERMINATE_AFTER,
+                timeout=f"{budget_ms}ms"
+            ),
+            time_range=time_range,
+            total_slices=config.APPROX_SLICES,
+            sample_slices=config.APPROX_SAMPLE_SLICES,
+            budget_seconds=budget_ms / 1000
+        )
+    )
+    
+    return (
+        query_builder.format_estimate(estimate, result_type, group_field)
+        + "\n\n"
+        + query_builder.format_results_for_ai(results, result_type)
+    )
+
+
+async def open_point_in_time(index: str) -> str:
+    """Abre um point in time (PIT) no índice e retorna seu ID"""
+    loop = asyncio.get_event_loop()
+    async with admission_controller.slot():
+        result = await loop.run_in_executor(
+            executor,
+            lambda: opensearch_client.create_pit(
+                index=index,
+                params={"keep_alive": config.EXPORT_PIT_KEEP_ALIVE}
+            )
+        )
+    return result["pit_id"]
+
+
+async def close_point_in_time(pit_id: str) -> None:
+    """Fecha um PIT (sem esperar o keep_alive expirar)"""
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(
         executor,
-        lambda: opensearch_client.search(index=index, body=body, **query_copy)
+        lambda: opensearch_client.delete_pit(body={"pit_id": [pit_id]})
     )
 
+
+def export_path(file_name: str) -> str:
+    """Caminho de um arquivo exportado, restrito ao EXPORT_DIR"""
+    path = os.path.join(config.EXPORT_DIR, os.path.basename(file_name))
+    if not os.path.isfile(path):
+        available = sorted(
+            name for name in os.listdir(config.EXPORT_DIR)
+            if name.endswith(tuple(columnar.EXPORT_FORMATS.values()))
+        ) if os.path.isdir(config.EXPORT_DIR) else []
+        raise ValueError(
+            f"Arquivo '{file_name}' não encontrado em {config.EXPORT_DIR}"
+            + (f" (disponíveis: {', '.join(available)})" if available else "")
+        )
+    return path
+
+
+async def get_field_types(index: Optional[str], fields: set) -> dict[str, set]:
+    """Retorna os tipos de mapping de cada campo nos índices consultados (via _field_caps)"""
+    if not fields or index is None:
+        return {}
+    
+    loop = asyncio.get_event_loop()
+    caps = await loop.run_in_executor(
+        executor,
+        lambda: opensearch_client.field_caps(index=index, fields=",".join(sorted(fields)), ignore_unavailable=True)
+    )
+    return {field: set(types) for field, types in caps.get("fields", {}).items()}
+
+
+# Tools com efeitos colaterais: reexecutá-las para diagnóstico alteraria estado
+PROFILE_BLOCKED_TOOLS = {
+    "tail": "avança o cursor da sessão de tail",
+    "export_columnar": "grava um arquivo de exportação",
+    "profile_tool_query": "perfilaria a si mesma"
+}
+
+
+async def profile_tool(tool_name: str, tool_arguments: dict[str, Any]) -> str:
+    """
+    Reexecuta outra tool com profile: true em todas as suas buscas e resume onde o tempo foi gasto
+
+    O handler é chamado diretamente (sem passar de novo pelos limites de taxa, que a
+    própria profile_tool_query já consumiu); erros da tool perfilada são propagados.
+    """
+    if tool_name in PROFILE_BLOCKED_TOOLS:
+        raise ValueError(f"A tool '{tool_name}' não pode ser perfilada: {PROFILE_BLOCKED_TOOLS[tool_name]}")
+    spec = registry.get(tool_name)
+    if spec is None:
+        raise ValueError(f"Tool '{tool_name}' não encontrada")
+    arguments = spec.validate(tool_arguments)
+    
+    profiles = []
+    token = profiled_searches.set(profiles)
+    try:
+        await spec.handler(arguments)
+    finally:
+        profiled_searches.reset(token)
+    
+    profiled = []
+    for search in profiles:
+        body = search["body"]
+        field_types = await get_field_types(search["index"], profiler.collect_fields(body))
+        profiled.append({
+            "index": search["index"],
+            "body": body,
+            "summary": profiler.summarize_profile(search["response"]),
+            "findings": profiler.find_costly_clauses(body, field_types)
+        })
+    
+    return profiler.format_profile_report(tool_name, profiled)
+
+
+# Cache de campos agregáveis já confirmados via _field_caps
+aggregatable_fields: dict[tuple[str, str], str] = {}
+
+
+async def find_aggregatable_field(index: str, field: str) -> Optional[str]:
+    """
+    Retorna o nome do campo (ou do subcampo .keyword) que suporta agregações terms
+
+    Retorna None quando o campo não existe ou não é agregável no mapping atual.
+    Apenas resultados positivos são mantidos em cache, para que uma mudança de
+    mapping passe a ser usada sem reiniciar o servidor.
+    """
+    key = (index, field)
+    if key in aggregatable_fields:
+        return aggregatable_fields[key]
+    
+    loop = asyncio.get_event_loop()
+    candidates = [field, f"{field}.keyword"]
+    caps = await loop.run_in_executor(
+        executor,
+        lambda: opensearch_client.field_caps(index=index, fields=",".join(candidates))
+    )
+    
+    for candidate in candidates:
+        field_caps = caps.get("fields", {}).get(candidate, {})
+        if any(cap.get("aggregatable") for cap in field_caps.values()):
+            aggregatable_fields[key] = candidate
+            return candidate
+    
+    return None
+
+
+# Estado do tail por (session_id, tipo): @timestamp (epoch millis) do documento mais
+# novo já retornado e os _id vistos dentro da janela de sobreposição (_id -> @timestamp).
+# OrderedDict usado como LRU para limitar o número de sessões em memória.
+tail_cursors: OrderedDict[tuple[str, str], dict] = OrderedDict()
+
+
+def save_tail_cursor(key: tuple[str, str], hits: list) -> None:
+    """Avança o cursor de uma sessão com os hits retornados, descartando as sessões menos usadas"""
+    state = tail_cursors.get(key) or {"cursor": None, "seen": OrderedDict()}
+    seen = state["seen"]
+    for hit in hits:
+        timestamp = hit["sort"][0]
+        seen[hit["_id"]] = timestamp
+        if state["cursor"] is None or timestamp > state["cursor"]:
+            state["cursor"] = timestamp
+
+    # Ids fora da janela não voltam a aparecer na releitura; o limite protege a
+    # query (ids excedentes podem ser reentregues, nunca perdidos)
+    window_start = state["cursor"] - config.TAIL_OVERLAP_MS
+    for seen_id, timestamp in list(seen.items()):
+        if timestamp < window_start or len(seen) > config.TAIL_MAX_SEEN_IDS:
+            del seen[seen_id]
+
+    tail_cursors[key] = state
+    tail_cursors.move_to_end(key)
+    while len(tail_cursors) > config.TAIL_MAX_SESSIONS:
+        tail_cursors.popitem(last=False)
+
 # Criar instância do servidor MCP
 server = Server("opensearch-mcp")
 
+# Tools registradas com @registry.tool (schema, validação e handler)
+registry = ToolRegistry()
 
-@server.list_tools()
-async def list_tools() -> list[Tool]:
-    """Lista todas as tools disponíveis"""
-    return [
-        Tool(
-            name="search_logs_by_client",
-            description="Busca logs no OpenSearch filtrados por clientId e período opcional. Útil para analisar todas as operações de um cliente específico.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "client_id": {
-                        "type": "string",
-                        "description": "ID do cliente (ex: '12345')"
-                    },
-                    "period": {
-                        "type": "string",
-                        "description": "Período em linguagem natural (ex: 'ontem', 'há 2 horas', '24 de novembro às 14h', 'última semana'). Se não fornecido, busca últimas 24 horas."
-                    }
-                },
-                "required": ["client_id"]
-            }
-        ),
-        Tool(
-            name="search_logs_by_correlation",
-            description="Busca logs no OpenSearch filtrados por correlationId e período opcional. Útil para rastrear o fluxo completo de uma requisição específica.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "correlation_id": {
-                        "type": "string",
-                        "description": "ID de correlação (ex: 'init-10-op-5')"
-                    },
-                    "period": {
-                        "type": "string",
-                        "description": "Período em linguagem natural (ex: 'ontem', 'há 2 horas'). Se não fornecido, busca últimas 24 horas."
-                    }
-                },
-                "required": ["correlation_id"]
-            }
-        ),
-        Tool(
-            name="search_traces_by_client",
-            description="Busca traces no OpenSearch filtrados por clientId e período opcional. Útil para analisar o desempenho e fluxo de operações de um cliente.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "client_id": {
-                        "type": "string",
-                        "description": "ID do cliente (ex: '12345')"
-                    },
-                    "period": {
-                        "type": "string",
-                        "description": "Período em linguagem natural (ex: 'ontem', 'há 2 horas'). Se não fornecido, busca últimas 24 horas."
-                    }
-                },
-                "required": ["client_id"]
-            }
-        ),
-        Tool(
-            name="search_traces_by_correlation",
-            description="Busca traces no OpenSearch filtrados por correlationId e período opcional. Útil para rastrear o fluxo completo de uma requisição específica em nível de traces.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "correlation_id": {
-                        "type": "string",
-                        "description": "ID de correlação (ex: 'init-10-op-5')"
-                    },
-                    "period": {
-                        "type": "string",
-                        "description": "Período em linguagem natural (ex: 'ontem', 'há 2 horas'). Se não fornecido, busca últimas 24 horas."
-                    }
-                },
-                "required": ["correlation_id"]
+
+def admission_client_key(arguments: dict[str, Any]) -> str:
+    """Chave do token bucket de cliente: clientId dos argumentos ou a sessão MCP"""
+    if arguments.get("client_id"):
+        return f"client-{arguments['client_id']}"
+    try:
+        return f"session-{id(server.request_context.session)}"
+    except LookupError:
+        return "session"
+
+
+@registry.tool(
+    name="search_logs_by_client",
+    description="Busca logs no OpenSearch filtrados por clientId e período opcional. Útil para analisar todas as operações de um cliente específico.",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "client_id": {
+                "type": "string",
+                "description": "ID do cliente (ex: '12345')"
+            },
+            "period": {
+                "type": "string",
+                "description": "Período em linguagem natural (ex: 'ontem', 'há 2 horas', '24 de novembro às 14h', 'última semana'). Se não fornecido, busca últimas 24 horas."
             }
-        ),
-        Tool(
-            name="get_full_flow",
-            description="Busca logs E traces completos por correlationId e período. Retorna o fluxo completo de uma requisição para análise detalhada pela IA.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "correlation_id": {
-                        "type": "string",
-                        "description": "ID de correlação (ex: 'init-10-op-5')"
-                    },
-                    "period": {
-                        "type": "string",
-                        "description": "Período em linguagem natural (ex: 'ontem', 'há 2 horas'). Se não fornecido, busca últimas 24 horas."
-                    }
-                },
-                "required": ["correlation_id"]
+        },
+        "required": ["client_id"]
+    }
+)
+async def handle_search_logs_by_client(arguments: dict[str, Any]) -> str:
+    client_id = arguments["client_id"]
+    period = arguments.get("period")
+    
+    results = await search_with_period(
+        index=config.LOGS_INDEX,
+        client_id=client_id,
+        period=period,
+        size=100
+    )
+    return query_builder.format_results_for_ai(results, "logs")
+
+
+@registry.tool(
+    name="search_logs_by_correlation",
+    description="Busca logs no OpenSearch filtrados por correlationId e período opcional. Útil para rastrear o fluxo completo de uma requisição específica.",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "correlation_id": {
+                "type": "string",
+                "description": "ID de correlação (ex: 'init-10-op-5')"
+            },
+            "period": {
+                "type": "string",
+                "description": "Período em linguagem natural (ex: 'ontem', 'há 2 horas'). Se não fornecido, busca últimas 24 horas."
             }
-        ),
-        Tool(
-            name="search_logs_by_period",
-            description="Busca logs no OpenSearch filtrados apenas por período. Útil para análise geral de logs em um período específico.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "period": {
-                        "type": "string",
-                        "description": "Período em linguagem natural (ex: 'ontem', 'há 2 horas', '24 de novembro às 14h', 'última semana')"
-                    },
-                    "severity": {
-                        "type": "string",
-                        "description": "Filtrar por severidade (opcional): 'Information', 'Warning', 'Error'"
-                    }
-                },
-                "required": ["period"]
+        },
+        "required": ["correlation_id"]
+    }
+)
+async def handle_search_logs_by_correlation(arguments: dict[str, Any]) -> str:
+    correlation_id = arguments["correlation_id"]
+    period = arguments.get("period")
+    
+    results = await search_with_period(
+        index=config.LOGS_INDEX,
+        correlation_id=correlation_id,
+        period=period,
+        size=100
+    )
+    return query_builder.format_results_for_ai(results, "logs")
+
+
+@registry.tool(
+    name="search_traces_by_client",
+    description="Busca traces no OpenSearch filtrados por clientId e período opcional. Útil para analisar o desempenho e fluxo de operações de um cliente.",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "client_id": {
+                "type": "string",
+                "description": "ID do cliente (ex: '12345')"
+            },
+            "period": {
+                "type": "string",
+                "description": "Período em linguagem natural (ex: 'ontem', 'há 2 horas'). Se não fornecido, busca últimas 24 horas."
             }
-        ),
-        Tool(
-            name="search_traces_by_period",
-            description="Busca traces no OpenSearch filtrados apenas por período. Útil para análise geral de traces em um período específico.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "period": {
-                        "type": "string",
-                        "description": "Período em linguagem natural (ex: 'ontem', 'há 2 horas', '24 de novembro às 14h', 'última semana')"
-                    },
-                    "operation_name": {
-                        "type": "string",
-                        "description": "Filtrar por nome da operação (opcional, ex: 'TransferFunds', 'GetBalance')"
-                    }
-                },
-                "required": ["period"]
+        },
+        "required": ["client_id"]
+    }
+)
+async def handle_search_traces_by_client(arguments: dict[str, Any]) -> str:
+    client_id = arguments["client_id"]
+    period = arguments.get("period")
+    
+    results = await search_with_period(
+        index=config.TRACES_INDEX,
+        client_id=client_id,
+        period=period,
+        size=100
+    )
+    return query_builder.format_results_for_ai(results, "traces")
+
+
+@registry.tool(
+    name="search_traces_by_correlation",
+    description="Busca traces no OpenSearch filtrados por correlationId e período opcional. Útil para rastrear o fluxo completo de uma requisição específica em nível de traces.",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "correlation_id": {
+                "type": "string",
+                "description": "ID de correlação (ex: 'init-10-op-5')"
+            },
+            "period": {
+                "type": "string",
+                "description": "Período em linguagem natural (ex: 'ontem', 'há 2 horas'). Se não fornecido, busca últimas 24 horas."
             }
-        )
-    ]
+        },
+        "required": ["correlation_id"]
+    }
+)
+async def handle_search_traces_by_correlation(arguments: dict[str, Any]) -> str:
+    correlation_id = arguments["correlation_id"]
+    period = arguments.get("period")
+    
+    results = await search_with_period(
+        index=config.TRACES_INDEX,
+        correlation_id=correlation_id,
+        period=period,
+        size=100
+    )
+    return query_builder.format_results_for_ai(results, "traces")
 
 
-@server.call_tool()
-async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
-    """Executa uma tool específica"""
+@registry.tool(
+    name="get_full_flow",
+    description="Busca logs E traces completos por correlationId e período. Retorna o fluxo completo de uma requisição para análise detalhada pela IA.",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "correlation_id": {
+                "type": "string",
+                "description": "ID de correlação (ex: 'init-10-op-5')"
+            },
+            "period": {
+                "type": "string",
+                "description": "Período em linguagem natural (ex: 'ontem', 'há 2 horas'). Se não fornecido, busca últimas 24 horas."
+            }
+        },
+        "required": ["correlation_id"]
+    }
+)
+async def handle_get_full_flow(arguments: dict[str, Any]) -> str:
+    correlation_id = arguments["correlation_id"]
+    period = arguments.get("period")
     
-    try:
-        if name == "search_logs_by_client":
-            client_id = arguments["client_id"]
-            period = arguments.get("period")
-            
-            query = query_builder.build_query(
-                index=config.LOGS_INDEX,
-                client_id=client_id,
-                period=period,
-                size=100
-            )
-            
-            results = await search_opensearch(query)
-            formatted = query_builder.format_results_for_ai(results, "logs")
-            
-            return [TextContent(
-                type="text",
-                text=formatted
-            )]
-        
-        elif name == "search_logs_by_correlation":
-            correlation_id = arguments["correlation_id"]
-            period = arguments.get("period")
-            
-            query = query_builder.build_query(
-                index=config.LOGS_INDEX,
-                correlation_id=correlation_id,
-                period=period,
-                size=100
-            )
-            
-            results = await search_opensearch(query)
-            formatted = query_builder.format_results_for_ai(results, "logs")
-            
-            return [TextContent(
-                type="text",
-                text=formatted
-            )]
-        
-        elif name == "search_traces_by_client":
-            client_id = arguments["client_id"]
-            period = arguments.get("period")
-            
-            query = query_builder.build_query(
-                index=config.TRACES_INDEX,
-                client_id=client_id,
-                period=period,
-                size=100
-            )
-            
-            results = await search_opensearch(query)
-            formatted = query_builder.format_results_for_ai(results, "traces")
-            
-            return [TextContent(
-                type="text",
-                text=formatted
-            )]
-        
-        elif name == "search_traces_by_correlation":
-            correlation_id = arguments["correlation_id"]
-            period = arguments.get("period")
-            
-            query = query_builder.build_query(
-                index=config.TRACES_INDEX,
-                correlation_id=correlation_id,
-                period=period,
-                size=100
-            )
-            
-            results = await search_opensearch(query)
-            formatted = query_builder.format_results_for_ai(results, "traces")
-            
-            return [TextContent(
-                type="text",
-                text=formatted
-            )]
-        
-        elif name == "get_full_flow":
-            correlation_id = arguments["correlation_id"]
-            period = arguments.get("period")
-            
-            # Buscar logs
-            logs_query = query_builder.build_query(
-                index=config.LOGS_INDEX,
-                correlation_id=correlation_id,
-                period=period,
-                size=100
-            )
-            logs_results = await search_opensearch(logs_query)
-            logs_formatted = query_builder.format_results_for_ai(logs_results, "logs")
-            
-            # Buscar traces
-            traces_query = query_builder.build_query(
-                index=config.TRACES_INDEX,
-                correlation_id=correlation_id,
-                period=period,
-                size=100
-            )
-            traces_results = await search_opensearch(traces_query)
-            traces_formatted = query_builder.format_results_for_ai(traces_results, "traces")
-            
-            # Combinar resultados
-            combined = f"""
+    # Buscar logs
+    logs_results = await search_with_period(
+        index=config.LOGS_INDEX,
+        correlation_id=correlation_id,
+        period=period,
+        size=100
+    )
+    logs_formatted = query_builder.format_results_for_ai(logs_results, "logs")
+    
+    # Buscar traces
+    traces_results = await search_with_period(
+        index=config.TRACES_INDEX,
+        correlation_id=correlation_id,
+        period=period,
+        size=100
+    )
+    traces_formatted = query_builder.format_results_for_ai(traces_results, "traces")
+    
+    # Combinar resultados
+    combined = f"""
 === FLUXO COMPLETO - CorrelationId: {correlation_id} ===
 
 --- LOGS ---
@@ -302,80 +544,672 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
 
 === FIM DO FLUXO ===
 """
-            
-            return [TextContent(
-                type="text",
-                text=combined
-            )]
-        
-        elif name == "search_logs_by_period":
-            period = arguments["period"]
-            severity = arguments.get("severity")
-            
-            additional_filters = None
-            if severity:
-                additional_filters = {
-                    "must": [
-                        {
-                            "term": {
-                                "SeverityText": severity
-                            }
-                        }
-                    ]
+    
+    return combined
+
+
+@registry.tool(
+    name="search_logs_by_period",
+    description="Busca logs no OpenSearch filtrados apenas por período. Útil para análise geral de logs em um período específico.",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "period": {
+                "type": "string",
+                "description": "Período em linguagem natural (ex: 'ontem', 'há 2 horas', '24 de novembro às 14h', 'última semana')"
+            },
+            "severity": {
+                "type": "string",
+                "description": "Filtrar por severidade (opcional): 'Information', 'Warning', 'Error'"
+            },
+            "mode": {
+                "type": "string",
+                "enum": ["approximate", "exact"],
+                "description": "Modo de contagem (opcional, padrão: 'exact'). Em períodos longos, 'approximate' estima o total por amostragem com margem de erro, com latência limitada por latency_budget_ms."
+            },
+            "latency_budget_ms": {
+                "type": "integer",
+                "description": "Orçamento de latência do modo aproximado em milissegundos (opcional, padrão: 2000)"
+            }
+        },
+        "required": ["period"]
+    }
+)
+async def handle_search_logs_by_period(arguments: dict[str, Any]) -> str:
+    period = arguments["period"]
+    severity = arguments.get("severity")
+    
+    additional_filters = None
+    if severity:
+        additional_filters = {
+            "must": [
+                {
+                    "term": {
+                        "SeverityText": severity
+                    }
                 }
-            
-            query = query_builder.build_query(
-                index=config.LOGS_INDEX,
-                period=period,
-                additional_filters=additional_filters,
-                size=100
-            )
-            
-            results = await search_opensearch(query)
-            formatted = query_builder.format_results_for_ai(results, "logs")
-            
-            return [TextContent(
-                type="text",
-                text=formatted
-            )]
-        
-        elif name == "search_traces_by_period":
-            period = arguments["period"]
-            operation_name = arguments.get("operation_name")
-            
-            additional_filters = None
-            if operation_name:
-                additional_filters = {
-                    "must": [
-                        {
-                            "term": {
-                                "Name": operation_name
-                            }
-                        }
-                    ]
+            ]
+        }
+    
+    return await search_period_tool(
+        index=config.LOGS_INDEX,
+        period=period,
+        result_type="logs",
+        group_field="SeverityText",
+        additional_filters=additional_filters,
+        mode=arguments.get("mode", "exact"),
+        budget_ms=int(arguments.get("latency_budget_ms", config.APPROX_BUDGET_MS))
+    )
+
+
+@registry.tool(
+    name="search_traces_by_period",
+    description="Busca traces no OpenSearch filtrados apenas por período. Útil para análise geral de traces em um período específico.",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "period": {
+                "type": "string",
+                "description": "Período em linguagem natural (ex: 'ontem', 'há 2 horas', '24 de novembro às 14h', 'última semana')"
+            },
+            "operation_name": {
+                "type": "string",
+                "description": "Filtrar por nome da operação (opcional, ex: 'TransferFunds', 'GetBalance')"
+            },
+            "mode": {
+                "type": "string",
+                "enum": ["approximate", "exact"],
+                "description": "Modo de contagem (opcional, padrão: 'exact'). Em períodos longos, 'approximate' estima o total por amostragem com margem de erro, com latência limitada por latency_budget_ms."
+            },
+            "latency_budget_ms": {
+                "type": "integer",
+                "description": "Orçamento de latência do modo aproximado em milissegundos (opcional, padrão: 2000)"
+            }
+        },
+        "required": ["period"]
+    }
+)
+async def handle_search_traces_by_period(arguments: dict[str, Any]) -> str:
+    period = arguments["period"]
+    operation_name = arguments.get("operation_name")
+    
+    additional_filters = None
+    if operation_name:
+        additional_filters = {
+            "must": [
+                {
+                    "term": {
+                        "Name": operation_name
+                    }
                 }
-            
-            query = query_builder.build_query(
+            ]
+        }
+    
+    return await search_period_tool(
+        index=config.TRACES_INDEX,
+        period=period,
+        result_type="traces",
+        group_field="Name",
+        additional_filters=additional_filters,
+        mode=arguments.get("mode", "exact"),
+        budget_ms=int(arguments.get("latency_budget_ms", config.APPROX_BUDGET_MS))
+    )
+
+
+@registry.tool(
+    name="get_slowest_traces",
+    description="Retorna os root spans mais lentos de um período (ordenados por duração no OpenSearch), com correlationId, clientId e link para a árvore do trace. Útil para encontrar requisições lentas e outliers.",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "period": {
+                "type": "string",
+                "description": "Período em linguagem natural (ex: 'ontem', 'há 2 horas', 'última semana')"
+            },
+            "operation_name": {
+                "type": "string",
+                "description": "Filtrar por nome da operação (opcional, ex: 'POST /transactions')"
+            },
+            "top_k": {
+                "type": "integer",
+                "description": "Quantidade de spans retornados (opcional, padrão: 10, máximo: 100)"
+            },
+            "percentile": {
+                "type": "number",
+                "description": "Retorna apenas spans acima deste percentil de duração no período (opcional, maior que 0 e até 100, ex: 95, 99)"
+            }
+        },
+        "required": ["period"]
+    }
+)
+async def handle_get_slowest_traces(arguments: dict[str, Any]) -> str:
+    period = arguments["period"]
+    operation_name = arguments.get("operation_name")
+    top_k = max(1, min(int(arguments.get("top_k", 10)), 100))
+    percentile = arguments.get("percentile")
+    if percentile is not None and not 0 < percentile <= 100:
+        raise ValueError(f"percentile deve estar entre 0 (exclusivo) e 100: {percentile}")
+    
+    time_range = query_builder.parse_period(period)
+    query = query_builder.build_slowest_traces_query(
+        index=config.TRACES_INDEX,
+        time_range=time_range,
+        operation_name=operation_name,
+        size=top_k,
+        percentile=percentile
+    )
+    
+    results = await search_opensearch(query)
+    return query_builder.format_slowest_traces(results, time_range, percentile)
+
+
+@registry.tool(
+    name="get_activity_histogram",
+    description="Histograma temporal de logs (por SeverityText) e traces (por status de erro) em um período, usando uma única agregação date_histogram por índice. Útil para descobrir quando erros começaram ou picos de volume.",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "period": {
+                "type": "string",
+                "description": "Período em linguagem natural (ex: 'ontem', 'há 2 horas', 'última semana')"
+            },
+            "client_id": {
+                "type": "string",
+                "description": "Filtrar por clientId (opcional)"
+            },
+            "interval": {
+                "type": "string",
+                "description": "Intervalo fixo dos buckets (opcional, ex: '1m', '1h'). Se não fornecido, é escolhido automaticamente a partir do período. Intervalos que gerariam buckets demais para o período são elevados automaticamente."
+            }
+        },
+        "required": ["period"]
+    }
+)
+async def handle_get_activity_histogram(arguments: dict[str, Any]) -> str:
+    period = arguments["period"]
+    client_id = arguments.get("client_id")
+    
+    time_range = query_builder.parse_period(period)
+    requested_interval = arguments.get("interval")
+    interval = query_builder.resolve_histogram_interval(time_range, requested_interval)
+    
+    logs_query = query_builder.build_histogram_query(
+        index=config.LOGS_INDEX,
+        time_range=time_range,
+        interval=interval,
+        split_field="SeverityText",
+        client_id=client_id
+    )
+    traces_query = query_builder.build_histogram_query(
+        index=config.TRACES_INDEX,
+        time_range=time_range,
+        interval=interval,
+        split_field=query_builder.STATUS_FIELD,
+        client_id=client_id
+    )
+    
+    # As duas agregações são independentes: executar em paralelo
+    logs_results, traces_results = await asyncio.gather(
+        search_opensearch(logs_query),
+        search_opensearch(traces_query)
+    )
+    
+    logs_formatted = query_builder.format_histogram(
+        logs_results, "Logs por severidade", highlight="Error"
+    )
+    traces_formatted = query_builder.format_histogram(
+        traces_results,
+        "Spans por status",
+        labels=query_builder.TRACE_STATUS_LABELS,
+        highlight="Error"
+    )
+    
+    interval_note = ""
+    if requested_interval and interval != requested_interval.strip():
+        interval_note = (
+            f"\nIntervalo '{requested_interval}' geraria mais de {config.HISTOGRAM_MAX_BUCKETS} "
+            f"buckets neste período; usado '{interval}'."
+        )
+    
+    combined = f"""
+=== HISTOGRAMA - {time_range['gte']} até {time_range['lte']} (intervalo: {interval}) ==={interval_note}
+
+--- LOGS ---
+{logs_formatted}
+
+--- TRACES ---
+{traces_formatted}
+"""
+    
+    return combined
+
+
+@registry.tool(
+    name="cluster_log_messages",
+    description="Agrupa os logs de um período por message template do Serilog (ou pelo Body com ids e números mascarados) e retorna os clusters mais frequentes com contagem, primeira/última ocorrência e um correlationId de exemplo. Útil para descobrir quais erros mais se repetem.",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "period": {
+                "type": "string",
+                "description": "Período em linguagem natural (ex: 'ontem', 'há 2 horas', 'última semana')"
+            },
+            "severity": {
+                "type": "string",
+                "description": "Filtrar por severidade (opcional): 'Information', 'Warning', 'Error'"
+            },
+            "top_n": {
+                "type": "integer",
+                "description": "Quantidade de clusters retornados (opcional, padrão: 10)"
+            }
+        },
+        "required": ["period"]
+    }
+)
+async def handle_cluster_log_messages(arguments: dict[str, Any]) -> str:
+    period = arguments["period"]
+    severity = arguments.get("severity")
+    top_n = int(arguments.get("top_n", 10))
+    
+    time_range = query_builder.parse_period(period)
+    template_field = await find_aggregatable_field(config.LOGS_INDEX, config.LOG_TEMPLATE_FIELD)
+    
+    sampled = None
+    if template_field:
+        # Template indexado: agrupar no servidor com uma agregação terms
+        query = query_builder.build_template_clusters_query(
+            index=config.LOGS_INDEX,
+            time_range=time_range,
+            template_field=template_field,
+            size=top_n,
+            severity=severity
+        )
+        results = await search_opensearch(query)
+        clusters = query_builder.clusters_from_aggregation(results)
+        method = "message template"
+    else:
+        # Sem template indexado: mascarar ids e números localmente
+        query = query_builder.build_message_sample_query(
+            index=config.LOGS_INDEX,
+            time_range=time_range,
+            severity=severity
+        )
+        results = await search_opensearch(query)
+        hits = results["hits"]["hits"]
+        clusters = query_builder.clusters_from_hits(hits, top_n)
+        method = "mensagem normalizada"
+        sampled = len(hits)
+    
+    total = results["hits"]["total"].get("value", 0)
+    return query_builder.format_message_clusters(clusters, total, method, sampled)
+
+
+@registry.tool(
+    name="compare_periods",
+    description="Compara dois períodos por operação: p50/p95/p99 de duração, throughput e taxa de erro, marcando mudanças estatisticamente significativas. Útil para detectar regressões de latência após um deploy.",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "baseline_period": {
+                "type": "string",
+                "description": "Período de referência em linguagem natural (ex: 'ontem')"
+            },
+            "target_period": {
+                "type": "string",
+                "description": "Período comparado em linguagem natural (ex: 'hoje', 'há 2 horas')"
+            },
+            "operation_name": {
+                "type": "string",
+                "description": "Filtrar por nome da operação (opcional, ex: 'TransferFunds')"
+            },
+            "alpha": {
+                "type": "number",
+                "description": "Nível de significância (opcional, padrão: 0.05)"
+            },
+            "min_relative_change": {
+                "type": "number",
+                "description": "Variação relativa mínima do p50 para marcar uma mudança de latência (opcional, padrão: 0.1 = 10%)"
+            },
+            "min_error_rate_change": {
+                "type": "number",
+                "description": "Diferença mínima da taxa de erro para marcar uma mudança (opcional, padrão: 0.01 = 1 ponto percentual)"
+            }
+        },
+        "required": ["baseline_period", "target_period"]
+    }
+)
+async def handle_compare_periods(arguments: dict[str, Any]) -> str:
+    baseline_range = query_builder.parse_period(arguments["baseline_period"])
+    target_range = query_builder.parse_period(arguments["target_period"])
+    operation_name = arguments.get("operation_name")
+    alpha = float(arguments.get("alpha", 0.05))
+    min_relative_change = float(arguments.get("min_relative_change", 0.1))
+    min_error_rate_change = float(arguments.get("min_error_rate_change", 0.01))
+    
+    # Percentis e contagens de todos os documentos; o teste de Mann-Whitney usa uma
+    # amostra aleatória separada por operação
+    stats = await asyncio.gather(*[
+        search_opensearch(query_builder.build_operation_stats_query(
+            index=config.TRACES_INDEX,
+            time_range=time_range,
+            operation_name=operation_name
+        ))
+        for time_range in (baseline_range, target_range)
+    ])
+    periods = [query_builder.operation_stats_from_aggregation(results) for results in stats]
+    
+    semaphore = asyncio.Semaphore(config.COMPARISON_CONCURRENCY)
+    
+    async def sample(time_range: dict[str, str], operation: str):
+        async with semaphore:
+            results = await search_opensearch(query_builder.build_operation_sample_query(
                 index=config.TRACES_INDEX,
-                period=period,
-                additional_filters=additional_filters,
-                size=100
-            )
-            
-            results = await search_opensearch(query)
-            formatted = query_builder.format_results_for_ai(results, "traces")
-            
-            return [TextContent(
-                type="text",
-                text=formatted
-            )]
+                time_range=time_range,
+                operation_name=operation,
+                size=config.COMPARISON_SAMPLE_SIZE
+            ))
+        return latency_stats.hits_to_durations(results["hits"]["hits"])
+    
+    for period, time_range in zip(periods, (baseline_range, target_range)):
+        operations = list(period["counts"])
+        samples = await asyncio.gather(*[sample(time_range, operation) for operation in operations])
+        period["durations"] = dict(zip(operations, samples))
+        period["seconds"] = latency_stats.period_seconds(time_range)
+    
+    comparisons = latency_stats.compare_operations(
+        periods[0], periods[1], alpha, min_relative_change, min_error_rate_change
+    )
+    criteria = (
+        f"p < {alpha} e variação do p50 ≥ {min_relative_change * 100:.0f}% "
+        f"(erros: diferença ≥ {min_error_rate_change * 100:.1f} p.p.)"
+    )
+    return query_builder.format_period_comparison(comparisons, baseline_range, target_range, criteria)
+
+
+@registry.tool(
+    name="tail",
+    description="Acompanha logs ou traces novos de forma incremental. Cada sessão mantém um cursor: a primeira chamada retorna os documentos mais recentes e as seguintes apenas os que chegaram depois da última chamada (inclusive os que ficaram pesquisáveis com atraso, que podem vir com @timestamp anterior ao último já retornado). Útil para acompanhar erros durante testes de carga.",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "session_id": {
+                "type": "string",
+                "description": "Identificador da sessão de tail (ex: 'load-test-1'). Cada sessão tem seu próprio cursor."
+            },
+            "source": {
+                "type": "string",
+                "enum": ["logs", "traces"],
+                "description": "Tipo de documento acompanhado (opcional, padrão: 'logs')"
+            },
+            "client_id": {
+                "type": "string",
+                "description": "Filtrar por clientId (opcional)"
+            },
+            "correlation_id": {
+                "type": "string",
+                "description": "Filtrar por correlationId (opcional)"
+            },
+            "severity": {
+                "type": "string",
+                "description": "Filtrar por severidade, apenas logs (opcional): 'Information', 'Warning', 'Error'"
+            },
+            "limit": {
+                "type": "integer",
+                "description": "Máximo de documentos por chamada (opcional, padrão: 50, máximo: 500)"
+            },
+            "reset": {
+                "type": "boolean",
+                "description": "Descarta o cursor da sessão e recomeça pelos documentos mais recentes (opcional)"
+            }
+        },
+        "required": ["session_id"]
+    }
+)
+async def handle_tail(arguments: dict[str, Any]) -> str:
+    # source já validado pelo enum do schema
+    source = arguments.get("source") or "logs"
+    
+    key = (arguments["session_id"], source)
+    limit = max(1, min(int(arguments.get("limit", 50)), 500))
+    if arguments.get("reset"):
+        tail_cursors.pop(key, None)
+    state = tail_cursors.get(key)
+    cursor = state["cursor"] if state else None
+    
+    query = query_builder.build_tail_query(
+        index=config.LOGS_INDEX if source == "logs" else config.TRACES_INDEX,
+        result_type=source,
+        cursor=cursor,
+        seen_ids=list(state["seen"]) if state else None,
+        overlap_ms=config.TAIL_OVERLAP_MS,
+        client_id=arguments.get("client_id"),
+        correlation_id=arguments.get("correlation_id"),
+        severity=arguments.get("severity") if source == "logs" else None,
+        size=limit
+    )
+    
+    results = await search_opensearch(query)
+    hits = results["hits"]["hits"]
+    if cursor is None:
+        # Primeira chamada busca em ordem desc: inverter para ordem cronológica
+        hits.reverse()
+    
+    if hits:
+        save_tail_cursor(key, hits)
+    
+    return query_builder.format_tail_results(
+        hits, source, has_more=cursor is not None and len(hits) == limit
+    )
+
+
+@registry.tool(
+    name="export_columnar",
+    description="Exporta todos os logs ou traces de um período (com filtros opcionais) para um arquivo colunar local (Arrow ou Parquet) com colunas tipadas: timestamp, duration_ms, name, severity, correlationId, clientId, trace_id, is_error e message. Para análise pós-incidente com query_columnar, sem repetir buscas no OpenSearch.",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "source": {
+                "type": "string",
+                "enum": ["logs", "traces"],
+                "description": "O que exportar: 'logs' ou 'traces'"
+            },
+            "period": {
+                "type": "string",
+                "description": "Período em linguagem natural (ex: 'ontem', 'última semana')"
+            },
+            "client_id": {
+                "type": "string",
+                "description": "Filtrar por clientId (opcional)"
+            },
+            "correlation_id": {
+                "type": "string",
+                "description": "Filtrar por correlationId (opcional)"
+            },
+            "severity": {
+                "type": "string",
+                "description": "Filtrar logs por severidade (opcional)"
+            },
+            "operation_name": {
+                "type": "string",
+                "description": "Filtrar traces por nome da operação (opcional)"
+            },
+            "format": {
+                "type": "string",
+                "enum": ["arrow", "parquet"],
+                "description": "'arrow' (padrão, lido via memory map sem cópia) ou 'parquet' (comprimido, para compartilhar)"
+            },
+            "max_docs": {
+                "type": "integer",
+                "description": "Máximo de documentos exportados (opcional)"
+            }
+        },
+        "required": ["source", "period"]
+    }
+)
+async def handle_export_columnar(arguments: dict[str, Any]) -> str:
+    source = arguments["source"]
+    export_format = arguments.get("format") or "arrow"
+    max_docs = max(1, min(int(arguments.get("max_docs") or config.EXPORT_MAX_DOCS), config.EXPORT_MAX_DOCS))
+    time_range = query_builder.parse_period(arguments["period"])
+    
+    os.makedirs(config.EXPORT_DIR, exist_ok=True)
+    file_name = (
+        f"{source}-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        f"{columnar.EXPORT_FORMATS[export_format]}"
+    )
+    path = os.path.join(config.EXPORT_DIR, file_name)
+    
+    def build_page_query(pit_id: str, cursor: Optional[list]) -> dict:
+        return query_builder.build_export_query(
+            pit_id=pit_id,
+            keep_alive=config.EXPORT_PIT_KEEP_ALIVE,
+            time_range=time_range,
+            source_fields=columnar.EXPORT_REQUEST_FIELDS,
+            client_id=arguments.get("client_id"),
+            correlation_id=arguments.get("correlation_id"),
+            severity=arguments.get("severity") if source == "logs" else None,
+            operation_name=arguments.get("operation_name") if source == "traces" else None,
+            cursor=cursor,
+            size=min(config.EXPORT_PAGE_SIZE, max_docs)
+        )
+    
+    pit_id = await open_point_in_time(config.LOGS_INDEX if source == "logs" else config.TRACES_INDEX)
+    try:
+        export = await columnar.export_hits(
+            search_opensearch, build_page_query, pit_id, path, export_format, max_docs
+        )
+        pit_id = export["pit_id"]
+    finally:
+        await close_point_in_time(pit_id)
+    
+    return columnar.format_export_result(export, file_name, os.path.getsize(path), source)
+
+
+@registry.tool(
+    name="query_columnar",
+    description="Consulta local (sem OpenSearch) sobre um arquivo gerado por export_columnar: filtros de igualdade, duração mínima, agrupamento por coluna e percentis de duration_ms, calculados de forma vetorizada sobre o arquivo mapeado em memória.",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "file": {
+                "type": "string",
+                "description": "Nome do arquivo retornado por export_columnar"
+            },
+            "where": {
+                "type": "object",
+                "description": "Filtros de igualdade: coluna -> valor ou lista de valores (ex: {\"name\": \"TransferFunds\", \"is_error\": true})"
+            },
+            "min_duration_ms": {
+                "type": "number",
+                "description": "Considerar apenas linhas com duration_ms maior ou igual (opcional)"
+            },
+            "group_by": {
+                "type": "string",
+                "enum": columnar.GROUPABLE_COLUMNS,
+                "description": "Coluna para agrupar (opcional)"
+            },
+            "percentiles": {
+                "type": "array",
+                "description": "Percentis de duration_ms (padrão: [50, 95, 99])"
+            },
+            "top_n": {
+                "type": "integer",
+                "description": "Máximo de grupos exibidos (padrão: 50)"
+            }
+        },
+        "required": ["file"]
+    }
+)
+async def handle_query_columnar(arguments: dict[str, Any]) -> str:
+    path = export_path(arguments["file"])
+    group_by = arguments.get("group_by")
+    
+    def run_query() -> str:
+        table = columnar.load_table(path)
+        filtered = columnar.filter_table(table, arguments.get("where"), arguments.get("min_duration_ms"))
+        groups = columnar.summarize_groups(filtered, group_by, arguments.get("percentiles"))
+        return columnar.format_group_summary(
+            groups, table.num_rows, filtered.num_rows, group_by, int(arguments.get("top_n") or 50)
+        )
+    
+    # Filtros e agregações rodam fora do event loop
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(executor, run_query)
+
+
+@registry.tool(
+    name="profile_tool_query",
+    description="Diagnóstico: reexecuta outra tool deste servidor com profile: true e resume took, tempos por shard (query/collector/aggs/fetch), os nós de query mais caros e cláusulas custosas (must com scoring, wildcard, campos text, sorts profundos). Não aceita tools com efeitos colaterais (tail, export_columnar).",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "tool_name": {
+                "type": "string",
+                "description": "Nome da tool a perfilar (ex: 'search_logs_by_client')"
+            },
+            "tool_arguments": {
+                "type": "object",
+                "description": "Argumentos da tool perfilada (ex: {\"client_id\": \"12345\", \"period\": \"ontem\"})"
+            }
+        },
+        "required": ["tool_name"]
+    }
+)
+async def handle_profile_tool_query(arguments: dict[str, Any]) -> str:
+    return await profile_tool(arguments["tool_name"], arguments.get("tool_arguments") or {})
+
+
+@registry.tool(
+    name="get_admission_stats",
+    description="Estatísticas do controle de admissão: buscas em andamento e na fila, chamadas admitidas e rejeitadas por motivo e por tool. Não consome limite de taxa.",
+    input_schema={
+        "type": "object",
+        "properties": {},
+        "required": []
+    },
+    rate_limited=False
+)
+async def handle_get_admission_stats(arguments: dict[str, Any]) -> str:
+    return json.dumps(admission_controller.stats(), indent=2)
+
+
+@server.list_tools()
+async def list_tools() -> list[Tool]:
+    """Lista todas as tools disponíveis (montada uma única vez, no registro)"""
+    return registry.tools
+
+
+@server.call_tool(validate_input=False)
+async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
+    """Executa uma tool específica"""
+    
+    spec = registry.get(name)
+    if spec is None:
+        return [TextContent(
+            type="text",
+            text=json.dumps({"error": f"Tool '{name}' não encontrada"}, indent=2)
+        )]
+    
+    try:
+        arguments = spec.validate(arguments or {})
+        if spec.rate_limited:
+            admission_controller.check_rate(name, admission_client_key(arguments))
         
-        else:
-            return [TextContent(
-                type="text",
-                text=json.dumps({"error": f"Tool '{name}' não encontrada"}, indent=2)
-            )]
+        return [TextContent(
+            type="text",
+            text=await spec.handler(arguments)
+        )]
     
+    except AdmissionRejected as e:
+        return [TextContent(
+            type="text",
+            text=json.dumps({
+                "error": str(e),
+                "type": type(e).__name__,
+                "reason": e.reason,
+                "retry_after_seconds": round(e.retry_after, 2)
+            }, indent=2)
+        )]
     except KeyError as e:
         return [TextContent(
             type="text",
@@ -388,8 +1222,44 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
         )]
 
 
+async def check_daily_indices() -> None:
+    """
+    Desliga DAILY_INDICES quando o nome base de logs ou traces é um índice comum
+
+    Em instalações anteriores aos index templates, logs-banking-api é um índice sem
+    sufixo de data (não um alias): os nomes diários não existem e, com
+    ignore_unavailable, as buscas voltariam vazias sem erro. Nesse caso as queries
+    passam a usar o nome base.
+    """
+    if not config.DAILY_INDICES:
+        return
+
+    loop = asyncio.get_event_loop()
+    for index in (config.LOGS_INDEX, config.TRACES_INDEX):
+        try:
+            undated = await loop.run_in_executor(
+                executor,
+                lambda: opensearch_client.indices.exists(index=index)
+                and not opensearch_client.indices.exists_alias(name=index)
+            )
+        except Exception as e:
+            print(f"Não foi possível verificar o alias '{index}': {e}", file=sys.stderr)
+            return
+
+        if undated:
+            config.DAILY_INDICES = False
+            print(
+                f"'{index}' é um índice sem sufixo de data, não um alias: DAILY_INDICES desligado. "
+                f"Rode opensearch-setup.sh para migrá-lo para índices diários.",
+                file=sys.stderr
+            )
+            return
+
+
 async def main():
     """Função principal"""
+    await check_daily_indices()
+    
     # Executar servidor MCP via stdio
     async with stdio_server() as (read_stream, write_stream):
         await server.run(
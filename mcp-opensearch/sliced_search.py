@@ -0,0 +1,106 @@
+"""
+Busca fatiada por tempo para períodos longos
+
+Divide o range em fatias, consulta as fatias mais recentes primeiro (em paralelo,
+em ondas de `concurrency`), para assim que houver hits suficientes e combina os
+resultados com um merge k-way baseado em heap.
+"""
+import asyncio
+import heapq
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List
+
+
+def split_time_range(time_range: Dict[str, str], slice_size: timedelta) -> List[Dict[str, str]]:
+    """
+    Divide um range de @timestamp em fatias de slice_size, da mais recente para a mais antiga
+
+    As fatias são semiabertas (gte/lt) para não haver sobreposição; apenas a mais
+    recente mantém o lte original.
+    """
+    start = datetime.fromisoformat(time_range["gte"])
+    end = datetime.fromisoformat(time_range["lte"])
+    slices = []
+
+    upper = end
+    while upper > start:
+        lower = max(upper - slice_size, start)
+        bound = {"lte": upper.isoformat()} if upper == end else {"lt": upper.isoformat()}
+        slices.append({"gte": lower.isoformat(), **bound})
+        upper = lower
+
+    return slices or [time_range]
+
+
+def merge_slice_hits(slice_hits: List[List[Dict[str, Any]]], size: int) -> List[Dict[str, Any]]:
+    """
+    Combina hits de várias fatias (cada uma já ordenada por @timestamp desc) com heapq.merge
+
+    Usa o primeiro valor de sort de cada hit e descarta _id repetidos.
+    """
+    merged = []
+    seen = set()
+
+    for hit in heapq.merge(*slice_hits, key=lambda hit: hit["sort"][0], reverse=True):
+        if hit["_id"] in seen:
+            continue
+        seen.add(hit["_id"])
+        merged.append(hit)
+        if len(merged) >= size:
+            break
+
+    return merged
+
+
+async def search_time_sliced(
+    search: Callable[[dict], Awaitable[dict]],
+    build_slice_query: Callable[[Dict[str, str]], dict],
+    time_range: Dict[str, str],
+    size: int,
+    slice_size: timedelta,
+    concurrency: int = 4
+) -> Dict[str, Any]:
+    """
+    Executa uma busca ordenada por @timestamp desc fatiando o período
+
+    Como as fatias são disjuntas e processadas da mais recente para a mais antiga,
+    quando as fatias já concluídas somam `size` hits nenhuma fatia mais antiga
+    pode entrar no resultado, e as restantes não são consultadas.
+
+    Args:
+        search: Função que executa uma query (ex: search_opensearch)
+        build_slice_query: Constrói a query de uma fatia a partir do seu range
+        time_range: Range completo retornado por parse_period()
+        size: Número de hits desejados
+        slice_size: Tamanho de cada fatia
+        concurrency: Fatias consultadas em paralelo por onda
+
+    Retorna um resultado no formato do OpenSearch (hits.total/hits.hits), com
+    relation "gte" no total quando houve término antecipado ou alguma fatia
+    teve a contagem limitada por track_total_hits.
+    """
+    slices = split_time_range(time_range, slice_size)
+    slice_hits = []
+    total = 0
+    searched = 0
+    partial_total = False
+
+    while searched < len(slices) and sum(len(hits) for hits in slice_hits) < size:
+        wave = slices[searched:searched + concurrency]
+        results = await asyncio.gather(*[search(build_slice_query(slice_range)) for slice_range in wave])
+        for result in results:
+            slice_hits.append(result["hits"]["hits"])
+            total += result["hits"]["total"].get("value", 0)
+            partial_total = partial_total or result["hits"]["total"].get("relation") == "gte"
+        searched += len(wave)
+
+    return {
+        "hits": {
+            "total": {
+                "value": total,
+                "relation": "eq" if searched == len(slices) and not partial_total else "gte"
+            },
+            "hits": merge_slice_hits(slice_hits, size)
+        },
+        "slices": {"searched": searched, "total": len(slices)}
+    }
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os módulos do server são importados pelo nome (import config, import query_builder)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
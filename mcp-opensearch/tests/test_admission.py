@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+import admission
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(admission.time, "monotonic", clock)
+    return clock
+
+
+def controller(**overrides):
+    limits = dict(
+        max_concurrent=2, max_queue=1, queue_timeout=0.05,
+        tool_rate=100, tool_burst=100, client_rate=100, client_burst=100
+    )
+    limits.update(overrides)
+    return admission.AdmissionController(**limits)
+
+
+def test_token_bucket_burst_then_refill(clock):
+    bucket = admission.TokenBucket(rate=2, burst=3)
+
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+
+def test_token_bucket_refill_is_capped_at_burst(clock):
+    bucket = admission.TokenBucket(rate=10, burst=2)
+    bucket.try_acquire()
+    bucket.try_acquire()
+
+    clock.now += 60
+    assert [bucket.try_acquire() for _ in range(2)] == [0.0, 0.0]
+    assert bucket.try_acquire() > 0
+
+
+def test_client_rejection_returns_tool_token(clock):
+    limits = controller(tool_rate=1, tool_burst=2, client_rate=1, client_burst=1)
+    limits.check_rate("search", "a")
+
+    with pytest.raises(admission.AdmissionRejected) as rejected:
+        limits.check_rate("search", "a")
+
+    assert rejected.value.reason == "client_rate"
+    assert rejected.value.retry_after == pytest.approx(1.0)
+    # O token da tool devolvido permite a chamada de outro cliente
+    limits.check_rate("search", "b")
+    assert limits.stats()["tools"]["search"] == {"admitted": 2, "rejected": 1}
+
+
+def test_client_buckets_are_evicted_lru(clock):
+    limits = controller(max_clients=2)
+    for client in ["a", "b", "a", "c"]:
+        limits.check_rate("search", client)
+
+    assert list(limits.client_buckets) == ["a", "c"]
+
+
+def test_slot_rejects_when_queue_is_full():
+    async def scenario():
+        limits = controller(max_concurrent=1, max_queue=1, queue_timeout=1)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limits.slot():
+                await release.wait()
+
+        async def wait_in_queue():
+            async with limits.slot():
+                pass
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(wait_in_queue())
+        await asyncio.sleep(0)
+
+        with pytest.raises(admission.AdmissionRejected) as rejected:
+            async with limits.slot():
+                pass
+
+        release.set()
+        await asyncio.gather(holder, queued)
+        return limits, rejected.value
+
+    limits, rejected = asyncio.run(scenario())
+
+    assert rejected.reason == "queue_full"
+    assert limits.stats()["admitted"] == 2
+    assert limits.stats()["peak_waiting"] == 1
+
+
+def test_slot_rejects_after_queue_timeout():
+    async def scenario():
+        limits = controller(max_concurrent=1, max_queue=5, queue_timeout=0.01)
+        release = asyncio.Event()
+
+        async def hold():
+            async with limits.slot():
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with pytest.raises(admission.AdmissionRejected) as rejected:
+            async with limits.slot():
+                pass
+
+        release.set()
+        await holder
+        return limits, rejected.value
+
+    limits, rejected = asyncio.run(scenario())
+
+    assert rejected.reason == "queue_timeout"
+    assert limits.waiting == 0
@@ -0,0 +1,113 @@
+import asyncio
+import math
+from datetime import datetime
+
+import pytest
+
+import approximate
+import query_builder
+
+TIME_RANGE = {"gte": "2025-01-01T00:00:00+00:00", "lte": "2025-01-01T10:00:00+00:00"}
+
+
+def test_estimate_total_without_sampling_is_exact():
+    assert approximate.estimate_total([3.0, 5.0], 2) == {"estimate": 8.0, "margin": 0.0}
+
+
+def test_estimate_total_expands_mean_with_finite_population_correction():
+    result = approximate.estimate_total([10.0, 20.0, 30.0, 40.0], 8)
+
+    variance = 500 / 3
+    expected_margin = approximate.Z_95 * 8 * math.sqrt((1 - 4 / 8) * variance / 4)
+    assert result["estimate"] == 200.0
+    assert result["margin"] == pytest.approx(expected_margin)
+
+
+def test_estimate_total_single_or_no_sample_has_no_margin():
+    assert approximate.estimate_total([10.0], 4)["margin"] == math.inf
+    assert approximate.estimate_total([], 4) == {"estimate": 0.0, "margin": math.inf}
+
+
+def slice_search(delay_for):
+    """Busca fake: cada fatia conta 1 documento por minuto, com atraso por fatia"""
+    async def search(query):
+        start = datetime.fromisoformat(query["gte"])
+        end = datetime.fromisoformat(query.get("lte") or query["lt"])
+        await asyncio.sleep(delay_for(start))
+        count = (end - start).total_seconds() / 60
+        return {
+            "hits": {"total": {"value": count}},
+            "aggregations": {"groups": {"buckets": [{"key": "a", "doc_count": count}]}}
+        }
+    return search
+
+
+def test_approximate_counts_all_slices_complete():
+    result = asyncio.run(approximate.approximate_counts(
+        search=slice_search(lambda start: 0),
+        build_slice_query=lambda slice_range: slice_range,
+        time_range=TIME_RANGE,
+        total_slices=10,
+        sample_slices=10,
+        budget_seconds=5
+    ))
+
+    assert result["total"] == {"estimate": 600.0, "margin": 0.0}
+    assert result["slices_missing"] == 0
+    assert not result["lower_bound"]
+
+
+def test_approximate_counts_cancelled_slices_mark_lower_bound():
+    slow_hour = datetime.fromisoformat("2025-01-01T09:00:00+00:00")
+    result = asyncio.run(approximate.approximate_counts(
+        search=slice_search(lambda start: 10 if start >= slow_hour else 0),
+        build_slice_query=lambda slice_range: slice_range,
+        time_range=TIME_RANGE,
+        total_slices=10,
+        sample_slices=10,
+        budget_seconds=0.2
+    ))
+
+    assert result["slices_sampled"] == 9
+    assert result["slices_missing"] == 1
+    assert result["lower_bound"]
+
+    formatted = query_builder.format_estimate(result, "logs", "SeverityText")
+    assert "limite inferior" in formatted
+    assert "±" not in formatted
+    assert "1 fatia(s)" in formatted
+
+
+def test_format_estimate_with_interval():
+    estimate = {
+        "total": {"estimate": 1000.0, "margin": 50.0},
+        "groups": {},
+        "slices_sampled": 4,
+        "slices_missing": 0,
+        "slices_total": 10,
+        "truncated": False,
+        "lower_bound": False
+    }
+
+    formatted = query_builder.format_estimate(estimate, "logs", "SeverityText")
+
+    assert "IC 95%" in formatted
+    assert "~1000 ± 50" in formatted
+
+
+def test_approximate_counts_timed_out_slice_marks_lower_bound():
+    async def search(query):
+        return {"timed_out": query["gte"] == TIME_RANGE["gte"], "hits": {"total": {"value": 1}}}
+
+    result = asyncio.run(approximate.approximate_counts(
+        search=search,
+        build_slice_query=lambda slice_range: slice_range,
+        time_range=TIME_RANGE,
+        total_slices=4,
+        sample_slices=4,
+        budget_seconds=5
+    ))
+
+    assert result["slices_missing"] == 0
+    assert result["truncated"]
+    assert result["lower_bound"]
@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+import columnar
+
+
+def trace_hit(position, name="TransferFunds", duration=10.0, is_error=False):
+    return {
+        "_source": {
+            "@timestamp": f"2025-01-01T00:00:{position:02d}Z",
+            "Name": name,
+            "duration_ms": duration,
+            "is_error": is_error
+        },
+        "sort": [position]
+    }
+
+
+def paged_search(pages):
+    """Busca fake: devolve as páginas em ordem (uma exceção na lista é levantada)"""
+    remaining = list(pages)
+
+    async def search(query):
+        page = remaining.pop(0)
+        if isinstance(page, Exception):
+            raise page
+        return {"pit_id": "pit", "hits": {"hits": page}}
+
+    return search
+
+
+def export(tmp_path, pages, export_format="arrow", max_docs=100):
+    path = str(tmp_path / f"export{columnar.EXPORT_FORMATS[export_format]}")
+    result = asyncio.run(columnar.export_hits(
+        search=paged_search(pages),
+        build_page_query=lambda pit_id, cursor: {},
+        pit_id="pit",
+        path=path,
+        export_format=export_format,
+        max_docs=max_docs
+    ))
+    return path, result
+
+
+@pytest.mark.parametrize("export_format", ["arrow", "parquet"])
+def test_export_roundtrip(tmp_path, export_format):
+    pages = [[trace_hit(0), trace_hit(1, duration=30.0, is_error=True)], [trace_hit(2, name="GetBalance")], []]
+
+    path, result = export(tmp_path, pages, export_format)
+
+    table = columnar.load_table(path)
+    assert result == {"rows": 3, "pages": 2, "truncated": False, "pit_id": "pit"}
+    assert table.num_rows == 3
+    assert table["name"].to_pylist() == ["TransferFunds", "TransferFunds", "GetBalance"]
+    assert not (tmp_path / f"export{columnar.EXPORT_FORMATS[export_format]}.tmp").exists()
+
+
+def test_export_stops_at_max_docs(tmp_path):
+    pages = [[trace_hit(0), trace_hit(1)], [trace_hit(2), trace_hit(3)]]
+
+    _, result = export(tmp_path, pages, max_docs=3)
+
+    assert result["rows"] == 3
+    assert result["truncated"]
+
+
+def test_failed_export_removes_temp_file(tmp_path):
+    pages = [[trace_hit(0)], ConnectionError("timeout")]
+
+    with pytest.raises(ConnectionError):
+        export(tmp_path, pages)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_summarize_groups_counts_errors_and_percentiles(tmp_path):
+    pages = [[
+        trace_hit(0, duration=10.0),
+        trace_hit(1, duration=20.0, is_error=True),
+        trace_hit(2, name="GetBalance", duration=5.0)
+    ], []]
+    path, _ = export(tmp_path, pages)
+
+    groups = {group["group"]: group for group in columnar.summarize_groups(columnar.load_table(path), "name", [50])}
+
+    assert groups["TransferFunds"]["count"] == 2
+    assert groups["TransferFunds"]["error_rate"] == 0.5
+    assert groups["TransferFunds"]["percentiles"] == {50: 15.0}
+    assert groups["GetBalance"]["max_ms"] == 5.0
+
+
+@pytest.mark.parametrize("percentiles", [[101], [-1], [50, "p99"], [True]])
+def test_summarize_groups_rejects_invalid_percentiles(tmp_path, percentiles):
+    path, _ = export(tmp_path, [[trace_hit(0)], []])
+
+    with pytest.raises(ValueError, match="Percentis devem estar entre 0 e 100"):
+        columnar.summarize_groups(columnar.load_table(path), None, percentiles)
+
+
+def test_filter_table_by_value_and_min_duration(tmp_path):
+    pages = [[trace_hit(0, duration=10.0), trace_hit(1, duration=50.0), trace_hit(2, name="GetBalance", duration=80.0)], []]
+    path, _ = export(tmp_path, pages)
+
+    filtered = columnar.filter_table(columnar.load_table(path), {"name": "TransferFunds"}, min_duration_ms=20)
+
+    assert filtered["duration_ms"].to_pylist() == [50.0]
+
+
+def test_filter_table_rejects_unknown_column(tmp_path):
+    path, _ = export(tmp_path, [[trace_hit(0)], []])
+
+    with pytest.raises(ValueError, match="Coluna de filtro inválida"):
+        columnar.filter_table(columnar.load_table(path), {"message": "x"})
+
+
+def test_record_batch_reads_legacy_correlation_fields():
+    hit = {"_source": {"@timestamp": "2025-01-01T00:00:00Z", "Attributes": {"correlationId": "abc", "clientId": "1001"}}}
+
+    batch = columnar.hits_to_record_batch([hit])
+
+    assert batch.column("correlationId").to_pylist() == ["abc"]
+    assert batch.column("clientId").to_pylist() == ["1001"]
+
+
+def test_record_batch_reads_legacy_trace_fields():
+    legacy_span = {"_source": {"@timestamp": "2025-01-01T00:00:00Z", "Duration": 1_500_000, "TraceStatus": 2}}
+    log = {"_source": {"@timestamp": "2025-01-01T00:00:00Z", "Body": "msg"}}
+
+    batch = columnar.hits_to_record_batch([legacy_span, log])
+
+    assert batch.column("duration_ms").to_pylist() == [1.5, None]
+    assert batch.column("is_error").to_pylist() == [True, None]
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+import config
+import server
+
+
+class FakeIndices:
+    def __init__(self, indices, aliases):
+        self.indices = indices
+        self.aliases = aliases
+
+    def exists(self, index):
+        return index in self.indices or index in self.aliases
+
+    def exists_alias(self, name):
+        return name in self.aliases
+
+
+@pytest.fixture
+def daily_indices(monkeypatch):
+    monkeypatch.setattr(config, "DAILY_INDICES", True)
+
+    def use(indices=(), aliases=()):
+        monkeypatch.setattr(server.opensearch_client, "indices", FakeIndices(set(indices), set(aliases)))
+        asyncio.run(server.check_daily_indices())
+        return config.DAILY_INDICES
+
+    return use
+
+
+def test_aliases_keep_daily_indices(daily_indices):
+    assert daily_indices(aliases=[config.LOGS_INDEX, config.TRACES_INDEX])
+
+
+def test_fresh_cluster_keeps_daily_indices(daily_indices):
+    assert daily_indices()
+
+
+def test_undated_index_disables_daily_indices(daily_indices):
+    assert not daily_indices(indices=[config.TRACES_INDEX], aliases=[config.LOGS_INDEX])
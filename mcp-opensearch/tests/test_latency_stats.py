@@ -0,0 +1,135 @@
+import math
+
+import numpy as np
+import pytest
+
+import latency_stats
+
+
+def period(durations, counts, errors=None, percentiles=None, seconds=3600.0):
+    result = {
+        "durations": {name: np.asarray(values, dtype=np.float64) for name, values in durations.items()},
+        "counts": counts,
+        "errors": errors or {},
+        "seconds": seconds
+    }
+    if percentiles is not None:
+        result["percentiles"] = percentiles
+    return result
+
+
+def test_rank_with_ties_averages_tied_ranks():
+    ranks, tie_counts = latency_stats.rank_with_ties(np.array([10.0, 20.0, 20.0, 30.0]))
+
+    assert ranks.tolist() == [1.0, 2.5, 2.5, 4.0]
+    assert sorted(tie_counts.tolist()) == [1, 1, 2]
+
+
+def test_mann_whitney_matches_reference_with_ties():
+    # Referência: scipy.stats.mannwhitneyu(..., use_continuity=False, method="asymptotic")
+    baseline = np.array([1, 2, 2, 3, 3, 3, 5], dtype=np.float64)
+    target = np.array([2, 3, 3, 4, 4, 6, 6, 7], dtype=np.float64)
+
+    assert latency_stats.mann_whitney_p_value(baseline, target) == pytest.approx(0.057936001992383114, rel=1e-9)
+
+
+def test_mann_whitney_all_tied_returns_one():
+    values = np.full(5, 7.0)
+
+    assert latency_stats.mann_whitney_p_value(values, values) == 1.0
+
+
+def test_mann_whitney_empty_sample_returns_one():
+    assert latency_stats.mann_whitney_p_value(np.array([1.0]), np.empty(0)) == 1.0
+
+
+def test_two_proportion_p_value_symmetric_and_bounded():
+    p_value = latency_stats.two_proportion_p_value(10, 1000, 30, 1000)
+
+    assert 0 < p_value < 0.01
+    assert p_value == pytest.approx(latency_stats.two_proportion_p_value(30, 1000, 10, 1000))
+
+
+def test_group_durations_groups_by_name():
+    names = np.array(["b", "a", "b", "a", "c"], dtype=object)
+    durations = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+
+    groups = latency_stats.group_durations(names, durations)
+
+    assert {name: values.tolist() for name, values in groups.items()} == {
+        "a": [2.0, 4.0], "b": [1.0, 3.0], "c": [5.0]
+    }
+
+
+def test_relative_change_handles_zero_baseline():
+    assert latency_stats.relative_change(10.0, 12.0) == pytest.approx(0.2)
+    assert latency_stats.relative_change(0.0, 0.0) == 0.0
+    assert latency_stats.relative_change(0.0, 1.0) == math.inf
+    assert latency_stats.relative_change(None, 1.0) is None
+
+
+def test_small_shift_in_large_sample_is_not_flagged():
+    rng = np.random.default_rng(1)
+    baseline = rng.lognormal(3.0, 0.5, 50_000)
+    target = baseline * 1.02  # 2% mais lento: p-valor ínfimo, efeito irrelevante
+
+    [comparison] = latency_stats.compare_operations(
+        period({"op": baseline}, {"op": 50_000}),
+        period({"op": target}, {"op": 50_000}),
+        min_relative_change=0.1
+    )
+
+    assert comparison["latency_p_value"] < 0.05
+    assert not comparison["latency_significant"]
+
+
+def test_large_shift_is_flagged():
+    rng = np.random.default_rng(2)
+    baseline = rng.lognormal(3.0, 0.5, 2000)
+    target = baseline * 1.5
+
+    [comparison] = latency_stats.compare_operations(
+        period({"op": baseline}, {"op": 2000}),
+        period({"op": target}, {"op": 2000})
+    )
+
+    assert comparison["latency_significant"]
+    assert comparison["latency_change"] == pytest.approx(0.5, rel=1e-6)
+
+
+def test_error_rate_needs_minimum_absolute_change():
+    baseline = period({"op": [1.0]}, {"op": 1_000_000}, {"op": 10_000})
+    target = period({"op": [1.0]}, {"op": 1_000_000}, {"op": 10_500})
+
+    [comparison] = latency_stats.compare_operations(baseline, target, min_error_rate_change=0.01)
+
+    assert comparison["error_p_value"] < 0.05
+    assert not comparison["error_significant"]
+
+
+def test_exact_percentiles_take_precedence_over_sample():
+    baseline = period({"op": [1.0, 2.0, 3.0]}, {"op": 100}, percentiles={"op": [10.0, 20.0, 30.0]})
+    target = period({"op": [1.0, 2.0, 3.0]}, {"op": 100})
+
+    [comparison] = latency_stats.compare_operations(baseline, target)
+
+    assert comparison["baseline_percentiles"].tolist() == [10.0, 20.0, 30.0]
+    assert comparison["target_percentiles"][0] == pytest.approx(2.0)
+    assert comparison["baseline_samples"] == 3
+
+
+def test_operation_missing_in_one_period():
+    [comparison] = latency_stats.compare_operations(
+        period({"op": [1.0, 2.0]}, {"op": 2}),
+        period({}, {})
+    )
+
+    assert comparison["target_percentiles"] is None
+    assert comparison["target_throughput"] == 0
+    assert not comparison["latency_significant"]
+
+
+def test_hits_to_durations_uses_legacy_duration_and_drops_missing():
+    hits = [{"_source": {"duration_ms": 2.0}}, {"_source": {"Duration": 3_000_000}}, {"_source": {}}]
+
+    assert latency_stats.hits_to_durations(hits).tolist() == [2.0, 3.0]
@@ -0,0 +1,39 @@
+import query_builder
+
+
+def hit(timestamp, body, correlation_id="c"):
+    return {"_source": {"@timestamp": timestamp, "Body": body, "correlationId": correlation_id}}
+
+
+def test_clusters_from_hits_masks_ids_and_tracks_first_seen():
+    hits = [
+        hit("2025-01-01T10:00:00Z", "Transfer failed for account 123"),
+        hit("2025-01-01T09:00:00Z", "Transfer failed for account 456"),
+        hit("2025-01-01T08:00:00Z", "Login ok")
+    ]
+
+    clusters = query_builder.clusters_from_hits(hits)
+
+    assert clusters[0]["count"] == 2
+    assert clusters[0]["last_seen"] == "2025-01-01T10:00:00Z"
+    assert clusters[0]["first_seen"] == "2025-01-01T09:00:00Z"
+    assert len(clusters) == 2
+
+
+def test_sampled_clusters_are_labelled_as_sample():
+    clusters = query_builder.clusters_from_hits([hit("t", "A"), hit("t", "A"), hit("t", "B"), hit("t", "A")])
+
+    formatted = query_builder.format_message_clusters(clusters, total=40, method="mensagem normalizada", sampled=4)
+
+    assert "amostra dos 4 logs mais recentes" in formatted
+    assert "10.0% do período" in formatted
+    assert "Count: 3 de 4 na amostra (75.0%)" in formatted
+
+
+def test_complete_clusters_are_not_labelled_as_sample():
+    clusters = query_builder.clusters_from_hits([hit("t", "A"), hit("t", "B")])
+
+    formatted = query_builder.format_message_clusters(clusters, total=2, method="mensagem normalizada", sampled=2)
+
+    assert "amostra" not in formatted
+    assert "Count: 1" in formatted
@@ -0,0 +1,40 @@
+import asyncio
+import json
+
+import pytest
+
+import server
+
+
+def call(name, arguments):
+    return json.loads(asyncio.run(server.call_tool(name, arguments))[0].text)
+
+
+@pytest.mark.parametrize("tool_name", ["tail", "export_columnar", "profile_tool_query"])
+def test_tools_with_side_effects_cannot_be_profiled(tool_name):
+    result = call("profile_tool_query", {"tool_name": tool_name, "tool_arguments": {"session_id": "s"}})
+
+    assert "não pode ser perfilada" in result["error"]
+
+
+def test_unknown_tool_is_reported():
+    result = call("profile_tool_query", {"tool_name": "does_not_exist"})
+
+    assert "não encontrada" in result["error"]
+
+
+def test_inner_tool_error_is_returned(monkeypatch):
+    async def failing_search(query):
+        raise ConnectionError("cluster indisponível")
+
+    monkeypatch.setattr(server, "search_opensearch", failing_search)
+
+    result = call("profile_tool_query", {"tool_name": "search_logs_by_client", "tool_arguments": {"client_id": "1"}})
+
+    assert result == {"error": "cluster indisponível", "type": "ConnectionError"}
+
+
+def test_inner_tool_missing_argument_is_returned():
+    result = call("profile_tool_query", {"tool_name": "search_logs_by_client", "tool_arguments": {}})
+
+    assert "client_id" in result["error"]
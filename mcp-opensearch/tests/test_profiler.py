@@ -0,0 +1,72 @@
+import profiler
+
+
+def test_collect_fields_from_query_aggs_and_sort():
+    body = {
+        "query": {"bool": {"filter": [
+            {"term": {"clientId": "1"}},
+            {"range": {"@timestamp": {"gte": "now-1h"}, "boost": 1}}
+        ]}},
+        "aggs": {"ops": {
+            "terms": {"field": "Name"},
+            "aggs": {
+                "errors": {"filter": {"term": {"is_error": True}}},
+                "latency": {"percentiles": {"field": "duration_ms"}}
+            }
+        }},
+        "sort": [{"@timestamp": "desc"}, {"_id": "desc"}]
+    }
+
+    assert profiler.collect_fields(body) == {"clientId", "@timestamp", "Name", "is_error", "duration_ms"}
+
+
+def test_find_costly_clauses():
+    body = {
+        "size": 2000,
+        "query": {"bool": {"must": [{"wildcard": {"Body": "*erro*"}}], "filter": [{"term": {"clientId": "1"}}]}},
+        "sort": [{"@timestamp": "desc"}]
+    }
+    field_types = {"clientId": {"text"}, "@timestamp": {"date", "keyword"}}
+
+    findings = profiler.find_costly_clauses(body, field_types)
+
+    assert any("bool.must com 1" in finding for finding in findings)
+    assert any("wildcard" in finding for finding in findings)
+    assert any("'clientId' mapeado como text" in finding for finding in findings)
+    assert any("'@timestamp' tem tipos diferentes" in finding for finding in findings)
+    assert any("Sort profundo: 2000" in finding for finding in findings)
+
+
+def test_filter_only_query_has_no_findings():
+    body = {"size": 10, "query": {"bool": {"filter": [{"term": {"clientId": "1"}}]}}, "sort": [{"@timestamp": "desc"}]}
+
+    assert profiler.find_costly_clauses(body, {"clientId": {"keyword"}, "@timestamp": {"date"}}) == []
+
+
+def test_summarize_profile_sums_shard_times_and_ranks_nodes():
+    response = {
+        "took": 12,
+        "_shards": {"total": 1, "failed": 0},
+        "profile": {"shards": [{
+            "id": "[node][logs][0]",
+            "searches": [{
+                "query": [{
+                    "type": "BooleanQuery", "description": "+clientId:1", "time_in_nanos": 3_000_000,
+                    "children": [{"type": "TermQuery", "description": "clientId:1", "time_in_nanos": 1_000_000}]
+                }],
+                "rewrite_time": 500_000,
+                "collector": [{"time_in_nanos": 2_000_000}]
+            }],
+            "aggregations": [{"time_in_nanos": 4_000_000}],
+            "fetch": {"time_in_nanos": 250_000}
+        }]}
+    }
+
+    summary = profiler.summarize_profile(response, top_nodes=1)
+
+    assert summary["took_ms"] == 12
+    assert summary["shards"] == [{
+        "id": "[node][logs][0]", "query_ms": 3.0, "rewrite_ms": 0.5,
+        "collector_ms": 2.0, "fetch_ms": 0.25, "aggregations_ms": 4.0
+    }]
+    assert summary["slowest_nodes"] == [{"type": "BooleanQuery", "description": "+clientId:1", "ms": 3.0}]
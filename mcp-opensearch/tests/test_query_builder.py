@@ -0,0 +1,111 @@
+import pytest
+
+import query_builder
+
+TIME_RANGE = {"gte": "2025-01-01T00:00:00+00:00", "lte": "2025-01-02T00:00:00+00:00"}
+
+
+def test_operation_sample_query_samples_one_operation_randomly():
+    query = query_builder.build_operation_sample_query("traces-banking-api", TIME_RANGE, "TransferFunds", size=500, seed=7)
+
+    function_score = query["body"]["query"]["function_score"]
+    assert query["body"]["size"] == 500
+    assert function_score["random_score"] == {"seed": 7, "field": "_seq_no"}
+    assert {"term": {"Name": "TransferFunds"}} in function_score["query"]["bool"]["filter"]
+    assert "sort" not in query["body"]
+
+
+def test_operation_stats_from_aggregation():
+    results = {"aggregations": {"by_operation": {"buckets": [
+        {"key": "A", "doc_count": 10, "errors": {"doc_count": 2},
+         "latency": {"values": {"50.0": 1e6, "95.0": 2e6, "99.0": 3e6}}},
+        {"key": "B", "doc_count": 1, "errors": {"doc_count": 0},
+         "latency": {"values": {"50.0": None, "95.0": None, "99.0": None}}}
+    ]}}}
+
+    stats = query_builder.operation_stats_from_aggregation(results)
+
+    assert stats["counts"] == {"A": 10, "B": 1}
+    assert stats["errors"] == {"A": 2, "B": 0}
+    assert stats["percentiles"] == {"A": [1.0, 2.0, 3.0], "B": None}
+
+
+def test_correlation_filters_match_promoted_and_original_fields():
+    query = query_builder.build_query("logs-banking-api", client_id="1001", correlation_id="abc")
+
+    should = [
+        clause["bool"]["should"] for clause in query["body"]["query"]["bool"]["must"] if "bool" in clause
+    ]
+    assert should == [
+        [{"term": {"clientId": "1001"}}, {"term": {"Attributes.clientId": "1001"}}],
+        [{"term": {"correlationId": "abc"}}, {"term": {"Attributes.correlationId": "abc"}}]
+    ]
+
+
+def test_correlation_value_falls_back_to_attributes():
+    promoted = {"correlationId": "new", "Attributes": {"correlationId": "old"}}
+    legacy = {"Attributes": {"correlationId": "old"}}
+
+    assert query_builder.correlation_value(promoted, "correlationId") == "new"
+    assert query_builder.correlation_value(legacy, "correlationId") == "old"
+    assert query_builder.correlation_value({}, "clientId", "-") == "-"
+
+
+def test_results_format_legacy_documents():
+    results = {"hits": {"total": {"value": 1}, "hits": [
+        {"_source": {"@timestamp": "t", "Body": "msg", "Attributes": {"correlationId": "abc", "clientId": "1001"}}}
+    ]}}
+
+    formatted = query_builder.format_results_for_ai(results, "logs")
+
+    assert "CorrelationId: abc" in formatted
+    assert "ClientId: 1001" in formatted
+
+
+def test_trace_fields_fall_back_to_duration_and_status():
+    promoted = {"duration_ms": 1.5, "Duration": 1_500_000, "is_error": False, "TraceStatus": 2}
+    legacy = {"Duration": 2_500_000, "TraceStatus": 2}
+
+    assert query_builder.duration_ms_value(promoted) == 1.5
+    assert query_builder.duration_ms_value(legacy) == 2.5
+    assert query_builder.duration_ms_value({}) is None
+    assert not query_builder.is_error_value(promoted)
+    assert query_builder.is_error_value(legacy)
+    assert not query_builder.is_error_value({"TraceStatus": 1})
+
+
+def test_slowest_traces_sort_and_threshold_cover_legacy_documents():
+    query = query_builder.build_slowest_traces_query("traces-banking-api", TIME_RANGE, percentile=90)
+
+    assert query["body"]["sort"][0] == {"Duration": {"order": "desc"}}
+    assert query["body"]["aggs"]["duration_threshold"]["percentiles"]["field"] == "Duration"
+
+    results = {
+        "hits": {"hits": [
+            {"_source": {"Name": "A", "TraceId": "t1", "Duration": 9_000_000}},
+            {"_source": {"Name": "B", "TraceId": "t2", "duration_ms": 4.0, "Duration": 4_000_000}}
+        ]},
+        "aggregations": {"duration_threshold": {"values": {"90.0": 5_000_000}}}
+    }
+    formatted = query_builder.format_slowest_traces(results, TIME_RANGE, percentile=90)
+
+    assert "Percentil p90 de duração: 5.00ms" in formatted
+    assert "Duration: 9.00ms" in formatted
+    assert "TraceId: t2" not in formatted
+
+
+def test_histogram_interval_is_kept_when_it_fits():
+    assert query_builder.resolve_histogram_interval(TIME_RANGE, "5m", max_buckets=500) == "5m"
+    assert query_builder.resolve_histogram_interval(TIME_RANGE, None) == "30m"
+
+
+def test_histogram_interval_is_raised_when_it_creates_too_many_buckets():
+    month = {"gte": "2025-01-01T00:00:00+00:00", "lte": "2025-02-01T00:00:00+00:00"}
+
+    assert query_builder.resolve_histogram_interval(month, "1s", max_buckets=500) == "3h"
+
+
+@pytest.mark.parametrize("interval", ["abc", "0m", "1w", "-5m"])
+def test_histogram_interval_rejects_unparseable_values(interval):
+    with pytest.raises(ValueError, match="Intervalo inválido"):
+        query_builder.resolve_histogram_interval(TIME_RANGE, interval)
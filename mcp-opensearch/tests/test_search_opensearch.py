@@ -0,0 +1,50 @@
+import asyncio
+import threading
+
+import server
+
+
+def test_cancelled_search_keeps_slot_until_backend_returns(monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_search(**kwargs):
+        started.set()
+        release.wait(5)
+        return {"hits": {"total": {"value": 0}, "hits": []}}
+
+    monkeypatch.setattr(server.opensearch_client, "search", blocking_search)
+
+    async def scenario():
+        task = asyncio.ensure_future(server.search_opensearch({"index": "logs", "body": {}}))
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+
+        task.cancel()
+        await asyncio.sleep(0.05)
+        held_after_cancel = server.admission_controller.in_flight
+
+        release.set()
+        await asyncio.gather(task, return_exceptions=True)
+        return held_after_cancel, task.cancelled()
+
+    held_after_cancel, cancelled = asyncio.run(scenario())
+
+    assert held_after_cancel == 1
+    assert cancelled
+    assert server.admission_controller.in_flight == 0
+
+
+def test_period_tools_count_exactly_by_default(monkeypatch):
+    async def search(query):
+        return {"hits": {"total": {"value": 3, "relation": "eq"}, "hits": []}}
+
+    async def no_estimate(**kwargs):
+        raise AssertionError("modo aproximado usado sem ser pedido")
+
+    monkeypatch.setattr(server, "search_opensearch", search)
+    monkeypatch.setattr(server.approximate, "approximate_counts", no_estimate)
+
+    result = asyncio.run(server.call_tool("search_logs_by_period", {"period": "última semana"}))
+
+    assert result[0].text.startswith("Total de logs:")
@@ -0,0 +1,77 @@
+import asyncio
+from datetime import timedelta
+
+import sliced_search
+
+TIME_RANGE = {"gte": "2025-01-01T00:00:00+00:00", "lte": "2025-01-01T10:00:00+00:00"}
+
+
+def hit(doc_id, timestamp):
+    return {"_id": doc_id, "sort": [timestamp]}
+
+
+def test_split_time_range_is_contiguous_newest_first():
+    slices = sliced_search.split_time_range(TIME_RANGE, timedelta(hours=4))
+
+    assert slices == [
+        {"gte": "2025-01-01T06:00:00+00:00", "lte": "2025-01-01T10:00:00+00:00"},
+        {"gte": "2025-01-01T02:00:00+00:00", "lt": "2025-01-01T06:00:00+00:00"},
+        {"gte": "2025-01-01T00:00:00+00:00", "lt": "2025-01-01T02:00:00+00:00"}
+    ]
+
+
+def test_split_time_range_exact_multiple_has_no_empty_slice():
+    slices = sliced_search.split_time_range(TIME_RANGE, timedelta(hours=5))
+
+    assert [(s["gte"], s.get("lt", s.get("lte"))) for s in slices] == [
+        ("2025-01-01T05:00:00+00:00", "2025-01-01T10:00:00+00:00"),
+        ("2025-01-01T00:00:00+00:00", "2025-01-01T05:00:00+00:00")
+    ]
+
+
+def test_split_empty_range_returns_original():
+    empty = {"gte": TIME_RANGE["gte"], "lte": TIME_RANGE["gte"]}
+
+    assert sliced_search.split_time_range(empty, timedelta(hours=1)) == [empty]
+
+
+def test_merge_slice_hits_orders_dedupes_and_limits():
+    newer = [hit("a", 9), hit("b", 7)]
+    older = [hit("b", 7), hit("c", 5), hit("d", 1)]
+
+    merged = sliced_search.merge_slice_hits([older, newer], size=3)
+
+    assert [h["_id"] for h in merged] == ["a", "b", "c"]
+
+
+def test_search_time_sliced_stops_when_enough_hits():
+    queried = []
+
+    async def search(query):
+        queried.append(query["range"])
+        start = query["range"]["gte"]
+        return {"hits": {"total": {"value": 2, "relation": "eq"}, "hits": [hit(f"{start}-1", 2), hit(f"{start}-2", 1)]}}
+
+    result = asyncio.run(sliced_search.search_time_sliced(
+        search, lambda slice_range: {"range": slice_range}, TIME_RANGE,
+        size=3, slice_size=timedelta(hours=1), concurrency=2
+    ))
+
+    assert len(queried) == 2
+    assert queried[0]["lte"] == TIME_RANGE["lte"]
+    assert result["slices"] == {"searched": 2, "total": 10}
+    assert result["hits"]["total"] == {"value": 4, "relation": "gte"}
+    assert len(result["hits"]["hits"]) == 3
+
+
+def test_search_time_sliced_exact_total_when_all_slices_searched():
+    async def search(query):
+        return {"hits": {"total": {"value": 0, "relation": "eq"}, "hits": []}}
+
+    result = asyncio.run(sliced_search.search_time_sliced(
+        search, lambda slice_range: {"range": slice_range}, TIME_RANGE,
+        size=10, slice_size=timedelta(hours=4)
+    ))
+
+    assert result["slices"] == {"searched": 3, "total": 3}
+    assert result["hits"]["total"] == {"value": 0, "relation": "eq"}
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+import query_builder
+import server
+
+
+class FakeIndex:
+    """Índice em memória que aplica o range, o must_not ids, a ordenação e o size do tail"""
+
+    def __init__(self):
+        self.documents = []
+
+    def add(self, doc_id, timestamp):
+        self.documents.append({"_id": doc_id, "sort": [timestamp, doc_id], "_source": {"Body": doc_id}})
+
+    async def search(self, query):
+        body = query["body"]
+        bool_query = body["query"]["bool"]
+        lower = bool_query["filter"][0]["range"]["@timestamp"]["gte"]
+        excluded = set(bool_query.get("must_not", [{}])[0].get("ids", {}).get("values", []))
+        hits = [
+            doc for doc in self.documents
+            if (isinstance(lower, str) or doc["sort"][0] >= lower) and doc["_id"] not in excluded
+        ]
+        hits.sort(key=lambda doc: doc["sort"], reverse=body["sort"][0]["@timestamp"]["order"] == "desc")
+        return {"hits": {"hits": [dict(doc) for doc in hits[:body["size"]]]}}
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = FakeIndex()
+    monkeypatch.setattr(server, "search_opensearch", index.search)
+    server.tail_cursors.clear()
+    return index
+
+
+def tail(**arguments):
+    return asyncio.run(server.handle_tail({"session_id": "s", **arguments}))
+
+
+def test_late_document_inside_overlap_window_is_delivered_once(index):
+    index.add("a", 100_000)
+    index.add("b", 105_000)
+    assert tail().startswith("2 logs novos")
+
+    # Indexado depois de "b", mas com @timestamp anterior (batch do Collector)
+    index.add("late", 101_000)
+    index.add("c", 110_000)
+    second = tail()
+    assert second.startswith("2 logs novos")
+    assert "late" in second and "c" in second
+
+    assert tail() == "Nenhum documento novo."
+
+
+def test_tail_advances_when_window_has_more_seen_documents_than_limit(index):
+    for i in range(5):
+        index.add(f"d{i}", 100_000 + i)
+    tail(limit=5)
+
+    index.add("new", 100_010)
+    assert "new" in tail(limit=2)
+
+
+def test_limit_is_clamped_to_at_least_one(index):
+    index.add("a", 100_000)
+
+    assert tail(limit=0).startswith("1 logs novos")
+
+
+def test_tail_query_rereads_overlap_and_excludes_seen_ids():
+    query = query_builder.build_tail_query(
+        "logs-banking-api", "logs", cursor=50_000, seen_ids=["x"], overlap_ms=20_000
+    )
+
+    bool_query = query["body"]["query"]["bool"]
+    assert bool_query["filter"][0] == {"range": {"@timestamp": {"gte": 30_000, "format": "epoch_millis"}}}
+    assert bool_query["must_not"] == [{"ids": {"values": ["x"]}}]
+    assert "search_after" not in query["body"]
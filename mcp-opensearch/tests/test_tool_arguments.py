@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+import pytest
+
+import server
+
+
+def call(name, arguments):
+    return asyncio.run(server.call_tool(name, arguments))[0].text
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    captured = []
+
+    async def search(query):
+        captured.append(query)
+        return {"hits": {"total": {"value": 0}, "hits": []}}
+
+    monkeypatch.setattr(server, "search_opensearch", search)
+    # Chamadas seguidas da mesma sessão esgotariam o token bucket de cliente
+    server.admission_controller.tool_buckets.clear()
+    server.admission_controller.client_buckets.clear()
+    return captured
+
+
+@pytest.mark.parametrize("top_k, size", [(0, 1), (-5, 1), (500, 100)])
+def test_slowest_traces_top_k_is_clamped(queries, top_k, size):
+    call("get_slowest_traces", {"period": "ontem", "top_k": top_k})
+
+    assert queries[0]["body"]["size"] == size
+
+
+@pytest.mark.parametrize("percentile", [0, -1, 100.5])
+def test_slowest_traces_rejects_percentile_out_of_range(queries, percentile):
+    result = json.loads(call("get_slowest_traces", {"period": "ontem", "percentile": percentile}))
+
+    assert "percentile" in result["error"]
+    assert queries == []
+
+
+def test_histogram_interval_is_raised_for_long_periods(queries):
+    result = call("get_activity_histogram", {"period": "último mês", "interval": "1s"})
+
+    intervals = {q["body"]["aggs"]["over_time"]["date_histogram"]["fixed_interval"] for q in queries}
+    assert intervals != {"1s"}
+    assert "Intervalo '1s' geraria mais de" in result
+
+
+@pytest.mark.parametrize("max_docs, expected", [(-10, 1), (5, 5), (10**9, server.config.EXPORT_MAX_DOCS)])
+def test_export_max_docs_is_clamped(queries, monkeypatch, tmp_path, max_docs, expected):
+    exported = []
+
+    async def open_pit(index):
+        return "pit"
+
+    async def close_pit(pit_id):
+        pass
+
+    async def export_hits(search, build_page_query, pit_id, path, export_format, max_docs):
+        exported.append((build_page_query(pit_id, None), max_docs))
+        open(path, "wb").close()
+        return {"pit_id": pit_id, "rows": 0, "pages": 0, "truncated": False}
+
+    monkeypatch.setattr(server.config, "EXPORT_DIR", str(tmp_path))
+    monkeypatch.setattr(server, "open_point_in_time", open_pit)
+    monkeypatch.setattr(server, "close_point_in_time", close_pit)
+    monkeypatch.setattr(server.columnar, "export_hits", export_hits)
+
+    call("export_columnar", {"source": "traces", "period": "ontem", "max_docs": max_docs})
+
+    page_query, limit = exported[0]
+    assert limit == expected
+    assert page_query["body"]["size"] == min(server.config.EXPORT_PAGE_SIZE, expected)
@@ -0,0 +1,59 @@
+import pytest
+
+from tool_registry import compile_validator
+
+TRANSFER_BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "transfers": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "from_account_id": {"type": "string"},
+                    "to_account_id": {"type": "string"},
+                    "amount": {"type": "number"}
+                },
+                "required": ["from_account_id", "to_account_id", "amount"]
+            }
+        },
+        "tags": {"type": "array", "items": {"type": "string", "enum": ["a", "b"]}}
+    },
+    "required": ["transfers"]
+}
+
+validate = compile_validator(TRANSFER_BATCH_SCHEMA)
+
+
+def transfer(**overrides):
+    return {"from_account_id": "A", "to_account_id": "B", "amount": 10, **overrides}
+
+
+def test_valid_array_items_pass():
+    arguments = {"transfers": [transfer(), transfer(amount=2.5)], "tags": ["a"]}
+
+    assert validate(arguments) is arguments
+
+
+def test_array_item_missing_required_property_is_rejected():
+    item = transfer()
+    del item["amount"]
+
+    with pytest.raises(KeyError, match=r"transfers\[1\]\.amount"):
+        validate({"transfers": [transfer(), item]})
+
+
+@pytest.mark.parametrize("amount", ["10", True, [10]])
+def test_array_item_with_wrong_property_type_is_rejected(amount):
+    with pytest.raises(ValueError, match=r"transfers\[0\]\.amount' deve ser do tipo number"):
+        validate({"transfers": [transfer(amount=amount)]})
+
+
+def test_array_item_must_match_items_type():
+    with pytest.raises(ValueError, match=r"transfers\[0\]' deve ser do tipo object"):
+        validate({"transfers": ["A->B"]})
+
+
+def test_array_item_enum_is_checked():
+    with pytest.raises(ValueError, match=r"tags\[1\]' inválido"):
+        validate({"transfers": [], "tags": ["a", "c"]})
@@ -0,0 +1,142 @@
+"""
+Registro declarativo de tools MCP
+
+Cada tool declara nome, descrição, schema de entrada e handler em um único lugar.
+A validação dos argumentos é compilada a partir do schema no registro, o despacho
+é uma busca em dict e a lista de Tool devolvida por list_tools() é montada uma vez.
+"""
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from mcp.types import Tool
+
+# Tipos Python aceitos para cada tipo do JSON Schema
+JSON_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "object": (dict,),
+    "array": (list,)
+}
+
+Handler = Callable[[Dict[str, Any]], Awaitable[Any]]
+Validator = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+def compile_value_check(prop: Dict[str, Any]) -> Callable[[str, Any], None]:
+    """
+    Compila a validação de um valor: tipo, enum e, recursivamente, os items de
+    arrays e as properties de objects. Recebe o caminho do valor para as mensagens
+    """
+    type_name = prop["type"]
+    types = JSON_TYPES[type_name]
+    enum = frozenset(prop["enum"]) if "enum" in prop else None
+    check_object = compile_object_check(prop) if type_name == "object" and "properties" in prop else None
+    check_item = compile_value_check(prop["items"]) if type_name == "array" and "items" in prop else None
+
+    def check(path: str, value: Any) -> None:
+        # bool é subclasse de int em Python, mas não é integer/number no JSON
+        if not isinstance(value, types) or (isinstance(value, bool) and type_name != "boolean"):
+            raise ValueError(f"Parâmetro '{path}' deve ser do tipo {type_name}")
+        if enum is not None and value not in enum:
+            raise ValueError(f"Parâmetro '{path}' inválido: '{value}' (use {', '.join(sorted(enum))})")
+        if check_object is not None:
+            check_object(f"{path}.", value)
+        if check_item is not None:
+            for index, item in enumerate(value):
+                check_item(f"{path}[{index}]", item)
+
+    return check
+
+
+def compile_object_check(schema: Dict[str, Any]) -> Callable[[str, Dict[str, Any]], None]:
+    """Compila a validação de um object (required e properties), com prefixo de caminho"""
+    required = tuple(schema.get("required", []))
+    checks = tuple(
+        (name, compile_value_check(prop))
+        for name, prop in schema.get("properties", {}).items()
+    )
+
+    def check(prefix: str, arguments: Dict[str, Any]) -> None:
+        for name in required:
+            if name not in arguments:
+                raise KeyError(f"{prefix}{name}")
+
+        for name, check_value in checks:
+            value = arguments.get(name)
+            if value is None:
+                continue
+            check_value(f"{prefix}{name}", value)
+
+    return check
+
+
+def compile_validator(schema: Dict[str, Any]) -> Validator:
+    """
+    Compila o schema de entrada (object com properties/required) em uma função de validação
+
+    Parâmetros obrigatórios ausentes levantam KeyError; tipos ou valores fora do
+    enum levantam ValueError. Parâmetros opcionais com valor null são ignorados.
+    Items de arrays e objects aninhados seguem as mesmas regras, e os erros
+    indicam o caminho do valor (ex: transfers[0].amount).
+    """
+    check = compile_object_check(schema)
+
+    def validate(arguments: Dict[str, Any]) -> Dict[str, Any]:
+        check("", arguments)
+        return arguments
+
+    return validate
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """Definição de uma tool registrada"""
+    tool: Tool
+    validate: Validator
+    handler: Handler
+    rate_limited: bool
+
+
+class ToolRegistry:
+    """Tools registradas por nome, com a resposta de list_tools() pré-montada"""
+
+    def __init__(self):
+        self.specs: Dict[str, ToolSpec] = {}
+        self.tools: List[Tool] = []
+
+    def tool(
+        self,
+        name: str,
+        description: str,
+        input_schema: Dict[str, Any],
+        rate_limited: bool = True
+    ) -> Callable[[Handler], Handler]:
+        """
+        Decorator que registra um handler async, chamado com os argumentos já validados
+
+        Args:
+            name: Nome da tool
+            description: Descrição exibida para a IA
+            input_schema: JSON Schema dos argumentos
+            rate_limited: Se a tool passa pelos limites de taxa do controle de admissão
+        """
+        def decorator(handler: Handler) -> Handler:
+            if name in self.specs:
+                raise ValueError(f"Tool '{name}' registrada duas vezes")
+
+            tool = Tool(name=name, description=description, inputSchema=input_schema)
+            self.specs[name] = ToolSpec(
+                tool=tool,
+                validate=compile_validator(input_schema),
+                handler=handler,
+                rate_limited=rate_limited
+            )
+            self.tools.append(tool)
+            return handler
+
+        return decorator
+
+    def get(self, name: str) -> Optional[ToolSpec]:
+        return self.specs.get(name)
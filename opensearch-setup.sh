@@ -0,0 +1,119 @@
+#!/bin/sh
+
+# =============================================================================
+# Setup do OpenSearch (executado antes do OTEL Collector começar a exportar)
+# 1. Instala os ingest pipelines usados pelo OTEL Collector (campos de
+#    correlação no topo do documento, duration_ms, is_error)
+# 2. Instala os index templates de logs e traces (mappings keyword/date/long)
+# 3. Cada índice diário (ex: logs-banking-api-2025.11.24) entra automaticamente
+#    no alias logs-banking-api / traces-banking-api
+# 4. Migra índices de instalações anteriores sem sufixo de data (que impedem a
+#    criação do alias) para índices diários, aplicando os ingest pipelines
+#    (MIGRATE_UNDATED_INDICES=false faz o setup falhar em vez de migrar)
+# =============================================================================
+
+OPENSEARCH_URL="${OPENSEARCH_URL:-http://opensearch:9200}"
+PIPELINES_DIR="${PIPELINES_DIR:-/opensearch/pipelines}"
+TEMPLATES_DIR="${TEMPLATES_DIR:-/opensearch/templates}"
+MIGRATE_UNDATED_INDICES="${MIGRATE_UNDATED_INDICES:-true}"
+
+count_documents() {
+  curl -s "$OPENSEARCH_URL/$1/_count" | sed -n 's/.*"count":\([0-9]*\).*/\1/p'
+}
+
+reindex() {
+  response=$(curl -s -X POST "$OPENSEARCH_URL/_reindex?wait_for_completion=true&refresh=true" \
+    -H "Content-Type: application/json" \
+    -d "$1")
+  if ! echo "$response" | grep -q '"failures":\[\]'; then
+    echo "❌ Erro no reindex: $response"
+    return 1
+  fi
+}
+
+# Move um índice sem sufixo de data para índices diários (<índice>-YYYY.MM.DD pelo
+# @timestamp de cada documento), via uma cópia fora do padrão dos templates
+migrate_undated_index() {
+  index="$1"
+  pipeline="$2"
+  copy="legacy-$index"
+
+  echo "Migrando '$index' para índices diários (cópia temporária em '$copy')..."
+  reindex "{\"source\":{\"index\":\"$index\"},\"dest\":{\"index\":\"$copy\"}}" || return 1
+
+  if [ "$(count_documents "$index")" != "$(count_documents "$copy")" ]; then
+    echo "❌ Contagem de '$copy' diferente de '$index'; o índice original foi mantido"
+    return 1
+  fi
+
+  curl -sf -X DELETE "$OPENSEARCH_URL/$index" > /dev/null || return 1
+
+  # Documentos sem @timestamp legível ficam em <índice>-undated (também no alias)
+  reindex "{
+    \"source\": {\"index\": \"$copy\"},
+    \"dest\": {\"index\": \"$index-undated\", \"pipeline\": \"$pipeline\"},
+    \"script\": {
+      \"lang\": \"painless\",
+      \"source\": \"def ts = ctx._source['@timestamp']; if (ts instanceof String && ts.length() >= 10) { ctx._index = params.prefix + '-' + ts.substring(0, 10).replace('-', '.'); }\",
+      \"params\": {\"prefix\": \"$index\"}
+    }
+  }" || {
+    echo "   Os documentos continuam em '$copy'"
+    return 1
+  }
+
+  curl -sf -X DELETE "$OPENSEARCH_URL/$copy" > /dev/null
+  echo "✅ '$index' migrado para índices diários"
+}
+
+echo "Aguardando OpenSearch..."
+until curl -sf "$OPENSEARCH_URL/_cluster/health" > /dev/null 2>&1; do
+  sleep 2
+done
+
+for pipeline_file in "$PIPELINES_DIR"/*.json; do
+  pipeline_name=$(basename "$pipeline_file" .json)
+
+  echo "Instalando ingest pipeline '$pipeline_name'..."
+  response=$(curl -s -X PUT "$OPENSEARCH_URL/_ingest/pipeline/$pipeline_name" \
+    -H "Content-Type: application/json" \
+    -d @"$pipeline_file")
+
+  if echo "$response" | grep -q '"acknowledged":true'; then
+    echo "✅ Ingest pipeline '$pipeline_name' instalado"
+  else
+    echo "❌ Erro ao instalar ingest pipeline '$pipeline_name': $response"
+    exit 1
+  fi
+done
+
+for template_file in "$TEMPLATES_DIR"/*.json; do
+  template_name=$(basename "$template_file" .json)
+
+  echo "Instalando index template '$template_name'..."
+  response=$(curl -s -X PUT "$OPENSEARCH_URL/_index_template/$template_name" \
+    -H "Content-Type: application/json" \
+    -d @"$template_file")
+
+  if echo "$response" | grep -q '"acknowledged":true'; then
+    echo "✅ Index template '$template_name' instalado"
+  else
+    echo "❌ Erro ao instalar index template '$template_name': $response"
+    exit 1
+  fi
+
+  # Índices antigos sem sufixo de data impedem a criação do alias com o mesmo nome
+  # (o Collector não conseguiria criar os índices diários)
+  status=$(curl -s -o /dev/null -w "%{http_code}" "$OPENSEARCH_URL/_alias/$template_name")
+  if [ "$status" = "404" ] && curl -sf "$OPENSEARCH_URL/$template_name" > /dev/null 2>&1; then
+    if [ "$MIGRATE_UNDATED_INDICES" != "true" ]; then
+      echo "❌ Índice '$template_name' existe sem sufixo de data e conflita com o alias."
+      echo "   Rode com MIGRATE_UNDATED_INDICES=true ou remova o índice: curl -X DELETE $OPENSEARCH_URL/$template_name"
+      exit 1
+    fi
+    # logs-banking-api -> banking-logs, traces-banking-api -> banking-traces
+    migrate_undated_index "$template_name" "banking-${template_name%%-*}" || exit 1
+  fi
+done
+
+echo "✅ Ingest pipelines e index templates configurados!"